@@ -0,0 +1,2 @@
+# benchmarks/__init__.py
+# This package contains performance benchmarks. They are run as scripts, not by the test suite.
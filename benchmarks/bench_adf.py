@@ -0,0 +1,76 @@
+# benchmarks/bench_adf.py
+# Micro-benchmarks for the ADF-to-text converter on synthetic documents.
+#
+# Usage: python -m benchmarks.bench_adf [--workers N]
+
+import argparse
+import random
+import time
+from benchmarks.synthetic import synthetic_description
+from pipeline.adf import extract_descriptions, extract_text_from_adf
+
+def text(value):
+    return {'type': 'text', 'text': value}
+
+def paragraph(value):
+    return {'type': 'paragraph', 'content': [text(value)]}
+
+def nested_list(depth, width=3):
+    # A bullet list nested `depth` levels deep with `width` items per level
+    node = paragraph("leaf")
+    for level in range(depth):
+        items = [{'type': 'listItem', 'content': [paragraph(f"item {level}.{index}")]} for index in range(width - 1)]
+        items.append({'type': 'listItem', 'content': [paragraph(f"item {level}.last"), node]})
+        node = {'type': 'bulletList', 'content': items}
+    return {'type': 'doc', 'content': [node]}
+
+def nested_quotes(depth):
+    node = paragraph("leaf")
+    for _ in range(depth):
+        node = {'type': 'blockquote', 'content': [node]}
+    return {'type': 'doc', 'content': [node]}
+
+def wide_table(rows, columns):
+    cell = lambda value: {'type': 'tableCell', 'content': [paragraph(value)]}
+    return {'type': 'doc', 'content': [{'type': 'table', 'content': [
+        {'type': 'tableRow', 'content': [cell(f"r{row}c{column}") for column in range(columns)]} for row in range(rows)
+    ]}]}
+
+def pasted_log(lines):
+    return {'type': 'doc', 'content': [{'type': 'codeBlock', 'content': [
+        text(f"2024-03-01 10:00:{line % 60:02d} ERROR worker-{line} request failed\n") for line in range(lines)
+    ]}]}
+
+def time_per_call(fn, repeats):
+    started = time.perf_counter()
+    for _ in range(repeats):
+        fn()
+    return (time.perf_counter() - started) / repeats
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmarks for the ADF-to-text converter on synthetic documents.")
+    parser.add_argument("--workers", type=int, default=4, help="Process pool size for the bulk conversion benchmark.")
+    args = parser.parse_args()
+
+    documents = {
+        "typical description": synthetic_description(random.Random(0)),
+        "nested list depth 200": nested_list(200),
+        "nested quotes depth 5000": nested_quotes(5000),
+        "table 200x10": wide_table(200, 10),
+        "pasted log 20k lines": pasted_log(20000),
+    }
+    print(f"{'document':<28} {'full (ms)':>10} {'capped 4k (ms)':>15}")
+    for name, document in documents.items():
+        repeats = 1000 if name == "typical description" else 10
+        full = time_per_call(lambda: extract_text_from_adf(document), repeats) * 1000
+        capped = time_per_call(lambda: extract_text_from_adf(document, max_chars=4000), repeats) * 1000
+        print(f"{name:<28} {full:>10.3f} {capped:>15.3f}")
+
+    rng = random.Random(1)
+    descriptions = [synthetic_description(rng, paragraphs=20) for _ in range(50000)]
+    serial = time_per_call(lambda: extract_descriptions(descriptions), 1)
+    parallel = time_per_call(lambda: extract_descriptions(descriptions, workers=args.workers), 1)
+    print(f"\n50k descriptions: serial {serial:.2f}s, {args.workers} processes {parallel:.2f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+# benchmarks/bench_import.py
+# Import-time benchmark for the pipeline entrypoint, based on python -X importtime.
+#
+# Usage: python -m benchmarks.bench_import [--module pipeline.jira_pipeline] [--top 15]
+
+import argparse
+import subprocess
+import sys
+
+# Modules that must only be imported once a run needs them
+DEFERRED_MODULES = ('anthropic', 'openai', 'boto3', 'botocore', 'pandas', 'numpy', 'requests')
+
+def import_times(module):
+    # Returns {module: cumulative microseconds} for a fresh interpreter importing `module`
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, check=True
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        times[name] = int(cumulative)
+    return times
+
+def main():
+    parser = argparse.ArgumentParser(description="Import-time benchmark")
+    parser.add_argument("--module", default="pipeline.jira_pipeline")
+    parser.add_argument("--top", type=int, default=15, help="Number of slowest top-level imports to list.")
+    args = parser.parse_args()
+
+    times = import_times(args.module)
+    print(f"import {args.module}: {times[args.module] / 1000:.1f} ms cumulative")
+    top_level = sorted(((name, value) for name, value in times.items() if "." not in name), key=lambda item: -item[1])
+    for name, value in top_level[:args.top]:
+        print(f"  {name:<40} {value / 1000:>8.1f} ms")
+    loaded = [name for name in DEFERRED_MODULES if name in times]
+    print(f"Deferred modules imported: {', '.join(loaded) or 'none'}")
+
+if __name__ == "__main__":
+    main()
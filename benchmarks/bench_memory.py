@@ -0,0 +1,46 @@
+# benchmarks/bench_memory.py
+# Memory held by processed issue frames: the legacy json_normalize frame, the fast path and compact mode.
+#
+# Usage: python -m benchmarks.bench_memory [SIZE] [--pending-fraction F]   (defaults to 100000 and 0.1)
+
+import argparse
+import yaml
+from benchmarks.synthetic import synthetic_issues
+from pipeline.data_processing import process_data
+
+with open("config/example_config.yaml") as config_file:
+    OUTPUT_COLUMNS = yaml.safe_load(config_file)['output']['columns']
+
+def frame_megabytes(frame):
+    return frame.memory_usage(deep=True).sum() / 1024 ** 2
+
+def main():
+    parser = argparse.ArgumentParser(description="Memory held by processed issue frames: the legacy json_normalize frame, the fast path and compact mode.")
+    parser.add_argument("size", type=int, nargs="?", default=100000, help="Number of synthetic issues.")
+    parser.add_argument("--pending-fraction", type=float, default=0.1, help="Share of issues still to classify, which keep their Description.")
+    args = parser.parse_args()
+
+    issues = synthetic_issues(args.size)
+    data = {"issues": issues}
+    pending = {issue['key'] for issue in issues[:int(len(issues) * args.pending_fraction)]}
+    frames = {
+        "legacy (json_normalize)": process_data(data),
+        "fast path": process_data(data, OUTPUT_COLUMNS),
+        "compact": process_data(data, OUTPUT_COLUMNS, compact=True),
+        f"compact, {args.pending_fraction:.0%} descriptions": process_data(data, OUTPUT_COLUMNS, compact=True, description_keys=pending),
+    }
+    baseline = frame_megabytes(frames["legacy (json_normalize)"])
+    print(f"{'frame':<28} {'columns':>8} {'MB':>9} {'MB/100k':>9} {'vs legacy':>10}")
+    for name, frame in frames.items():
+        megabytes = frame_megabytes(frame)
+        print(f"{name:<28} {len(frame.columns):>8} {megabytes:>9.1f} {megabytes * 100000 / args.size:>9.1f} {megabytes / baseline:>9.0%}")
+
+    fast, compact = frames["fast path"], frames["compact"]
+    print(f"\n{'column':<20} {'fast (MB)':>10} {'compact (MB)':>13} {'dtype':>16}")
+    for column in compact.columns:
+        fast_megabytes = fast[column].memory_usage(deep=True, index=False) / 1024 ** 2
+        compact_megabytes = compact[column].memory_usage(deep=True, index=False) / 1024 ** 2
+        print(f"{column:<20} {fast_megabytes:>10.2f} {compact_megabytes:>13.2f} {str(compact[column].dtype):>16}")
+
+if __name__ == "__main__":
+    main()
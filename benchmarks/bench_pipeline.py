@@ -0,0 +1,128 @@
+# benchmarks/bench_pipeline.py
+# End-to-end benchmark: run_pipeline against local fake JIRA and LLM servers.
+#
+# Usage: python -m benchmarks.bench_pipeline [SIZES ...] [--llm-latency 0.05] [--llm-rps 50]
+#        [--llm-error-rate 0.01] [--jira-latency 0.02] [--concurrency 8] [--batch-size 10]
+#        [--search-api offset|cursor] [--json results.json]
+#
+# Each size runs in a fresh child process and working directory, so the reported peak
+# memory belongs to that run alone. The servers run in this (parent) process.
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from benchmarks.fake_servers import FakeJiraServer, FakeLLMServer
+
+EXAMPLE_CONFIG = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "config", "example_config.yaml")
+
+def benchmark_config(jira_url, llm_url, concurrency=8, batch_size=10, jira_concurrency=4, search_api="offset"):
+    # The example config pointed at the fake servers, without client-side pacing so the
+    # servers' own limits are what is measured
+    from pipeline.jira_pipeline import load_config
+    config = load_config(EXAMPLE_CONFIG)
+    config['jira'].update({'api_url': jira_url, 'search_api': search_api, 'concurrency': jira_concurrency, 'rate_limit': {'max_retries': 10, 'base_delay': 0.05}})
+    config['classification'].update({
+        'llm_provider': "openai",
+        'llm_api_key': "fake",
+        'base_url': llm_url,
+        'concurrency': concurrency,
+        'batch_size': batch_size,
+        'rate_limit': {'max_retries': 10, 'base_delay': 0.05, 'max_delay': 2.0},
+    })
+    config['output'].update({'path': "./output", 'raw_data_path': "./output/raw_data"})
+    config['output']['result_store'] = {'backend': "sqlite", 'path': "./output/processed_issues.sqlite", 'export_csv': True}
+    config['classification']['cache']['path'] = "./output/classification_cache.sqlite"
+    config['metrics'] = {'report_path': "./output/run_report.json"}
+    config['aggregation']['path'] = "./output/cubes"
+    return config
+
+def run_child(args):
+    # Runs the pipeline once in the current directory and prints its measurements as JSON
+    import logging
+    from pipeline.jira_pipeline import run_pipeline
+    logging.getLogger().setLevel(logging.WARNING)
+    os.environ["JIRA_ACCESS_TOKEN"] = "fake"
+    os.environ["JIRA_TOKEN_EXPIRES_AT"] = str(int(time.time()) + 86400)
+    config = benchmark_config(args.jira_url, args.llm_url, args.concurrency, args.batch_size, args.jira_concurrency, args.search_api)
+    started = time.perf_counter()
+    run_pipeline(argparse.Namespace(select="0", max_results=100, incremental=False), config)
+    wall = time.perf_counter() - started
+    with open(config['metrics']['report_path']) as file:
+        report = json.load(file)
+    print(json.dumps({
+        "wall_seconds": round(wall, 3),
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "stages": {name: {key: stage[key] for key in ("calls", "items", "items_per_second")} for name, stage in report["stages"].items()},
+        "counters": report["counters"],
+    }))
+
+def run_size(size, args):
+    with FakeJiraServer(size, latency=args.jira_latency) as jira, \
+            FakeLLMServer(latency=args.llm_latency, requests_per_second=args.llm_rps, error_rate=args.llm_error_rate) as llm, \
+            tempfile.TemporaryDirectory() as workdir:
+        command = [
+            sys.executable, "-m", "benchmarks.bench_pipeline", "--child",
+            "--jira-url", jira.search_url, "--llm-url", llm.base_url,
+            "--concurrency", str(args.concurrency), "--batch-size", str(args.batch_size),
+            "--jira-concurrency", str(args.jira_concurrency), "--search-api", args.search_api,
+        ]
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        environment = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [root, os.environ.get("PYTHONPATH")])))
+        result = subprocess.run(command, cwd=workdir, env=environment, capture_output=True, text=True)
+        if result.returncode != 0:
+            raise RuntimeError(f"Benchmark run for {size} issues failed:\n{result.stderr[-4000:]}")
+        measured = json.loads(result.stdout.strip().splitlines()[-1])
+    wall = measured["wall_seconds"]
+    measured.update({
+        "issues": size,
+        "jira_requests": jira.requests,
+        "llm_requests": llm.requests,
+        "llm_rate_limited": llm.rate_limited,
+        "llm_errors": llm.errors,
+        "jira_requests_per_second": round(jira.requests / wall, 1),
+        "llm_requests_per_second": round(llm.requests / wall, 1),
+        "issues_per_second": round(size / wall, 1),
+    })
+    return measured
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end pipeline benchmark against fake servers")
+    parser.add_argument("sizes", nargs="*", type=int, default=[1000, 10000, 100000])
+    parser.add_argument("--jira-latency", type=float, default=0.02, help="Seconds added to every JIRA response.")
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="Seconds added to every LLM response.")
+    parser.add_argument("--llm-rps", type=int, default=None, help="LLM requests per second before 429s.")
+    parser.add_argument("--llm-error-rate", type=float, default=0.0, help="Fraction of LLM requests failing with 500.")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--batch-size", type=int, default=10)
+    parser.add_argument("--jira-concurrency", type=int, default=4)
+    parser.add_argument("--search-api", choices=("offset", "cursor"), default="offset", help="JIRA paging backend (jira.search_api).")
+    parser.add_argument("--json", help="Also write the results to this file, e.g. for CI trend tracking.")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--jira-url", help=argparse.SUPPRESS)
+    parser.add_argument("--llm-url", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        run_child(args)
+        return
+
+    results = []
+    print(f"{'issues':>8} {'wall (s)':>9} {'peak RSS (MB)':>14} {'issues/s':>9} {'JIRA req/s':>11} {'LLM req/s':>10} {'429s':>6} {'500s':>6}")
+    for size in args.sizes:
+        result = run_size(size, args)
+        results.append(result)
+        print(
+            f"{size:>8} {result['wall_seconds']:>9.2f} {result['peak_rss_mb']:>14.1f} {result['issues_per_second']:>9.1f} "
+            f"{result['jira_requests_per_second']:>11.1f} {result['llm_requests_per_second']:>10.1f} "
+            f"{result['llm_rate_limited']:>6} {result['llm_errors']:>6}"
+        )
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump(results, file, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+# benchmarks/bench_process_data.py
+# Compares the legacy json_normalize path of process_data with the column-selective fast path.
+#
+# Usage: python -m benchmarks.bench_process_data [SIZE ...]   (defaults to 10000 100000 1000000)
+
+import sys
+import time
+import yaml
+from benchmarks.synthetic import synthetic_issues
+from pipeline.data_processing import process_data
+
+with open("config/example_config.yaml") as config_file:
+    OUTPUT_COLUMNS = yaml.safe_load(config_file)['output']['columns']
+
+def best_of(repeats, fn):
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+def main():
+    sizes = [int(size) for size in sys.argv[1:]] or [10000, 100000, 1000000]
+    print(f"{'issues':>10} {'legacy (s)':>12} {'fast (s)':>10} {'speedup':>8}")
+    for size in sizes:
+        data = {"issues": synthetic_issues(size)}
+        repeats = 3 if size <= 100000 else 1
+        legacy = best_of(repeats, lambda: process_data(data))
+        fast = best_of(repeats, lambda: process_data(data, OUTPUT_COLUMNS))
+        print(f"{size:>10} {legacy:>12.2f} {fast:>10.2f} {legacy / fast:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+# benchmarks/fake_servers.py
+# Local stand-ins for the JIRA search API and an OpenAI-compatible LLM endpoint, so the
+# pipeline can be driven end to end without credentials.
+
+import json
+import random
+import re
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+from benchmarks.synthetic import synthetic_issue
+
+class FakeServer:
+    # Runs a ThreadingHTTPServer on a free localhost port in a daemon thread. Subclasses
+    # implement handle(method, path, query, body) returning (status, headers, payload).
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.requests = 0
+        self.lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def respond(self, method):
+                url = urlparse(self.path)
+                length = int(self.headers.get('Content-Length') or 0)
+                body = json.loads(self.rfile.read(length)) if length else None
+                with server.lock:
+                    server.requests += 1
+                if server.latency:
+                    time.sleep(server.latency)
+                status, headers, payload = server.handle(method, url.path, parse_qs(url.query), body)
+                content = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(content)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(content)
+
+            def do_GET(self):
+                self.respond("GET")
+
+            def do_POST(self):
+                self.respond("POST")
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.httpd.daemon_threads = True
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.httpd.server_address[1]}"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+class FakeJiraServer(FakeServer):
+    # GET /rest/api/3/search with startAt/maxResults paging and GET /rest/api/3/search/jql
+    # with nextPageToken paging over `total` synthetic issues. Like JIRA Cloud, the page
+    # size is capped at max_page_size whatever is requested.
+    def __init__(self, total, max_page_size=100, latency=0.0, seed=0):
+        super().__init__(latency)
+        self.total = total
+        self.max_page_size = max_page_size
+        self.seed = seed
+
+    @property
+    def search_url(self):
+        return f"{self.url}/rest/api/3/search"
+
+    def handle(self, method, path, query, body):
+        page_size = min(int(query.get('maxResults', ['50'])[0]), self.max_page_size)
+        if path == "/rest/api/3/search/jql":
+            start_at = int(query.get('nextPageToken', ['0'])[0])
+        elif path == "/rest/api/3/search":
+            start_at = int(query.get('startAt', ['0'])[0])
+        else:
+            return 404, {}, {"errorMessages": [f"No route for {path}"]}
+        end = min(start_at + page_size, self.total)
+        issues = [synthetic_issue(index, self.seed) for index in range(start_at, end)]
+        if path == "/rest/api/3/search":
+            return 200, {}, {"startAt": start_at, "maxResults": page_size, "total": self.total, "issues": issues}
+        page = {"issues": issues, "isLast": end >= self.total}
+        if end < self.total:
+            page["nextPageToken"] = str(end)
+        return 200, {}, page
+
+class FakeLLMServer(FakeServer):
+    # POST /v1/chat/completions in the OpenAI format. The category is picked from the
+    # prompt's category list by a hash of the issue text, and batch prompts get a JSON
+    # object mapping every Key. requests_per_second answers excess requests with 429 and
+    # retry-after-ms; error_rate answers that fraction of requests with 500.
+    def __init__(self, latency=0.0, requests_per_second=None, error_rate=0.0, seed=0):
+        super().__init__(latency)
+        self.requests_per_second = requests_per_second
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.window_start = time.monotonic()
+        self.window_count = 0
+        self.rate_limited = 0
+        self.errors = 0
+
+    @property
+    def base_url(self):
+        return f"{self.url}/v1"
+
+    def over_limit(self):
+        if not self.requests_per_second:
+            return False
+        with self.lock:
+            now = time.monotonic()
+            if now - self.window_start >= 1.0:
+                self.window_start, self.window_count = now, 0
+            self.window_count += 1
+            if self.window_count > self.requests_per_second:
+                self.rate_limited += 1
+                return True
+        return False
+
+    @staticmethod
+    def pick(categories, text):
+        return categories[zlib.crc32(text.encode()) % len(categories)]
+
+    def answer(self, prompt):
+        categories = re.findall(r"^- ([^:\n]+)", prompt, flags=re.MULTILINE)
+        if "Issues: " in prompt:
+            issues = json.loads(prompt.split("Issues: ", 1)[1])
+            return json.dumps({issue['Key']: self.pick(categories, issue['Summary'] or "") for issue in issues})
+        return self.pick(categories, prompt.split("Summary: ", 1)[-1].split("\n", 1)[0])
+
+    def handle(self, method, path, query, body):
+        if path != "/v1/chat/completions":
+            return 404, {}, {"error": {"message": f"No route for {path}"}}
+        if self.over_limit():
+            return 429, {"retry-after-ms": "200"}, {"error": {"message": "Rate limit reached", "type": "rate_limit_error"}}
+        with self.lock:
+            failed = self.random.random() < self.error_rate
+            self.errors += failed
+        if failed:
+            return 500, {}, {"error": {"message": "Injected failure", "type": "server_error"}}
+        prompt = body['messages'][-1]['content']
+        content = self.answer(prompt)
+        return 200, {}, {
+            "id": "chatcmpl-fake",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get('model', "fake"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": len(prompt) // 4, "completion_tokens": len(content) // 4, "total_tokens": (len(prompt) + len(content)) // 4},
+        }
@@ -0,0 +1,55 @@
+# benchmarks/synthetic.py
+# Synthetic JIRA issues for benchmarks.
+
+import random
+
+PROJECTS = ["Payments", "Platform", "Mobile", "Data", "Support"]
+ISSUE_TYPES = ["Bug", "Story", "Task", "Epic"]
+STATUSES = ["To Do", "In Progress", "In Review", "Done"]
+ASSIGNEES = [f"Engineer {index}" for index in range(40)]
+WORDS = "deploy refactor customer latency checkout migrate dashboard alert invoice cache token retry export".split()
+
+def synthetic_description(rng, paragraphs=3):
+    return {
+        "type": "doc",
+        "version": 1,
+        "content": [
+            {
+                "type": "paragraph",
+                "content": [
+                    {"type": "text", "text": " ".join(rng.choice(WORDS) for _ in range(25))},
+                    {"type": "hardBreak"},
+                    {"type": "mention", "attrs": {"text": f"@{rng.choice(ASSIGNEES)}"}},
+                ]
+            }
+            for _ in range(paragraphs)
+        ]
+    }
+
+def synthetic_issue(index, seed=0):
+    # A single issue that depends only on (index, seed), so a fake server can build any
+    # page on demand without holding the whole dataset
+    return build_issue(random.Random(f"{seed}-{index}"), index)
+
+def synthetic_issues(count, seed=0):
+    rng = random.Random(seed)
+    return [build_issue(rng, index) for index in range(count)]
+
+def build_issue(rng, index):
+    resolved = rng.random() < 0.6
+    month = rng.randint(1, 12)
+    return {
+        "key": f"{PROJECTS[index % len(PROJECTS)][:3].upper()}-{index}",
+        "fields": {
+            "project": {"name": PROJECTS[index % len(PROJECTS)]},
+            "summary": " ".join(rng.choice(WORDS) for _ in range(8)),
+            "description": synthetic_description(rng),
+            "created": f"2024-{month:02d}-{rng.randint(1, 28):02d}T09:{rng.randint(0, 59):02d}:00.000+0000",
+            "updated": f"2024-{month:02d}-28T17:{rng.randint(0, 59):02d}:00.000+0200",
+            "resolutiondate": f"2024-{month:02d}-28T18:00:00.000+0000" if resolved else None,
+            "issuetype": {"name": rng.choice(ISSUE_TYPES)},
+            "status": {"name": "Done" if resolved else rng.choice(STATUSES[:-1])},
+            "resolution": {"name": "Fixed"} if resolved else None,
+            "assignee": {"displayName": rng.choice(ASSIGNEES)} if rng.random() < 0.9 else None,
+        }
+    }
@@ -13,6 +13,7 @@ class IssueSchema:
     Issue_Type: str
     Status: str
     Resolution: str
+    Resolved: str
     Resolved_YearMonth: str
     Assignee: str
     Category: str
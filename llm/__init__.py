@@ -1,2 +1,23 @@
 # llm/__init__.py
 # This package contains all LLM provider abstractions and implementations.
+# Providers are registered by module path and imported only when selected, so a run
+# configured for one provider never imports the other providers' SDKs.
+
+import importlib
+
+PROVIDERS = {
+    'openai': {'module': 'llm.openai_provider', 'class': 'OpenAIClassifier', 'default_model': 'gpt-3.5-turbo', 'api_key': True},
+    'claude': {'module': 'llm.claude_provider', 'class': 'ClaudeClassifier', 'default_model': 'claude-3-5-haiku-latest', 'api_key': True},
+    'bedrock': {'module': 'llm.bedrock_provider', 'class': 'BedrockClassifier', 'default_model': 'anthropic.claude-instant-v1', 'api_key': False},
+}
+
+def register_provider(name, module, class_name, default_model=None, api_key=True):
+    PROVIDERS[name] = {'module': module, 'class': class_name, 'default_model': default_model, 'api_key': api_key}
+
+def get_provider(name):
+    # Returns the provider's registry entry; its 'load' imports and returns the classifier class
+    if name not in PROVIDERS:
+        raise ValueError("Unsupported LLM provider")
+    provider = dict(PROVIDERS[name])
+    provider['load'] = lambda: getattr(importlib.import_module(provider['module']), provider['class'])
+    return provider
@@ -1,5 +1,72 @@
-from typing import List, Optional
+# llm/base.py
+import json
+import logging
+from typing import Dict, List, Optional
+from .prompts import PromptBuilder, CHARS_PER_TOKEN
+from utils.metrics import metrics
 
 class LLMClassifier:
+    # Completion tokens allowed per issue when several issues share one request.
+    batch_tokens_per_issue = 30
+    # Providers replace this with the builder passed to their constructor
+    prompt_builder = PromptBuilder()
+    # Label for the token counters in the run report
+    provider_name = "llm"
+
+    def record_usage(self, prompt_tokens=None, completion_tokens=None, prompt="", completion=""):
+        # Counts tokens as reported by the provider; when it reports none they are
+        # estimated from the prompt and completion text and labelled as estimated
+        estimated = prompt_tokens is None or completion_tokens is None
+        if prompt_tokens is None:
+            prompt_tokens = len(prompt) // CHARS_PER_TOKEN
+        if completion_tokens is None:
+            completion_tokens = len(completion) // CHARS_PER_TOKEN
+        labels = {'provider': self.provider_name, 'estimated': str(estimated).lower()}
+        metrics.increment("llm_prompt_tokens", prompt_tokens, **labels)
+        metrics.increment("llm_completion_tokens", completion_tokens, **labels)
+        metrics.increment("llm_requests", provider=self.provider_name)
+
     def classify(self, summary: str, description: str, categories: List[dict], model: Optional[str] = None) -> str:
         raise NotImplementedError("Subclasses must implement classify method.")
+
+    def complete(self, prompt: str, model: Optional[str] = None, max_tokens: int = 50) -> str:
+        raise NotImplementedError("Subclasses must implement complete method to support batch classification.")
+
+    def classify_batch(self, issues: List[dict], categories: List[dict], model: Optional[str] = None) -> Dict[str, str]:
+        # Classifies several issues (dicts with Key, Summary and Description) with a single
+        # request and returns a mapping of Key to category. Issues missing from, or
+        # unparseable in, the batch response are classified one by one.
+        results = {}
+        if len(issues) > 1:
+            prompt = self.prompt_builder.batch_prompt(issues, categories)
+            try:
+                response = self.complete(prompt, model=model, max_tokens=self.batch_tokens_per_issue * len(issues))
+                results = self.parse_batch_response(response, [issue['Key'] for issue in issues])
+            except Exception as e:
+                logging.error(f"Error classifying batch of {len(issues)} issues with {type(self).__name__}: {e}")
+        missing = [issue for issue in issues if issue['Key'] not in results]
+        if missing and len(issues) > 1:
+            logging.warning(f"Batch response missing {len(missing)} of {len(issues)} issues. Falling back to per-issue classification.")
+        for issue in missing:
+            results[issue['Key']] = self.classify(
+                summary=issue['Summary'],
+                description=issue['Description'],
+                categories=categories,
+                model=model
+            )
+        return results
+
+    @staticmethod
+    def parse_batch_response(response: str, keys: List[str]) -> Dict[str, str]:
+        start, end = response.find("{"), response.rfind("}")
+        if start == -1 or end < start:
+            raise ValueError("Batch response does not contain a JSON object.")
+        parsed = json.loads(response[start:end + 1])
+        if not isinstance(parsed, dict):
+            raise ValueError("Batch response is not a JSON object.")
+        results = {}
+        for key in keys:
+            category = parsed.get(key)
+            if isinstance(category, str) and category.strip():
+                results[key] = category.strip()
+        return results
@@ -2,37 +2,58 @@
 import boto3
 import json
 import logging
+from botocore.config import Config
 from botocore.exceptions import BotoCoreError, ClientError
 from .base import LLMClassifier
 from typing import List, Optional
+from utils.rate_limit import Throttle
+from .prompts import PromptBuilder
 
 class BedrockClassifier(LLMClassifier):
-    def __init__(self, model: str = "anthropic.claude-instant-v1", region: str = "us-east-1"):
+    provider_name = "bedrock"
+
+    def __init__(self, model: str = "anthropic.claude-instant-v1", region: str = "us-east-1", throttle: Optional[Throttle] = None, prompt_builder: Optional[PromptBuilder] = None, base_url: Optional[str] = None):
         self.model = model
         self.region = region
-        self.client = boto3.client("bedrock-runtime", region_name=self.region)
+        # Retries are handled by the throttle so they honour the shared rate limit
+        self.client = boto3.client(
+            "bedrock-runtime",
+            region_name=self.region,
+            endpoint_url=base_url,
+            config=Config(retries={'max_attempts': 1, 'mode': 'standard'})
+        )
+        self.throttle = throttle or Throttle("Bedrock")
+        self.prompt_builder = prompt_builder or PromptBuilder()
 
     def classify(self, summary: str, description: str, categories: List[dict], model: Optional[str] = None) -> str:
-        prompt = (
-            f"Classify the following Jira issue into one of these categories: {categories}.\n"
-            f"Only reply with the category name.\n\n"
-            f"Summary: {summary}\n"
-            f"Description: {description or 'No description'}"
-        )
-        body = {
-            "prompt": prompt,
-            "max_tokens_to_sample": 50,
-            "temperature": 0.0,
-        }
+        prompt = self.prompt_builder.issue_prompt(summary, description, categories)
         try:
-            response = self.client.invoke_model(
-                modelId=model or self.model,
-                body=json.dumps(body),
-                accept="application/json",
-                contentType="application/json"
-            )
-            result = json.loads(response["body"].read())
-            return result.get("completion", "").strip() or "Unclassified"
+            return self.complete(prompt, model=model, max_tokens=50) or "Unclassified"
         except (BotoCoreError, ClientError, Exception) as e:
             logging.error(f"Error classifying issue with Bedrock: {e}")
             return "Unclassified"
+
+    def complete(self, prompt: str, model: Optional[str] = None, max_tokens: int = 50) -> str:
+        body = {
+            "prompt": prompt,
+            "max_tokens_to_sample": max_tokens,
+            "temperature": 0.0,
+        }
+        response = self.throttle.call(
+            self.client.invoke_model,
+            modelId=model or self.model,
+            body=json.dumps(body),
+            accept="application/json",
+            contentType="application/json"
+        )
+        result = json.loads(response["body"].read())
+        completion = result.get("completion", "")
+        headers = response.get("ResponseMetadata", {}).get("HTTPHeaders", {})
+        token_count = lambda name: int(headers[name]) if name in headers else None
+        self.record_usage(
+            token_count("x-amzn-bedrock-input-token-count"),
+            token_count("x-amzn-bedrock-output-token-count"),
+            prompt=prompt,
+            completion=completion
+        )
+        return completion.strip()
@@ -3,27 +3,39 @@ import anthropic
 import logging
 from .base import LLMClassifier
 from typing import List, Optional
+from utils.rate_limit import Throttle
+from .prompts import PromptBuilder
+
+SYSTEM_PROMPT = "You are an expert JIRA analyst. Your job is to classify JIRA issues into the provided business categories. Respond with only the category name, or the requested JSON. Do not explain or elaborate."
 
 class ClaudeClassifier(LLMClassifier):
-    def __init__(self, api_key: str, model: str = "claude-v1"):
-        self.client = anthropic.Client(api_key)
+    provider_name = "claude"
+
+    def __init__(self, api_key: str, model: str = "claude-3-5-haiku-latest", throttle: Optional[Throttle] = None, prompt_builder: Optional[PromptBuilder] = None, base_url: Optional[str] = None):
+        # Retries are handled by the throttle so they honour the shared rate limit
+        self.client = anthropic.Client(api_key=api_key, base_url=base_url, max_retries=0)
         self.model = model
+        self.throttle = throttle or Throttle("Claude")
+        self.prompt_builder = prompt_builder or PromptBuilder()
 
     def classify(self, summary: str, description: str, categories: List[dict], model: Optional[str] = None) -> str:
-        prompt = (
-            f"Classify the following issue based on its summary and description: \n"
-            f"Only reply with the category name.\n\n"
-            f"Summary: {summary}\n"
-            f"Description: {description}\n"
-            f"Categories: {categories}"
-        )
+        prompt = self.prompt_builder.issue_prompt(summary, description, categories)
         try:
-            response = self.client.completion(
-                prompt=prompt,
-                model=model or self.model,
-                max_tokens_to_sample=50
-            )
-            return response.get('completion', '').strip()
+            return self.complete(prompt, model=model, max_tokens=50)
         except Exception as e:
             logging.error(f"Error classifying issue with Claude: {e}")
             return "Unclassified"
+
+    def complete(self, prompt: str, model: Optional[str] = None, max_tokens: int = 50) -> str:
+        response = self.throttle.call(
+            self.client.messages.create,
+            model=model or self.model,
+            max_tokens=max_tokens,
+            temperature=0.0,
+            system=SYSTEM_PROMPT,
+            messages=[{"role": "user", "content": prompt}]
+        )
+        completion = "".join(block.text for block in response.content if getattr(block, 'type', None) == "text")
+        usage = getattr(response, 'usage', None)
+        self.record_usage(getattr(usage, 'input_tokens', None), getattr(usage, 'output_tokens', None), prompt, completion)
+        return completion.strip()
@@ -3,21 +3,24 @@ from openai import OpenAI
 import logging
 from .base import LLMClassifier
 from typing import List, Optional
+from utils.rate_limit import Throttle
+from .prompts import PromptBuilder
 
 class OpenAIClassifier(LLMClassifier):
-    def __init__(self, api_key: str, model: str = "gpt-3.5-turbo"):
-        self.client = OpenAI(api_key=api_key)
+    provider_name = "openai"
+
+    def __init__(self, api_key: str, model: str = "gpt-3.5-turbo", throttle: Optional[Throttle] = None, prompt_builder: Optional[PromptBuilder] = None, base_url: Optional[str] = None):
+        # Retries are handled by the throttle so they honour the shared rate limit
+        self.client = OpenAI(api_key=api_key, base_url=base_url, max_retries=0)
         self.model = model
+        self.throttle = throttle or Throttle("OpenAI")
+        self.prompt_builder = prompt_builder or PromptBuilder()
 
     def classify(self, summary: str, description: str, categories: List[dict], model: Optional[str] = None) -> str:
-        prompt = (
-            f"Classify the following Jira issue into one of these categories: {categories}.\n"
-            f"Only reply with the category name.\n\n"
-            f"Summary: {summary}\n"
-            f"Description: {description or 'No description'}"
-        )
+        prompt = self.prompt_builder.issue_prompt(summary, description, categories)
         try:
-            response = self.client.chat.completions.create(
+            response = self.throttle.call(
+                self.client.chat.completions.create,
                 model=model or self.model,
                 messages=[
                     {
@@ -29,7 +32,29 @@ class OpenAIClassifier(LLMClassifier):
                 max_tokens=30,
                 temperature=0.0
             )
+            self.record_response_usage(response)
             return response.choices[0].message.content.strip()
         except Exception as e:
             logging.error(f"Error classifying issue with OpenAI: {e}")
             return "Unclassified"
+
+    def complete(self, prompt: str, model: Optional[str] = None, max_tokens: int = 50) -> str:
+        response = self.throttle.call(
+            self.client.chat.completions.create,
+            model=model or self.model,
+            messages=[
+                {
+                    "role": "system",
+                    "content": "You are an expert JIRA analyst. Your job is to classify JIRA issues into the provided business categories. Respond with only the requested JSON. Do not explain or elaborate."
+                },
+                {"role": "user", "content": prompt}
+            ],
+            max_tokens=max_tokens,
+            temperature=0.0
+        )
+        self.record_response_usage(response)
+        return response.choices[0].message.content.strip()
+
+    def record_response_usage(self, response):
+        usage = getattr(response, 'usage', None)
+        self.record_usage(getattr(usage, 'prompt_tokens', None), getattr(usage, 'completion_tokens', None))
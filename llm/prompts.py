@@ -0,0 +1,144 @@
+# llm/prompts.py
+# Prompt construction shared by all LLM providers, with per-issue size budgets.
+
+import json
+import logging
+import math
+import threading
+from utils.metrics import Histogram
+
+# Rough conversion used when a budget is given in tokens rather than characters
+CHARS_PER_TOKEN = 4
+TRUNCATION_MARKER = "\n[... truncated ...]\n"
+# Upper bounds in characters for the prompt size histogram
+PROMPT_SIZE_BUCKETS = (500, 1000, 2000, 4000, 8000, 16000, 32000, 64000, 128000, math.inf)
+
+class PromptMetrics:
+    # Thread-safe histogram of prompt sizes, so the description budget can be tuned.
+    # Memory is fixed however many prompts are recorded; reset() starts a new run.
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.sizes = Histogram(PROMPT_SIZE_BUCKETS)
+            self.max_chars = 0
+            self.truncated = 0
+
+    def record(self, prompt_chars, truncated):
+        with self.lock:
+            self.sizes.observe(prompt_chars)
+            self.max_chars = max(self.max_chars, prompt_chars)
+            self.truncated += int(truncated)
+
+    def summary(self):
+        # Percentiles are interpolated within the histogram buckets
+        with self.lock:
+            if not self.sizes.count:
+                return {"calls": 0, "truncated": 0}
+            return {
+                "calls": self.sizes.count,
+                "truncated": self.truncated,
+                "mean_chars": round(self.sizes.sum / self.sizes.count, 1),
+                "p50_chars": round(min(self.sizes.quantile(0.5), self.max_chars)),
+                "p95_chars": round(min(self.sizes.quantile(0.95), self.max_chars)),
+                "max_chars": self.max_chars,
+                "estimated_tokens": int(self.sizes.sum) // CHARS_PER_TOKEN,
+            }
+
+class PromptBuilder:
+    # Renders each categories list once and caches it, and keeps every issue within
+    # max_description_chars (or max_description_tokens) by keeping the head and the
+    # tail of long descriptions, where the problem statement and the final error
+    # of a pasted log usually are.
+    def __init__(self, max_description_chars=None, max_description_tokens=None, max_summary_chars=500):
+        if max_description_chars is None and max_description_tokens is not None:
+            max_description_chars = int(max_description_tokens) * CHARS_PER_TOKEN
+        self.max_description_chars = max_description_chars
+        self.max_summary_chars = max_summary_chars
+        self.metrics = PromptMetrics()
+        self._category_cache = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, settings=None):
+        settings = settings or {}
+        return cls(
+            max_description_chars=settings.get('max_description_chars'),
+            max_description_tokens=settings.get('max_description_tokens'),
+            max_summary_chars=settings.get('max_summary_chars', 500)
+        )
+
+    def render_categories(self, categories):
+        # The same list object (the config's) is looked up by identity, so the common
+        # case skips serializing it; the cached entry holds the list, so its id is not reused
+        with self._lock:
+            cached = self._category_cache.get(id(categories))
+        if cached is not None and cached[0] is categories:
+            return cached[1]
+        cache_key = json.dumps(categories, sort_keys=True, ensure_ascii=False)
+        with self._lock:
+            rendered = self._category_cache.get(cache_key)
+        if rendered is None:
+            lines = []
+            for category in categories:
+                if isinstance(category, dict):
+                    description = category.get('Description')
+                    lines.append(f"- {category.get('Name')}: {description}" if description else f"- {category.get('Name')}")
+                else:
+                    lines.append(f"- {category}")
+            rendered = "\n".join(lines)
+        with self._lock:
+            self._category_cache.setdefault(cache_key, rendered)
+            rendered = self._category_cache[cache_key]
+            self._category_cache[id(categories)] = (categories, rendered)
+        return rendered
+
+    @staticmethod
+    def truncate(text, limit):
+        # Returns (text, truncated), keeping two thirds of the budget from the head
+        text = text if isinstance(text, str) else ""
+        if limit is None or len(text) <= limit:
+            return text, False
+        if limit <= len(TRUNCATION_MARKER):
+            return text[:limit], True
+        budget = limit - len(TRUNCATION_MARKER)
+        head = budget * 2 // 3
+        tail = budget - head
+        return text[:head] + TRUNCATION_MARKER + (text[-tail:] if tail else ""), True
+
+    def fit_issue(self, summary, description):
+        summary, summary_truncated = self.truncate(summary, self.max_summary_chars)
+        description, description_truncated = self.truncate(description, self.max_description_chars)
+        return summary, description or 'No description', summary_truncated or description_truncated
+
+    def issue_prompt(self, summary, description, categories):
+        summary, description, truncated = self.fit_issue(summary, description)
+        prompt = (
+            f"Classify the following Jira issue into exactly one of these categories:\n"
+            f"{self.render_categories(categories)}\n"
+            f"Only reply with the category name.\n\n"
+            f"Summary: {summary}\n"
+            f"Description: {description}"
+        )
+        self.metrics.record(len(prompt), truncated)
+        logging.debug(f"Issue prompt: {len(prompt)} chars{' (truncated)' if truncated else ''}.")
+        return prompt
+
+    def batch_prompt(self, issues, categories):
+        payload = []
+        truncated = False
+        for issue in issues:
+            summary, description, issue_truncated = self.fit_issue(issue['Summary'], issue['Description'])
+            truncated = truncated or issue_truncated
+            payload.append({"Key": issue['Key'], "Summary": summary, "Description": description})
+        prompt = (
+            f"Classify each of the following Jira issues into exactly one of these categories:\n"
+            f"{self.render_categories(categories)}\n"
+            f"Reply with only a JSON object that maps every issue Key to its category name.\n\n"
+            f"Issues: {json.dumps(payload, ensure_ascii=False)}"
+        )
+        self.metrics.record(len(prompt), truncated)
+        logging.debug(f"Batch prompt for {len(issues)} issues: {len(prompt)} chars{' (truncated)' if truncated else ''}.")
+        return prompt
@@ -0,0 +1,147 @@
+# pipeline/adf.py
+# Conversion of Atlassian Document Format (ADF) descriptions to plain text.
+
+import atexit
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from functools import partial
+from utils.metrics import metrics
+
+# Separator emitted between the children of each container node. Inline containers
+# (paragraph, heading, codeBlock, ...) join their children directly.
+CHILD_SEPARATORS = {
+    'doc': "\n\n",
+    'blockquote': "\n\n",
+    'panel': "\n\n",
+    'expand': "\n\n",
+    'nestedExpand': "\n\n",
+    'bodiedExtension': "\n\n",
+    'layoutSection': "\n\n",
+    'layoutColumn': "\n\n",
+    'bulletList': "\n",
+    'orderedList': "\n",
+    'listItem': "\n",
+    'taskList': "\n",
+    'decisionList': "\n",
+    'table': "\n",
+    'tableRow': " | ",
+    'tableCell': "\n",
+    'tableHeader': "\n",
+    'mediaGroup': "\n",
+}
+LIST_TYPES = {'bulletList', 'orderedList', 'taskList', 'decisionList'}
+
+def render_leaf(node):
+    # Returns the text of a leaf node, or None when the node is a container
+    node_type = node.get('type')
+    attrs = node.get('attrs') or {}
+    if node_type == 'text':
+        return node.get('text', '')
+    if node_type == 'hardBreak':
+        return "\n"
+    if node_type == 'mention':
+        return attrs.get('text', '')
+    if node_type == 'emoji':
+        return attrs.get('text') or attrs.get('shortName', '')
+    if node_type in ('inlineCard', 'blockCard', 'embedCard'):
+        return attrs.get('url', '')
+    if node_type == 'status':
+        return attrs.get('text', '')
+    if node_type == 'date':
+        try:
+            return datetime.fromtimestamp(int(attrs['timestamp']) / 1000, tz=timezone.utc).strftime('%Y-%m-%d')
+        except (KeyError, TypeError, ValueError):
+            return ''
+    if node_type == 'rule':
+        return "---"
+    if node_type in ('media', 'mediaInline'):
+        return attrs.get('alt', '')
+    if node_type in ('extension', 'inlineExtension', 'placeholder'):
+        return attrs.get('text', '')
+    return None
+
+def list_item_prefix(list_type, index, depth, attrs):
+    indent = "  " * depth
+    if list_type == 'orderedList':
+        return f"{indent}{(attrs.get('order') or 1) + index}. "
+    return f"{indent}- "
+
+def expand_children(node, depth):
+    # Lazily yields what a container node emits: separators and list prefixes as
+    # strings, and children as (node, list depth) pairs
+    node_type = node.get('type')
+    attrs = node.get('attrs') or {}
+    separator = CHILD_SEPARATORS.get(node_type, "")
+    if node_type in ('expand', 'nestedExpand') and attrs.get('title'):
+        yield attrs['title'] + separator
+    for index, child in enumerate(node.get('content') or []):
+        if index:
+            yield separator
+        if node_type in LIST_TYPES:
+            yield list_item_prefix(node_type, index, depth, attrs)
+            yield child, depth + 1
+        else:
+            yield child, depth
+
+def extract_text_from_adf(adf, max_chars=None):
+    # Walks the document with an explicit stack of child iterators, so arbitrarily
+    # deep nesting cannot hit the recursion limit, and stops as soon as max_chars
+    # characters have been produced.
+    if not adf or 'content' not in adf:
+        return ""
+    try:
+        parts = []
+        length = 0
+        stack = [iter([(adf, 0)])]
+        while stack:
+            item = next(stack[-1], None)
+            if item is None:
+                stack.pop()
+                continue
+            if isinstance(item, tuple):
+                node, depth = item
+                if not isinstance(node, dict):
+                    continue
+                item = render_leaf(node)
+                if item is None:
+                    stack.append(expand_children(node, depth))
+                    continue
+            parts.append(item)
+            length += len(item)
+            if max_chars is not None and length >= max_chars:
+                break
+        text = "".join(parts)
+        return text[:max_chars] if max_chars is not None else text
+    except Exception as e:
+        logging.error(f"Error parsing ADF structure: {e}")
+        return ""
+
+def description_text(adf, max_chars=None):
+    if isinstance(adf, dict):
+        return extract_text_from_adf(adf, max_chars)
+    text = str(adf) if adf else ""
+    return text[:max_chars] if max_chars is not None else text
+
+_pools = {}
+
+def get_process_pool(workers):
+    # Pools are created once per worker count and reused across chunks. The first chunk
+    # arrives while JIRA fetch threads are running, so workers are spawned rather than
+    # forked from a multi-threaded process.
+    if workers not in _pools:
+        _pools[workers] = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+        atexit.register(_pools[workers].shutdown)
+    return _pools[workers]
+
+def extract_descriptions(descriptions, max_chars=None, workers=1, min_parallel_size=500):
+    # Converts a list of raw descriptions. With workers > 1 and at least
+    # min_parallel_size descriptions, the work is spread over a process pool; smaller
+    # inputs are converted in-process because pickling overhead would dominate.
+    convert = partial(description_text, max_chars=max_chars)
+    with metrics.stage("adf_parse", items=len(descriptions)):
+        if workers <= 1 or len(descriptions) < min_parallel_size:
+            return [convert(adf) for adf in descriptions]
+        chunksize = max(1, len(descriptions) // (workers * 8))
+        return list(get_process_pool(workers).map(convert, descriptions, chunksize=chunksize))
@@ -0,0 +1,93 @@
+# pipeline/aggregation.py
+# Capacity cubes: monthly created/resolved counts and cycle-time rollups of classified issues.
+
+import logging
+import os
+import pandas as pd
+
+# Columns the cubes are built from; Description and Summary are never loaded
+CUBE_COLUMNS = ['Key', 'Project', 'Category', 'Assignee', 'Issue Type', 'Created', 'Resolved', 'Resolved_YearMonth']
+DEFAULT_ROLLUPS = [['Project'], ['Category'], ['Assignee'], ['Project', 'Category'], ['Project', 'Category', 'Assignee']]
+# Labels for missing dimension values, so groupby keeps those issues; other dimensions use "Unknown"
+MISSING_LABELS = {'Project': "Unknown Project", 'Category': "Unclassified", 'Assignee': "Unassigned", 'Issue Type': "Unknown"}
+
+def rollup_dimensions(rollups=None):
+    rollups = DEFAULT_ROLLUPS if rollups is None else rollups
+    return list(dict.fromkeys(dimension for dimensions in rollups for dimension in dimensions))
+
+def cube_columns(rollups=None):
+    # The cube columns plus any other column a configured rollup splits by
+    return CUBE_COLUMNS + [dimension for dimension in rollup_dimensions(rollups) if dimension not in CUBE_COLUMNS]
+
+def check_rollups(config):
+    # Called when the config is loaded, so a rollup on a column the result store does not
+    # hold fails before extraction instead of after classification
+    settings = config.get('aggregation') or {}
+    if not settings.get('enabled', False):
+        return
+    available = set(config['output']['columns']) | {'Category'}
+    unknown = [dimension for dimension in rollup_dimensions(settings.get('rollups')) if dimension not in available]
+    if unknown:
+        raise ValueError(f"aggregation.rollups use columns that are not in output.columns: {unknown}")
+
+def prepare_issues(issues, dimensions=()):
+    # Adds Created_YearMonth, Resolved_YearMonth and Cycle_Time_Days (resolved minus
+    # created, in days) with vectorized datetime arithmetic
+    columns = CUBE_COLUMNS + [dimension for dimension in dimensions if dimension not in CUBE_COLUMNS]
+    frame = issues.reindex(columns=columns).copy()
+    created = pd.to_datetime(frame['Created'], errors='coerce')
+    resolved = pd.to_datetime(frame['Resolved'], errors='coerce')
+    frame['Created_YearMonth'] = created.dt.strftime('%Y-%m')
+    # Rows stored before the Resolved column existed still have Resolved_YearMonth
+    frame['Resolved_YearMonth'] = resolved.dt.strftime('%Y-%m').fillna(frame['Resolved_YearMonth'])
+    frame['Cycle_Time_Days'] = (resolved - created).dt.total_seconds() / 86400
+    for column in set(MISSING_LABELS) | set(dimensions):
+        frame[column] = frame[column].fillna(MISSING_LABELS.get(column, "Unknown"))
+    return frame
+
+def rollup(frame, dimensions):
+    # One row per (Month, *dimensions) with issues created and resolved that month, and
+    # the mean, median and 85th percentile cycle time of the issues resolved that month
+    by_month = lambda data, month: [data[month].rename('Month')] + [data[dimension] for dimension in dimensions]
+    created = frame.groupby(by_month(frame, 'Created_YearMonth')).size().rename('created')
+    resolved = frame[frame['Resolved_YearMonth'].notna()]
+    cycle_times = resolved.groupby(by_month(resolved, 'Resolved_YearMonth'))['Cycle_Time_Days']
+    throughput = pd.concat([
+        cycle_times.size().rename('resolved'),
+        cycle_times.mean().rename('cycle_time_days_mean'),
+        cycle_times.median().rename('cycle_time_days_median'),
+        cycle_times.quantile(0.85).rename('cycle_time_days_p85'),
+    ], axis=1)
+    cube = pd.concat([created, throughput], axis=1).sort_index().reset_index()
+    cube[['created', 'resolved']] = cube[['created', 'resolved']].fillna(0).astype(int)
+    return cube.round({'cycle_time_days_mean': 2, 'cycle_time_days_median': 2, 'cycle_time_days_p85': 2})
+
+def cube_name(dimensions):
+    return "_".join(["month"] + [dimension.lower().replace(" ", "_") for dimension in dimensions])
+
+def build_cubes(issues, rollups=None):
+    # Returns {name: cube}; "month" is always built, plus one cube per rollup
+    rollups = DEFAULT_ROLLUPS if rollups is None else rollups
+    frame = prepare_issues(issues, rollup_dimensions(rollups))
+    cubes = {"month": rollup(frame, [])}
+    for dimensions in rollups:
+        cubes[cube_name(dimensions)] = rollup(frame, list(dimensions))
+    return cubes
+
+def write_cubes(cubes, path):
+    os.makedirs(path, exist_ok=True)
+    for name, cube in cubes.items():
+        target = os.path.join(path, f"{name}.csv")
+        cube.to_csv(f"{target}.partial", index=False)
+        os.replace(f"{target}.partial", target)
+    logging.info(f"Wrote {len(cubes)} capacity cubes to {path}.")
+
+def aggregate_store(store, config):
+    # Builds the configured cubes from the result store, loading only the cube and rollup columns
+    settings = config.get('aggregation') or {}
+    if not settings.get('enabled', False):
+        return None
+    path = settings.get('path', os.path.join(config['output'].get('path', "./output"), "cubes"))
+    cubes = build_cubes(store.load(cube_columns(settings.get('rollups'))), settings.get('rollups'))
+    write_cubes(cubes, path)
+    return cubes
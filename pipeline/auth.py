@@ -0,0 +1,136 @@
+# pipeline/auth.py
+# JIRA OAuth token handling: an in-memory token provider with single-flight refresh,
+# and atomic persistence of the tokens to the .env file.
+
+import logging
+import os
+import tempfile
+import threading
+import time
+import requests
+
+TOKEN_URL = "https://auth.atlassian.com/oauth/token"
+ENV_FILE = ".env"
+# Tokens are refreshed this many seconds before they expire
+REFRESH_MARGIN_SECONDS = 120
+
+def write_env_values(values, path=ENV_FILE):
+    # Replaces (or appends) every KEY=value in one write: the new content goes to a
+    # temporary file in the same directory, which is then renamed over the original, so
+    # readers never see a half-written file
+    lines = []
+    if os.path.exists(path):
+        with open(path, "r") as file:
+            lines = file.readlines()
+    remaining = dict(values)
+    content = []
+    for line in lines:
+        key = line.split("=", 1)[0]
+        if "=" in line and key in remaining:
+            content.append(f"{key}={remaining.pop(key)}\n")
+        else:
+            content.append(line if line.endswith("\n") else f"{line}\n")
+    content.extend(f"{key}={value}\n" for key, value in remaining.items())
+    directory = os.path.dirname(os.path.abspath(path))
+    descriptor, temporary_path = tempfile.mkstemp(dir=directory, prefix=".env.", suffix=".tmp")
+    try:
+        with os.fdopen(descriptor, "w") as file:
+            file.writelines(content)
+        if os.path.exists(path):
+            os.chmod(temporary_path, os.stat(path).st_mode & 0o777)
+        os.replace(temporary_path, path)
+    except BaseException:
+        os.unlink(temporary_path)
+        raise
+
+def request_tokens(payload, token_url=TOKEN_URL, timeout=10):
+    response = requests.post(token_url, json=payload, headers={"Content-Type": "application/json"}, timeout=timeout)
+    response.raise_for_status()
+    return response.json()
+
+class TokenProvider:
+    # Holds the access token in memory. get() returns it until it is within
+    # refresh_margin seconds of expiring, then refreshes it. Refreshes are single-flight:
+    # when many fetch workers find the token expired (or get a 401) together, one of
+    # them refreshes and the others wait for and reuse its result.
+    def __init__(self, access_token=None, refresh_token=None, expires_at=0, client_id=None, client_secret=None,
+                 env_file=ENV_FILE, token_url=TOKEN_URL, refresh_margin=REFRESH_MARGIN_SECONDS):
+        self.access_token = access_token
+        self.refresh_token = refresh_token
+        self.expires_at = int(expires_at or 0)
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.env_file = env_file
+        self.token_url = token_url
+        self.refresh_margin = refresh_margin
+        self.lock = threading.Lock()
+        self.refreshes = 0
+
+    @classmethod
+    def from_env(cls, env_file=ENV_FILE):
+        return cls(
+            access_token=os.getenv("JIRA_ACCESS_TOKEN"),
+            refresh_token=os.getenv("JIRA_REFRESH_TOKEN"),
+            expires_at=os.getenv("JIRA_TOKEN_EXPIRES_AT", "0"),
+            client_id=os.getenv("JIRA_CLIENT_ID"),
+            client_secret=os.getenv("JIRA_CLIENT_SECRET"),
+            env_file=env_file
+        )
+
+    def is_fresh(self):
+        return bool(self.access_token) and time.time() < self.expires_at - self.refresh_margin
+
+    def get(self):
+        token = self.access_token
+        if self.is_fresh():
+            return token
+        if not token and not self.refresh_token:
+            logging.error("Access token not found. Please run the 3LO flow once and save the tokens.")
+            raise ValueError("Access token not found.")
+        logging.info("Access token expired or about to expire. Refreshing...")
+        return self.refresh(stale_token=token)
+
+    def refresh(self, stale_token=None):
+        # stale_token is the token the caller found expired or rejected; if another
+        # thread has replaced it in the meantime, that new token is returned instead
+        with self.lock:
+            if stale_token is not None and self.access_token != stale_token and self.is_fresh():
+                return self.access_token
+            try:
+                tokens = request_tokens({
+                    "grant_type": "refresh_token",
+                    "client_id": self.client_id,
+                    "client_secret": self.client_secret,
+                    "refresh_token": self.refresh_token
+                }, self.token_url)
+            except requests.exceptions.RequestException as e:
+                if getattr(e, 'response', None) is not None:
+                    logging.error(f"Response status: {e.response.status_code}")
+                    logging.error(f"Response body: {e.response.text}")
+                logging.error(f"Error refreshing access token: {e}")
+                raise
+            self.access_token = tokens["access_token"]
+            # Atlassian rotates refresh tokens, but keep the old one if none is returned
+            self.refresh_token = tokens.get("refresh_token", self.refresh_token)
+            self.expires_at = int(time.time()) + int(tokens.get("expires_in", 3600))
+            self.refreshes += 1
+            values = {
+                "JIRA_ACCESS_TOKEN": self.access_token,
+                "JIRA_REFRESH_TOKEN": self.refresh_token,
+                "JIRA_TOKEN_EXPIRES_AT": str(self.expires_at)
+            }
+            os.environ.update(values)
+            write_env_values(values, self.env_file)
+            logging.info("Access token refreshed successfully.")
+            return self.access_token
+
+_provider = None
+_provider_lock = threading.Lock()
+
+def get_token_provider():
+    # The process-wide provider, created from the environment on first use
+    global _provider
+    with _provider_lock:
+        if _provider is None:
+            _provider = TokenProvider.from_env()
+        return _provider
@@ -0,0 +1,35 @@
+# pipeline/checkpoint.py
+# Periodic checkpointing of classified issues to the result store.
+
+import logging
+import time
+from utils.metrics import metrics
+
+class CheckpointWriter:
+    # Buffers classified rows and writes them to the result store every every_n rows or
+    # every every_seconds seconds, whichever comes first, so a restarted run resumes
+    # from the last flush.
+    def __init__(self, store, every_n=100, every_seconds=60):
+        self.store = store
+        self.every_n = max(1, int(every_n))
+        self.every_seconds = every_seconds
+        self.buffer = []
+        self.rows_written = 0
+        self.last_flush = time.monotonic()
+
+    def add(self, row):
+        self.buffer.append(row)
+        if len(self.buffer) >= self.every_n or (
+            self.every_seconds is not None and time.monotonic() - self.last_flush >= self.every_seconds
+        ):
+            self.flush()
+
+    def flush(self):
+        self.last_flush = time.monotonic()
+        if not self.buffer:
+            return
+        with metrics.stage("store_write", items=len(self.buffer)):
+            self.store.upsert_many(self.buffer)
+        self.rows_written += len(self.buffer)
+        logging.info(f"Checkpointed {len(self.buffer)} classified issues to {self.store.path} ({self.rows_written} this run).")
+        self.buffer = []
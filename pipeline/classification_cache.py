@@ -0,0 +1,137 @@
+# pipeline/classification_cache.py
+# Persistent, content-addressed cache of LLM classification results.
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import time
+from utils.metrics import metrics
+
+def category_name(category):
+    return category.get('Name') if isinstance(category, dict) else category
+
+def category_fingerprints(categories):
+    # Name -> hash of that category's definition (name and description)
+    return {
+        category_name(category): hashlib.sha256(json.dumps(category, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+        for category in categories
+    }
+
+class ClassificationCache:
+    # Entries are keyed by a hash of (provider, model, Summary, Description), so an edited
+    # issue misses while identical text under another key hits. Changing the provider or
+    # model starts a fresh key space. Each entry also stores the fingerprint of the
+    # category it was given, so editing or removing one category only evicts the entries
+    # labelled with it. Stale entries are otherwise removed by the age and size limits.
+    def __init__(self, path, provider, model, categories, max_entries=None, max_age_days=None):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_age_days = max_age_days
+        self.hits = 0
+        self.misses = 0
+        self.fingerprint = json.dumps([provider, model], ensure_ascii=False)
+        self.category_fingerprints = category_fingerprints(categories)
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.connection = sqlite3.connect(path)
+        columns = [row[1] for row in self.connection.execute("PRAGMA table_info(classifications)")]
+        if columns and 'category_fingerprint' not in columns:
+            # Entries from before per-category fingerprints have keys that no longer match
+            logging.info(f"Rebuilding classification cache {path} with per-category fingerprints.")
+            self.connection.execute("DROP TABLE classifications")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS classifications ("
+            "key TEXT PRIMARY KEY, category TEXT NOT NULL, category_fingerprint TEXT NOT NULL, "
+            "created_at REAL NOT NULL, last_used_at REAL NOT NULL)"
+        )
+        self.connection.execute("CREATE INDEX IF NOT EXISTS idx_last_used_at ON classifications (last_used_at)")
+        self.connection.commit()
+        self.evict_changed_categories()
+        self.evict()
+
+    def evict_changed_categories(self):
+        # Removes entries whose category was edited or removed since they were stored
+        current = list(self.category_fingerprints.values())
+        evicted = self.connection.execute(
+            f"DELETE FROM classifications WHERE category_fingerprint NOT IN ({', '.join('?' * len(current))})",
+            current
+        ).rowcount
+        self.connection.commit()
+        if evicted:
+            logging.info(f"Evicted {evicted} classification cache entries whose category changed.")
+        return evicted
+
+    def key(self, summary, description):
+        content = json.dumps([
+            self.fingerprint,
+            summary if isinstance(summary, str) else "",
+            description if isinstance(description, str) else ""
+        ], ensure_ascii=False)
+        return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+    def get(self, summary, description):
+        key = self.key(summary, description)
+        row = self.connection.execute("SELECT category, category_fingerprint FROM classifications WHERE key = ?", (key,)).fetchone()
+        if row is None or self.category_fingerprints.get(row[0]) != row[1]:
+            self.misses += 1
+            return None
+        self.hits += 1
+        metrics.increment("llm_calls_saved", reason="cache")
+        self.connection.execute("UPDATE classifications SET last_used_at = ? WHERE key = ?", (time.time(), key))
+        return row[0]
+
+    def put_many(self, entries):
+        # entries is an iterable of (summary, description, category) tuples
+        now = time.time()
+        self.connection.executemany(
+            "INSERT OR REPLACE INTO classifications (key, category, category_fingerprint, created_at, last_used_at) VALUES (?, ?, ?, ?, ?)",
+            [
+                (self.key(summary, description), category, self.category_fingerprints.get(category, ""), now, now)
+                for summary, description, category in entries
+            ]
+        )
+        self.connection.commit()
+
+    def evict(self):
+        evicted = 0
+        if self.max_age_days:
+            cutoff = time.time() - float(self.max_age_days) * 86400
+            evicted += self.connection.execute("DELETE FROM classifications WHERE created_at < ?", (cutoff,)).rowcount
+        if self.max_entries:
+            evicted += self.connection.execute(
+                "DELETE FROM classifications WHERE key NOT IN "
+                "(SELECT key FROM classifications ORDER BY last_used_at DESC LIMIT ?)",
+                (int(self.max_entries),)
+            ).rowcount
+        self.connection.commit()
+        if evicted:
+            logging.info(f"Evicted {evicted} entries from classification cache {self.path}.")
+        return evicted
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def close(self):
+        self.connection.commit()
+        self.evict()
+        self.connection.close()
+        logging.info(f"Classification cache: {self.hits} hits, {self.misses} misses ({self.hit_rate:.1%} hit rate).")
+
+def open_classification_cache(config):
+    # Returns a ClassificationCache when classification.cache is enabled in the config, else None.
+    cache_config = config['classification'].get('cache') or {}
+    if not cache_config.get('enabled', False):
+        return None
+    return ClassificationCache(
+        path=cache_config.get('path', os.path.join(config['output']['path'], "classification_cache.sqlite")),
+        provider=config['classification']['llm_provider'],
+        model=config['classification'].get('model'),
+        categories=config['classification']['categories'],
+        max_entries=cache_config.get('max_entries'),
+        max_age_days=cache_config.get('max_age_days')
+    )
@@ -6,33 +6,132 @@ import logging
 import os
 import requests
 import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
 from datetime import datetime
+from pipeline.adf import extract_text_from_adf, extract_descriptions
+from utils.rate_limit import Throttle
+from utils.metrics import metrics
+from pipeline.auth import get_token_provider
 
-def extract_text_from_adf(adf):
-    if not adf or 'content' not in adf:
-        return ""
-    def recurse(content):
-        result = []
-        for block in content:
-            block_type = block.get('type')
-            if block_type == 'paragraph':
-                paragraph = recurse(block.get('content', []))
-                result.append("".join(paragraph))
-            elif block_type == 'text':
-                result.append(block.get('text', ''))
-            elif block_type == 'mention':
-                mention_text = block.get('attrs', {}).get('text', '')
-                result.append(mention_text)
-            elif block_type == 'hardBreak':
-                result.append("\n")
-        return result
-    try:
-        return "\n\n".join(recurse(adf['content']))
-    except Exception as e:
-        logging.error(f"Error parsing ADF structure: {e}")
-        return ""
+# Output column -> path into the raw issue for the plain (non-timestamp) columns
+FIELD_PATHS = {
+    'Project': ('fields', 'project', 'name'),
+    'Key': ('key',),
+    'Summary': ('fields', 'summary'),
+    'Issue Type': ('fields', 'issuetype', 'name'),
+    'Status': ('fields', 'status', 'name'),
+    'Resolution': ('fields', 'resolution', 'name'),
+    'Assignee': ('fields', 'assignee', 'displayName'),
+}
+# Output column -> (raw timestamp field, rendering) for columns derived from timestamps
+TIMESTAMP_COLUMNS = {
+    'Updated': ('updated', 'datetime64[s]'),
+    'Created': ('created', 'datetime64[s]'),
+    'Resolved': ('resolutiondate', 'datetime64[s]'),
+    'Updated_YearMonth': ('updated', 'datetime64[M]'),
+    'Resolved_YearMonth': ('resolutiondate', 'datetime64[M]'),
+}
+# Classification always needs these, whatever the configured output columns are
+REQUIRED_COLUMNS = ['Key', 'Summary', 'Description']
+# Low-cardinality text columns held as categoricals in compact frames
+CATEGORICAL_COLUMNS = ['Project', 'Issue Type', 'Status', 'Resolution', 'Assignee', 'Updated_YearMonth', 'Resolved_YearMonth']
+
+def get_path(issue, path):
+    value = issue
+    for key in path:
+        if not isinstance(value, dict):
+            return None
+        value = value.get(key)
+    return value
+
+def render_timestamps(values, unit):
+    # Renders UTC timestamps as ISO text truncated to `unit` ('datetime64[s]' gives
+    # 2024-03-01T10:15:30, 'datetime64[M]' gives 2024-03) with numpy instead of a
+    # per-row strftime. Missing values become None.
+    naive_utc = values.dt.tz_convert(None).to_numpy()
+    rendered = naive_utc.astype(unit).astype(str).astype(object)
+    rendered[pd.isna(naive_utc)] = None
+    return rendered
+
+def compact_frame(frame):
+    # Casts the low-cardinality columns to categoricals. Also used after concatenating
+    # compact frames, since pd.concat falls back to object when categories differ.
+    for column in CATEGORICAL_COLUMNS:
+        if column in frame.columns:
+            frame[column] = frame[column].astype('category')
+    return frame
+
+def render_compact_frame(frame):
+    # Renders a compact frame's datetime64 columns back to the ISO text the result
+    # stores and the full frames use. Frames without datetime columns are returned as is.
+    datetime_columns = [column for column in frame.columns if pd.api.types.is_datetime64_dtype(frame[column])]
+    if not datetime_columns:
+        return frame
+    frame = frame.copy()
+    for column in datetime_columns:
+        values = frame[column].to_numpy()
+        rendered = values.astype('datetime64[s]').astype(str).astype(object)
+        rendered[pd.isna(values)] = None
+        frame[column] = rendered
+    return frame
+
+def normalize_issues(issues, columns, description_max_chars=None, adf_workers=1, compact=False, description_keys=None):
+    # Fast path for process_data: builds only the requested output columns straight
+    # from the raw issues and parses each timestamp field once.
+    # compact keeps timestamps as datetime64[s] (naive UTC) and low-cardinality columns
+    # as categoricals. With description_keys, only those issues get a Description; the
+    # others are left empty without converting their ADF.
+    columns = list(columns) + [column for column in REQUIRED_COLUMNS if column not in columns]
+    frame = {}
+    parsed = {}
+    for column in columns:
+        if column in FIELD_PATHS:
+            frame[column] = [get_path(issue, FIELD_PATHS[column]) for issue in issues]
+        elif column == 'Description':
+            if description_keys is None:
+                wanted = range(len(issues))
+            else:
+                wanted = [position for position, issue in enumerate(issues) if issue.get('key') in description_keys]
+            descriptions = [None] * len(issues)
+            converted = extract_descriptions(
+                [get_path(issues[position], ('fields', 'description')) for position in wanted],
+                max_chars=description_max_chars,
+                workers=adf_workers
+            )
+            for position, description in zip(wanted, converted):
+                descriptions[position] = description
+            frame[column] = descriptions
+        elif column in TIMESTAMP_COLUMNS:
+            field, unit = TIMESTAMP_COLUMNS[column]
+            if field not in parsed:
+                raw = pd.Series([get_path(issue, ('fields', field)) for issue in issues], dtype=object)
+                parsed[field] = pd.to_datetime(raw, utc=True, errors='coerce', format='ISO8601')
+            if compact and unit == 'datetime64[s]':
+                frame[column] = parsed[field].dt.tz_convert(None).astype('datetime64[s]').to_numpy()
+            else:
+                frame[column] = render_timestamps(parsed[field], unit)
+    df = pd.DataFrame(frame, columns=[column for column in columns if column in frame])
+    if compact:
+        df = compact_frame(df)
+    logging.info("Data processing successful.")
+    return df
 
-def process_data(data):
+def process_data(data, columns=None, description_max_chars=None, adf_workers=1, compact=False, description_keys=None):
+    # With `columns`, only those output columns are built (see normalize_issues).
+    # Without, the full json_normalize frame including every fields.* column is returned,
+    # unless compact is set, which always takes the fast path over every known column.
+    if columns is None and compact:
+        columns = list(FIELD_PATHS) + list(TIMESTAMP_COLUMNS) + ['Description']
+    if columns is not None:
+        try:
+            with metrics.stage("normalize", items=len(data.get("issues", []))):
+                return normalize_issues(data.get("issues", []), columns, description_max_chars, adf_workers, compact, description_keys)
+        except Exception as e:
+            logging.error(f"Error during data processing: {e}")
+            raise
+    started = time.perf_counter()
     try:
         issues = data.get("issues", [])
         jira_data_normalized = pd.json_normalize(
@@ -53,12 +152,17 @@ def process_data(data):
         jira_data_normalized['fields.description'] = descriptions
 
         df = jira_data_normalized
+        # json_normalize only creates nested columns it has seen, so a page where every
+        # issue is unresolved or unassigned lacks them entirely
+        for column in ['fields.resolution.name', 'fields.assignee.displayName', 'fields.resolutiondate']:
+            if column not in df.columns:
+                df[column] = None
         df['Project'] = df['fields.project.name']
         df['Key'] = df['key']
         df['Updated'] = pd.to_datetime(df['fields.updated'], utc=True).dt.strftime('%Y-%m-%dT%H:%M:%S')
         df['Created'] = pd.to_datetime(df['fields.created'], utc=True).dt.strftime('%Y-%m-%dT%H:%M:%S')
         df['Summary'] = df['fields.summary']
-        df['Description'] = df['fields.description'].apply(lambda adf: extract_text_from_adf(adf) if isinstance(adf, dict) else str(adf) if adf else "")
+        df['Description'] = extract_descriptions(list(df['fields.description']), description_max_chars, adf_workers)
         if 'fields.project.name' not in df.columns:
             logging.warning("Column 'fields.project.name' is missing. Setting default value.")
             df['fields.project.name'] = "Unknown Project"
@@ -68,79 +172,195 @@ def process_data(data):
         df['Assignee'] = df['fields.assignee.displayName']
         df['Updated_YearMonth'] = pd.to_datetime(df['Updated']).dt.strftime('%Y-%m')
         df['fields.resolutiondate'] = pd.to_datetime(df['fields.resolutiondate'], errors='coerce', utc=True)
+        df['Resolved'] = df['fields.resolutiondate'].dt.strftime('%Y-%m-%dT%H:%M:%S')
         df['Resolved_YearMonth'] = df['fields.resolutiondate'].dt.strftime('%Y-%m')
         expected_columns = ['fields.project.name', 'key', 'fields.updated', 'fields.created', 'fields.summary', 'fields.description', 'fields.issuetype.name', 'fields.status.name', 'fields.resolution.name', 'fields.assignee.displayName']
         missing_columns = [col for col in expected_columns if col not in df.columns]
         if missing_columns:
             logging.error(f"Missing columns in the data: {missing_columns}")
             raise KeyError(f"Missing columns: {missing_columns}")
+        metrics.observe("normalize", started, time.perf_counter(), len(issues))
         logging.info("Data processing successful.")
         return df
     except Exception as e:
         logging.error(f"Error during data processing: {e}")
         raise
 
-# Move get_access_token to pipeline/data_processing.py so extract_data can use it without circular import
-
 def get_access_token():
-    access_token = os.getenv("JIRA_ACCESS_TOKEN")
-    if not access_token:
-        logging.error("Access token not found. Please run the 3LO flow once and save the tokens.")
-        raise ValueError("Access token not found.")
-    expires_at = int(os.getenv("JIRA_TOKEN_EXPIRES_AT", "0"))
-    current_time = int(time.time())
-    if current_time >= expires_at:
-        logging.info("Access token expired. Refreshing...")
-        from pipeline.jira_pipeline import refresh_access_token
-        refresh_access_token()
-    elif expires_at - current_time <= 120:
-        logging.info("Access token is about to expire. Refreshing early...")
-        from pipeline.jira_pipeline import refresh_access_token
-        refresh_access_token()
-    return os.getenv("JIRA_ACCESS_TOKEN")
+    # Checked before every request, so a token that expires during a long extraction is
+    # refreshed in time (see pipeline/auth.py)
+    return get_token_provider().get()
 
 # Add extract_data here so it can be imported by pipeline.jira_pipeline
 
-def extract_data(config, max_results):
-    access_token = get_access_token()
-    url = config['jira']['api_url']
-    headers = {
-        'Authorization': f"Bearer {access_token}"
-    }
+JIRA_FIELDS = [
+    'project',
+    'key',
+    'updated',
+    'created',
+    'summary',
+    'description',
+    'issuetype',
+    'status',
+    'resolution',
+    'assignee',
+    'resolutiondate'
+]
+# Always requested: classification needs summary and description, and the watermark
+# and snapshot merging need updated
+ALWAYS_FETCHED_FIELDS = ['summary', 'description', 'updated']
+SEARCH_APIS = ("offset", "cursor")
+
+def jira_fields_for(columns=None):
+    # The JIRA fields needed to build `columns`, so the server only sends those
+    if columns is None:
+        return list(JIRA_FIELDS)
+    fields = []
+    for column in columns:
+        if column in FIELD_PATHS and FIELD_PATHS[column][0] == 'fields':
+            fields.append(FIELD_PATHS[column][1])
+        elif column in TIMESTAMP_COLUMNS:
+            fields.append(TIMESTAMP_COLUMNS[column][0])
+    return list(dict.fromkeys(fields + ALWAYS_FETCHED_FIELDS))
+
+def create_session(pool_size=1):
+    # A pooled session reuses TCP/TLS connections across pages instead of reconnecting per request.
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+def fetch_json(session, url, params, timeout, throttle=None):
+    def request_page():
+        access_token = get_access_token()
+        response = session.get(url, headers={'Authorization': f"Bearer {access_token}"}, params=params, timeout=timeout)
+        if response.status_code == 401:
+            # Revoked or expired early: refresh once (shared with concurrent workers) and retry
+            access_token = get_token_provider().refresh(stale_token=access_token)
+            response = session.get(url, headers={'Authorization': f"Bearer {access_token}"}, params=params, timeout=timeout)
+        response.raise_for_status()
+        if throttle is not None:
+            throttle.observe(response.headers)
+        return response.json()
+
+    started = time.perf_counter()
+    data = throttle.call(request_page) if throttle is not None else request_page()
+    metrics.observe("extract_page", started, time.perf_counter(), len(data.get("issues", [])))
+    return data
+
+def fetch_page(session, url, params, start_at, timeout, throttle=None):
+    return fetch_json(session, url, dict(params, startAt=start_at), timeout, throttle)
+
+def filter_jql(filter_id):
+    # One filter id, or a list searched together so an issue in several is returned once
+    if isinstance(filter_id, (list, tuple)):
+        if len(filter_id) == 1:
+            return f"filter={filter_id[0]}"
+        return f"filter in ({', '.join(str(value) for value in filter_id)})"
+    return f"filter={filter_id}"
+
+def iter_issue_pages(config, max_results, updated_since=None, session=None, throttle=None):
+    # Yields the filter's issues one page at a time, in order, so callers can process
+    # and persist each page without holding the whole extract in memory.
+    # jira.search_api selects offset paging over /rest/api/3/search (the default) or
+    # nextPageToken paging over /rest/api/3/search/jql.
+    # A session and throttle shared by several extractions can be passed in; the session
+    # is only closed here when it was created here.
+    # Fails fast when there are no credentials at all
+    get_access_token()
+    search_api = config['jira'].get('search_api', "offset")
+    if search_api not in SEARCH_APIS:
+        raise ValueError(f"Unsupported JIRA search API: {search_api}")
+    concurrency = max(1, int(config['jira'].get('concurrency', 1)))
+    timeout = config['jira'].get('timeout', 30)
+    jql = filter_jql(config['filters']['filter_id'])
+    if updated_since:
+        jql += f' AND updated >= "{updated_since}"'
     params = {
-        'jql': f"filter={config['filters']['filter_id']}",
-        'startAt': 0,
+        'jql': jql,
         'maxResults': max_results,
-        'fields': ','.join([
-            'project',
-            'key',
-            'updated',
-            'created',
-            'summary',
-            'description',
-            'issuetype',
-            'status',
-            'resolution',
-            'assignee',
-            'resolutiondate'
-        ])
+        'fields': ','.join(jira_fields_for(
+            config.get('output', {}).get('columns') if config['jira'].get('field_projection', True) else None
+        ))
     }
-    all_issues = []
-    start_at = 0
-    while True:
-        try:
-            params['startAt'] = start_at
-            response = requests.get(url, headers=headers, params=params)
-            response.raise_for_status()
-            data = response.json()
-            issues = data.get("issues", [])
-            all_issues.extend(issues)
-            logging.info(f"Fetched {len(issues)} issues. Total so far: {len(all_issues)}")
-            if len(issues) < params['maxResults']:
-                break
-            start_at += params['maxResults']
-        except requests.exceptions.RequestException as e:
-            logging.error(f"Error during data extraction: {e}")
-            raise
+    owns_session = session is None
+    if owns_session:
+        session = create_session(concurrency)
+    if throttle is None:
+        throttle = Throttle.from_config("JIRA", config['jira'].get('rate_limit'))
+    try:
+        if search_api == "cursor":
+            url = config['jira'].get('search_jql_url') or config['jira']['api_url'].rstrip('/') + "/jql"
+            yield from iter_cursor_pages(session, url, params, timeout, throttle)
+        else:
+            yield from iter_offset_pages(session, config['jira']['api_url'], params, timeout, throttle, concurrency)
+    except requests.exceptions.RequestException as e:
+        logging.error(f"Error during data extraction: {e}")
+        raise
+    finally:
+        if owns_session:
+            session.close()
     logging.info("Data extraction successful.")
-    return {"issues": all_issues}
+
+def iter_offset_pages(session, url, params, timeout, throttle, concurrency=1):
+    fetched = 0
+    data = fetch_page(session, url, params, 0, timeout, throttle)
+    issues = data.get("issues", [])
+    fetched += len(issues)
+    logging.info(f"Fetched {len(issues)} issues. Total so far: {fetched}")
+    yield issues
+    total = data.get("total")
+    # The server may cap the page size below what was requested
+    page_size = data.get("maxResults") or params['maxResults']
+    if concurrency > 1 and total is not None:
+        # Every remaining offset is known from the first page, so fetch them in
+        # parallel. At most two pages per worker are in flight or waiting to be
+        # consumed, and pages are handed back in offset order.
+        offsets = iter(range(page_size, total, page_size))
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            submit = lambda start_at: executor.submit(fetch_page, session, url, params, start_at, timeout, throttle)
+            pending = deque(submit(start_at) for start_at in islice(offsets, concurrency * 2))
+            while pending:
+                data = pending.popleft().result()
+                next_offset = next(offsets, None)
+                if next_offset is not None:
+                    pending.append(submit(next_offset))
+                issues = data.get("issues", [])
+                fetched += len(issues)
+                logging.info(f"Fetched {len(issues)} issues. Total so far: {fetched}/{total}")
+                yield issues
+    else:
+        start_at = 0
+        # Stop on an empty page, at the reported total, or (without a total) on a page
+        # shorter than the page size the server actually applied
+        while issues and (start_at + len(issues) < total if total is not None else len(issues) >= page_size):
+            start_at += len(issues)
+            data = fetch_page(session, url, params, start_at, timeout, throttle)
+            issues = data.get("issues", [])
+            page_size = data.get("maxResults") or page_size
+            fetched += len(issues)
+            logging.info(f"Fetched {len(issues)} issues. Total so far: {fetched}")
+            yield issues
+
+def iter_cursor_pages(session, url, params, timeout, throttle):
+    # nextPageToken paging: each page names the next one, so a deep page costs the same
+    # as the first. The next page is requested while the caller processes the current
+    # one. Paging ends when the server says isLast or stops returning a token.
+    fetched = 0
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        pending = executor.submit(fetch_json, session, url, params, timeout, throttle)
+        while pending is not None:
+            data = pending.result()
+            next_token = data.get("nextPageToken")
+            if next_token and not data.get("isLast", False):
+                pending = executor.submit(fetch_json, session, url, dict(params, nextPageToken=next_token), timeout, throttle)
+            else:
+                pending = None
+            issues = data.get("issues", [])
+            fetched += len(issues)
+            logging.info(f"Fetched {len(issues)} issues. Total so far: {fetched}")
+            yield issues
+
+def extract_data(config, max_results, updated_since=None, session=None, throttle=None):
+    return {"issues": [issue for page in iter_issue_pages(config, max_results, updated_since, session, throttle) for issue in page]}
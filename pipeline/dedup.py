@@ -0,0 +1,144 @@
+# pipeline/dedup.py
+# Groups near-duplicate issues so only one representative per group is sent for classification.
+
+import hashlib
+import logging
+import re
+import zlib
+from collections import defaultdict
+import numpy as np
+from utils.metrics import metrics
+
+MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+NON_WORD = re.compile(r"[^a-z0-9]+")
+DIGITS = re.compile(r"[0-9]+")
+# MinHash signatures are built from the leading words only, which bounds their cost on
+# pasted logs; the exact-match digest always covers the whole text
+SIGNATURE_MAX_CHARS = 20000
+
+def normalize_text(summary, description, max_chars=None):
+    # Lowercase, collapse numbers and punctuation, so "Restore backup #4512 on db-07"
+    # and "Restore backup #4513 on db-08" normalize to the same words
+    text = " ".join(value for value in (summary, description) if isinstance(value, str))
+    if max_chars is not None:
+        text = text[:max_chars]
+    return NON_WORD.sub(" ", DIGITS.sub("0", text.lower())).split()
+
+def leading_words(words, max_chars):
+    # The words of the first max_chars characters of the normalized text
+    total = 0
+    for count, word in enumerate(words):
+        total += len(word) + 1
+        if total > max_chars:
+            return words[:count]
+    return words
+
+def shingles(words, size=3):
+    if len(words) <= size:
+        return {" ".join(words)}
+    return {" ".join(words[index:index + size]) for index in range(len(words) - size + 1)}
+
+def choose_bands(num_perm, threshold):
+    # Picks the LSH band layout whose candidate threshold (1/bands)^(1/rows) is closest to,
+    # but not above, the similarity threshold; candidates are verified afterwards anyway
+    layouts = [(num_perm // rows, rows) for rows in range(1, num_perm + 1) if num_perm % rows == 0]
+    below = [layout for layout in layouts if (1 / layout[0]) ** (1 / layout[1]) <= threshold]
+    return max(below or layouts[:1], key=lambda layout: (1 / layout[0]) ** (1 / layout[1]))
+
+class NearDuplicateIndex:
+    # MinHash signatures over word 3-grams of the normalized Summary and Description,
+    # bucketed with LSH. Issues whose estimated Jaccard similarity to an earlier
+    # representative is at least `threshold` reuse that representative's category.
+    # Identical normalized text is matched by hash before any MinHash work. The index
+    # lives for a whole run, so duplicates in later windows reuse earlier results.
+    def __init__(self, threshold=0.9, num_perm=64, seed=1):
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands, self.band_rows = choose_bands(num_perm, threshold)
+        rng = np.random.default_rng(seed)
+        self.a = rng.integers(1, 1 << 32, num_perm, dtype=np.uint64)
+        self.b = rng.integers(0, 1 << 32, num_perm, dtype=np.uint64)
+        self.exact = {}
+        self.buckets = defaultdict(list)
+        self.signatures = []
+        self.categories = []
+        self.seen = 0
+        self.saved = 0
+
+    @classmethod
+    def from_config(cls, settings=None):
+        settings = settings or {}
+        if not settings.get('enabled', False):
+            return None
+        return cls(threshold=settings.get('threshold', 0.9), num_perm=settings.get('num_perm', 64))
+
+    def signature(self, words):
+        hashes = np.array([zlib.crc32(shingle.encode()) for shingle in shingles(words)], dtype=np.uint64)
+        return ((np.outer(hashes, self.a) + self.b) % MERSENNE_PRIME).min(axis=0)
+
+    def band_keys(self, signature):
+        rows = self.band_rows
+        return [(band, signature[band * rows:(band + 1) * rows].tobytes()) for band in range(self.bands)]
+
+    def find(self, digest, signature):
+        # Returns the id of a matching representative, or None
+        if digest in self.exact:
+            return self.exact[digest]
+        candidates = {candidate for key in self.band_keys(signature) for candidate in self.buckets.get(key, ())}
+        best, best_similarity = None, self.threshold
+        for candidate in candidates:
+            similarity = float(np.mean(self.signatures[candidate] == signature))
+            if similarity >= best_similarity:
+                best, best_similarity = candidate, similarity
+        return best
+
+    def add(self, digest, signature):
+        representative = len(self.signatures)
+        self.signatures.append(signature)
+        self.categories.append(None)
+        self.exact[digest] = representative
+        for key in self.band_keys(signature):
+            self.buckets[key].append(representative)
+        return representative
+
+    def classify(self, rows, classify):
+        # Yields a category per row in order. `classify` is called once with the rows that
+        # have no earlier near-duplicate and must yield their categories in order. Rows
+        # given a near-duplicate's category get Category_Source "dedup".
+        assigned = []
+        leaders = []
+        window = set()
+        for row in rows:
+            words = normalize_text(row.get('Summary'), row.get('Description'))
+            digest = hashlib.blake2b(" ".join(words).encode(), digest_size=16).digest()
+            signature = self.signature(leading_words(words, SIGNATURE_MAX_CHARS))
+            representative = self.find(digest, signature)
+            # A representative from an earlier window without a category was Unclassified
+            if representative is None or (self.categories[representative] is None and representative not in window):
+                representative = self.add(digest, signature)
+                window.add(representative)
+                leaders.append(row)
+                assigned.append((row, representative, True))
+            else:
+                assigned.append((row, representative, False))
+        results = classify(leaders)
+        for row, representative, is_leader in assigned:
+            self.seen += 1
+            if is_leader:
+                category = next(results)
+                # An Unclassified result is not reused, so the next duplicate is tried again
+                self.categories[representative] = category if category != "Unclassified" else None
+                yield category
+            else:
+                self.saved += 1
+                metrics.increment("llm_calls_saved", reason="dedup")
+                row['Category_Source'] = "dedup"
+                yield self.categories[representative] or "Unclassified"
+
+    def report(self):
+        rate = self.saved / self.seen if self.seen else 0.0
+        logging.info(
+            f"Dedup reused a near-duplicate's category for {self.saved} of {self.seen} issues "
+            f"({rate:.1%}, {self.saved} classification calls saved; threshold {self.threshold})."
+        )
+        return {"seen": self.seen, "saved": self.saved, "representatives": len(self.signatures)}
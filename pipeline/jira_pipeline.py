@@ -1,29 +1,35 @@
 # This is the main pipeline script, moved from the project root.
 # All pipeline logic is here.
 
+# Provider SDKs, pandas, numpy and requests are imported where they are first needed,
+# so listing snapshots or printing --help does not pay for them. Keep it that way:
+# tests/test_imports.py fails if they are imported with this module.
 import argparse
 import yaml
-import requests
-import pandas as pd
 from datetime import datetime
 import logging
-import anthropic
 from dotenv import load_dotenv
 import os
 import warnings
-from openai import OpenAI
 import glob
 import json
 import time
 import sys
 from dataclasses import dataclass
 from typing import List, Optional
-import boto3
-from botocore.exceptions import BotoCoreError, ClientError
-from llm.openai_provider import OpenAIClassifier
-from llm.claude_provider import ClaudeClassifier
-from llm.bedrock_provider import BedrockClassifier
-from pipeline.data_processing import process_data, extract_data, get_access_token
+from concurrent.futures import ThreadPoolExecutor
+from llm import get_provider
+from llm.prompts import PromptBuilder
+from pipeline.classification_cache import open_classification_cache
+from pipeline.checkpoint import CheckpointWriter
+from pipeline.sources import jira_sources, merge_page_streams, namespace_issues, namespace_pages, site_key_prefix
+from pipeline.snapshots import (
+    SnapshotWriter, list_raw_data_files, load_snapshot, iter_snapshot_pages, iter_chunks,
+    load_watermark, save_watermark, watermark_key, jql_updated_since, merge_issues,
+    is_multi_selection, resolve_snapshot_selection, process_snapshots
+)
+from utils.rate_limit import Throttle
+from utils.metrics import metrics
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -31,23 +37,15 @@ logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(
 # Load environment variables
 load_dotenv()
 
-# Helper function to update .env file
-def update_env_file(key, value):
-    with open(".env", "r") as file:
-        lines = file.readlines()
-    with open(".env", "w") as file:
-        for line in lines:
-            if line.startswith(f"{key}="):
-                file.write(f"{key}={value}\n")
-            else:
-                file.write(line)
-
 def main():
     parser = argparse.ArgumentParser(description="JIRA Data Extraction and Processing Pipeline")
     parser.add_argument("--config", default="config/config.yaml", help="Path to the configuration file (YAML or JSON). Defaults to 'config/config.yaml'.")
     parser.add_argument("--interactive", action="store_true", help="Run the script in interactive mode, requiring user confirmation to proceed.")
     parser.add_argument("--max-results", type=int, default=50, help="Maximum number of results to fetch from JIRA API. Defaults to 50.")
-    parser.add_argument("--select", type=str, help="Directly pass the selection for non-interactive mode.")
+    parser.add_argument("--select", type=str, help="Directly pass the selection for non-interactive mode: 0, a file number, 'all', or a glob of raw extracts.")
+    parser.add_argument("--incremental", action="store_true", help="When extracting (option 0), fetch only issues updated since the last extraction and merge them into its snapshot.")
+    parser.add_argument("--export-csv", action="store_true", help="Rewrite output/processed_issues.csv from the result store at the end of the run.")
+    parser.add_argument("--serve", action="store_true", help="Run as a long-lived service: incremental extractions every service.interval_minutes, with an HTTP status and refresh endpoint.")
     args = parser.parse_args()
 
     if args.interactive:
@@ -58,43 +56,159 @@ def main():
 
     # Load configuration
     config = load_config(args.config)
+    if args.serve:
+        from pipeline.service import PipelineService
+        PipelineService.from_config(config, args.max_results).serve()
+        return
     run_pipeline(args, config)
 
-def run_pipeline(args, config):
+def run_pipeline(args, config, resources=None):
+    # resources is the service's WarmResources (see pipeline/service.py): its classifier,
+    # cache, result store, JIRA session and throttle are used and left open. Without it,
+    # each run opens and closes its own.
+    from pipeline.data_processing import process_data, iter_issue_pages, create_session
+    from pipeline.result_store import open_result_store
+    from pipeline.aggregation import aggregate_store
+    metrics.reset()
     raw_data_path = config['output']['raw_data_path']
+    processing = config.get('processing', {})
+    chunk_size = processing.get('chunk_size', 1000)
     selection = args.select if args.select else select_raw_data_file(raw_data_path)
+    reclassify_keys = set()
+    snapshot_writers = []
+    session = None
+    page_stream = None
+    chunks = None
 
     if selection == "0":
-        # Extract data from JIRA
-        jira_data = extract_data(config, args.max_results)
-        # Store raw data in a JSON file
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        raw_filename = f"jira_raw_data_{timestamp}.json"
-        with open(f"{raw_data_path}/{raw_filename}", "w") as json_file:
-            json.dump(jira_data, json_file, indent=2)
-        logging.info(f"Raw data stored successfully at {raw_data_path}/{raw_filename}.")
+        # One source per JIRA site; with several, they share one HTTP session and JIRA
+        # throttle (jira.rate_limit, including max_in_flight) and are fetched concurrently
+        sources = jira_sources(config)
+        throttle = None
+        if resources is not None:
+            session, throttle = resources.session, resources.throttle
+        elif len(sources) > 1:
+            session = create_session(sum(max(1, int(source['config']['jira'].get('concurrency', 1))) for source in sources))
+            throttle = Throttle.from_config("JIRA", config['jira'].get('rate_limit'))
+        streams = []
+        for source in sources:
+            if getattr(args, 'incremental', False):
+                pages, changed_keys = extract_incremental(source['config'], args.max_results, chunk_size, session, throttle)
+                reclassify_keys |= changed_keys
+            else:
+                # Extract data from JIRA page by page
+                pages = namespace_pages(
+                    iter_issue_pages(source['config'], args.max_results, session=session, throttle=throttle),
+                    site_key_prefix(source['config'])
+                )
+            # Store raw data as the pages arrive
+            snapshot_writer = SnapshotWriter(raw_data_path, config['output'].get('snapshot_format', "json"), source['name'])
+            snapshot_writers.append((source, snapshot_writer))
+            streams.append(snapshot_writer.write_pages(pages))
+        pages = page_stream = merge_page_streams(streams)
+    elif is_multi_selection(selection):
+        selected_files = resolve_snapshot_selection(selection, raw_data_path)
+        if not selected_files:
+            logging.error(f"No raw extracts match '{selection}'. Exiting.")
+            sys.exit()
+        logging.info(f"Processing {len(selected_files)} raw extracts.")
+        merged = process_snapshots(
+            selected_files,
+            config['output']['columns'],
+            workers=processing.get('snapshot_workers'),
+            description_max_chars=processing.get('description_max_chars'),
+            compact=processing.get('compact', False)
+        )
+        chunks = (merged.iloc[start:start + chunk_size] for start in range(0, len(merged), chunk_size))
     else:
         try:
-            selected_file = glob.glob(f"{raw_data_path}/jira_raw_data_*.json")[int(selection) - 1]
+            selected_file = list_raw_data_files(raw_data_path)[int(selection) - 1]
             logging.info(f"Using existing raw extract: {selected_file}")
-            with open(selected_file, "r") as json_file:
-                jira_data = json.load(json_file)
+            pages = iter_snapshot_pages(selected_file, chunk_size)
         except (IndexError, ValueError):
             logging.error("Invalid selection. Exiting.")
             sys.exit()
 
-    # Process data
-    processed_data = process_data(jira_data)
-    # Classify issues
-    classified_data = classify_issues(processed_data, config)
+    compact = processing.get('compact', False)
+
+    def description_keys(page):
+        # In compact mode only issues that are going to be classified get a Description
+        if not compact:
+            return None
+        keys = {issue['key'] for issue in page}
+        return keys - (store.existing_keys(keys) - reclassify_keys)
+
+    if chunks is None:
+        # Process and classify each page as it arrives
+        chunks = (
+            process_data(
+                {"issues": page},
+                config['output']['columns'],
+                description_max_chars=processing.get('description_max_chars'),
+                adf_workers=processing.get('adf_workers', 1),
+                compact=compact,
+                description_keys=description_keys(page)
+            )
+            for page in pages if page
+        )
+    store = resources.store if resources is not None else open_result_store(config, PROCESSED_ISSUES_FILE)
+    try:
+        # Issues whose Summary or Description changed are classified again
+        classified_count = sum(len(rows) for rows in classify_issue_chunks(chunks, config, store, reclassify_keys, resources))
+        # Rewriting the CSV reads the whole store, so it only runs when asked for
+        if getattr(args, 'export_csv', False) or (config['output'].get('result_store') or {}).get('export_csv', False):
+            with metrics.stage("csv_export"):
+                store.export_csv(PROCESSED_ISSUES_FILE, config['output']['columns'])
+        with metrics.stage("aggregate"):
+            aggregate_store(store, config)
+    except BaseException:
+        if page_stream is not None:
+            # Stops the extraction threads before their snapshots are closed
+            page_stream.close()
+        for _, snapshot_writer in snapshot_writers:
+            snapshot_writer.abort()
+        write_run_report(config, "failed")
+        raise
+    finally:
+        if resources is None:
+            store.close()
+            if session is not None:
+                session.close()
+    logging.info(f"Classified {classified_count} issues.")
+    for source, snapshot_writer in snapshot_writers:
+        raw_file = snapshot_writer.close()
+        if snapshot_writer.max_updated:
+            save_watermark(raw_data_path, watermark_key(source['config']['filters']), snapshot_writer.max_updated, raw_file)
+    write_run_report(config, "succeeded")
+    return classified_count
+
+def write_run_report(config, status):
+    # JSON run report and optional Prometheus text file (see the metrics config section)
+    settings = config.get('metrics') or {}
+    report_path = settings.get('report_path', os.path.join(config['output'].get('path', "./output"), "run_report.json"))
+    metrics.write(report_path, settings.get('prometheus_path'), status=status)
+    logging.info(f"Run report written to {report_path}.")
 
-def select_raw_data_file(raw_data_path):
-    existing_files = glob.glob(f"{raw_data_path}/jira_raw_data_*.json")
-    print("Existing raw extracts:")
-    for idx, file in enumerate(existing_files, start=1):
-        print(f"{idx}. {os.path.basename(file)}")
-    print("0. Start extracting from scratch")
-    return input("Select an option (0 to start from scratch or file number): ")
+def extract_incremental(config, max_results, chunk_size=1000, session=None, throttle=None):
+    from pipeline.data_processing import extract_data, iter_issue_pages
+    # Fetches only issues updated since the filter's watermark and merges them into the
+    # snapshot the watermark came from. Falls back to a full extraction without one.
+    # Returns an iterable of issue pages and the keys that need classifying again.
+    raw_data_path = config['output']['raw_data_path']
+    watermark = load_watermark(raw_data_path, watermark_key(config['filters']))
+    if not watermark or not os.path.exists(watermark['snapshot']):
+        logging.info("No watermark found for this filter. Running a full extraction.")
+        return namespace_pages(iter_issue_pages(config, max_results, session=session, throttle=throttle), site_key_prefix(config)), set()
+    overlap_minutes = config.get('incremental', {}).get('overlap_minutes', 1440)
+    since = jql_updated_since(watermark['updated'], overlap_minutes)
+    logging.info(f"Extracting issues updated since {since} and merging into {watermark['snapshot']}.")
+    delta = extract_data(config, max_results, updated_since=since, session=session, throttle=throttle)
+    # The previous snapshot already holds namespaced keys for a named site
+    delta['issues'] = namespace_issues(delta['issues'], site_key_prefix(config))
+    previous = load_snapshot(watermark['snapshot'])
+    merged_issues, changed_keys = merge_issues(previous.get('issues', []), delta['issues'])
+    logging.info(f"Fetched {len(delta['issues'])} updated issues; {len(changed_keys)} have a new or changed Summary/Description.")
+    return iter_chunks(merged_issues, chunk_size), changed_keys
 
 def load_config(config_path):
     with open(config_path, 'r') as file:
@@ -113,79 +227,214 @@ def load_config(config_path):
             'Project', 'Key', 'Updated', 'Created', 'Summary', 'Description',
             'Issue Type', 'Status', 'Resolution', 'Assignee'
         ]
+    if (config.get('aggregation') or {}).get('enabled', False):
+        # Imported only when cubes are configured, since it loads pandas
+        from pipeline.aggregation import check_rollups
+        check_rollups(config)
     return config
 
 def refresh_access_token():
-    url = "https://auth.atlassian.com/oauth/token"
-    payload = {
-        "grant_type": "refresh_token",
-        "client_id": os.getenv("JIRA_CLIENT_ID"),
-        "client_secret": os.getenv("JIRA_CLIENT_SECRET"),
-        "refresh_token": os.getenv("JIRA_REFRESH_TOKEN")
-    }
-    headers = {"Content-Type": "application/json"}
-    try:
-        response = requests.post(url, json=payload, headers=headers)
-        response.raise_for_status()
-        tokens = response.json()
-        access_token = tokens["access_token"]
-        refresh_token = tokens["refresh_token"]
-        expires_in = tokens.get("expires_in", 3600)
-        expires_at = int(time.time()) + expires_in
-        os.environ["JIRA_ACCESS_TOKEN"] = access_token
-        os.environ["JIRA_REFRESH_TOKEN"] = refresh_token
-        os.environ["JIRA_TOKEN_EXPIRES_AT"] = str(expires_at)
-        update_env_file("JIRA_ACCESS_TOKEN", access_token)
-        update_env_file("JIRA_REFRESH_TOKEN", refresh_token)
-        update_env_file("JIRA_TOKEN_EXPIRES_AT", str(expires_at))
-        logging.info("Access token refreshed successfully.")
-        return access_token
-    except requests.exceptions.RequestException as e:
-        if hasattr(e, 'response') and e.response is not None:
-            logging.error(f"Response status: {e.response.status_code}")
-            logging.error(f"Response body: {e.response.text}")
-        logging.error(f"Error refreshing access token: {e}")
-        raise
+    # Refreshes the shared token provider's token and persists it to .env in one write
+    from pipeline.auth import get_token_provider
+    return get_token_provider().refresh()
+
+def classify_rows(classifier, rows, categories, model_name, concurrency=1, batch_size=1):
+    # Yields one category per row, in the same order as rows, as soon as each is known.
+    # Rows are grouped into batches of batch_size issues per LLM request; with
+    # concurrency > 1 the blocking requests run on a bounded thread pool and
+    # executor.map keeps results aligned with their input rows regardless of
+    # completion order.
+    total_issues = len(rows)
+    batch_size = max(1, batch_size)
+    batches = [rows[start:start + batch_size] for start in range(0, total_issues, batch_size)]
+
+    def classify_batch(position, batch):
+        with metrics.stage("classify_call", items=len(batch)):
+            return request_batch(position, batch)
+
+    def request_batch(position, batch):
+        remaining = total_issues - position * batch_size - len(batch)
+        if len(batch) == 1:
+            row = batch[0]
+            logging.info(f"Classifying issue {row['Key']}. {remaining} issues remain in this window.")
+            return [classifier.classify(
+                summary=row['Summary'],
+                description=row['Description'],
+                categories=categories,
+                model=model_name
+            )]
+        logging.info(f"Classifying batch of {len(batch)} issues starting at {batch[0]['Key']}. {remaining} issues remain in this window.")
+        results = classifier.classify_batch(
+            issues=[{'Key': row['Key'], 'Summary': row['Summary'], 'Description': row['Description']} for row in batch],
+            categories=categories,
+            model=model_name
+        )
+        return [results.get(row['Key'], "Unclassified") for row in batch]
 
-def classify_issues(data, config):
+    if concurrency <= 1:
+        for position, batch in enumerate(batches):
+            yield from classify_batch(position, batch)
+    else:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            for batch_result in executor.map(classify_batch, range(len(batches)), batches):
+                yield from batch_result
+
+def classify_rows_cached(cache, classifier, rows, categories, model_name, concurrency=1, batch_size=1):
+    # Like classify_rows, but rows whose content is already in the classification cache
+    # are answered from it and only the misses reach the LLM.
+    if cache is None:
+        yield from classify_rows(classifier, rows, categories, model_name, concurrency, batch_size)
+        return
+    cached = [cache.get(row['Summary'], row['Description']) for row in rows]
+    pending = [row for row, category in zip(rows, cached) if category is None]
+    logging.info(f"{len(rows) - len(pending)} of {len(rows)} issues served from the classification cache.")
+    results = classify_rows(classifier, pending, categories, model_name, concurrency, batch_size)
+    for row, category in zip(rows, cached):
+        if category is None:
+            category = next(results)
+            if category != "Unclassified":
+                cache.put_many([(row['Summary'], row['Description'], category)])
+        yield category
+
+def preclassify_rows(preclassifier, cache, classifier, rows, categories, model_name, concurrency=1, batch_size=1):
+    # Like classify_rows_cached, but rows the local pre-classifier is confident about
+    # are labelled locally, with Category_Source "preclassifier", and only the rest
+    # reach the cache and the LLM.
+    labelled, routed, guesses = preclassifier.split(rows)
+    results = classify_rows_cached(cache, classifier, [rows[position] for position in routed], categories, model_name, concurrency, batch_size)
+    for position in range(len(rows)):
+        if position in labelled:
+            rows[position]['Category_Source'] = "preclassifier"
+            yield labelled[position]
+        else:
+            category = next(results)
+            preclassifier.record_agreement(guesses[position], category)
+            yield category
+
+PROCESSED_ISSUES_FILE = "output/processed_issues.csv"
+
+def create_classifier(config):
     llm_provider = config['classification']['llm_provider']
     llm_api_key = config['classification'].get('llm_api_key')
+    model_name = config['classification'].get('model')
+    throttle = Throttle.from_config(llm_provider, config['classification'].get('rate_limit'))
+    prompt_builder = PromptBuilder.from_config(config['classification'].get('prompt'))
+    # Only the selected provider's module and SDK are imported
+    provider = get_provider(llm_provider)
+    options = {'model': model_name or provider['default_model'], 'throttle': throttle, 'prompt_builder': prompt_builder}
+    if provider['api_key']:
+        options['api_key'] = llm_api_key
+    if config['classification'].get('base_url'):
+        # An OpenAI-compatible gateway, a proxy or a local stand-in server
+        options['base_url'] = config['classification']['base_url']
+    return provider['load']()(**options)
+
+def load_processed_issues(config):
+    from pipeline.result_store import open_result_store
+    store = open_result_store(config, PROCESSED_ISSUES_FILE)
+    try:
+        return store.load()
+    finally:
+        store.close()
+
+def classify_issue_chunks(chunks, config, store, reclassify_keys=None, resources=None):
+    # Classifies a stream of processed DataFrame chunks and yields the newly classified
+    # rows as lists of dicts. Rows are regrouped into windows big enough to keep every
+    # worker busy, so memory is bounded by the window rather than the dataset.
+    # Keys already in the store are skipped unless listed in reclassify_keys (their other
+    # columns are refreshed), and a Key repeated across chunks is classified once. With resources, the warm classifier and
+    # cache are used and the cache is left open.
+    from pipeline.preclassifier import LocalPreClassifier, TRAINING_COLUMNS
+    from pipeline.dedup import NearDuplicateIndex
+    from pipeline.data_processing import render_compact_frame
+    classifier = resources.classifier if resources is not None else create_classifier(config)
+    # A warm classifier's prompt builder outlives the run; its prompt sizes are logged per run
+    classifier.prompt_builder.metrics.reset()
     categories = config['classification']['categories']
     model_name = config['classification'].get('model')
-    if llm_provider == "openai":
-        classifier = OpenAIClassifier(api_key=llm_api_key, model=model_name or "gpt-3.5-turbo")
-    elif llm_provider == "claude":
-        classifier = ClaudeClassifier(api_key=llm_api_key, model=model_name or "claude-v1")
-    elif llm_provider == "bedrock":
-        classifier = BedrockClassifier(model=model_name or "anthropic.claude-instant-v1")
-    else:
-        raise ValueError("Unsupported LLM provider")
-    processed_issues_file = "output/processed_issues.csv"
-    if os.path.exists(processed_issues_file):
-        processed_issues = pd.read_csv(processed_issues_file)
-    else:
-        processed_issues = pd.DataFrame(columns=config['output']['columns'])
-    processed_keys = set(processed_issues['Key'])
-    unprocessed_data = data[~data['Key'].isin(processed_keys)]
-    total_issues = len(unprocessed_data)
-    logging.info(f"Starting classification for {total_issues} issues.")
-    for idx, row in unprocessed_data.iterrows():
-        issue_key = row['Key']
-        logging.info(f"Classifying issue {issue_key}. {total_issues - idx - 1} issues remain.")
-        row['Category'] = classifier.classify(
-            summary=row['Summary'],
-            description=row['Description'],
-            categories=categories,
-            model=model_name
-        )
-        if row['Category'] != "Unclassified":
-            processed_issues = pd.concat([
-                processed_issues,
-                pd.DataFrame([row], columns=config['output']['columns'])
-            ], ignore_index=True)
-    processed_issues.to_csv(processed_issues_file, index=False)
+    concurrency = max(1, int(config['classification'].get('concurrency', 1)))
+    batch_size = max(1, int(config['classification'].get('batch_size', 1)))
+    window = concurrency * batch_size * 4
+    logging.info(f"Starting classification with concurrency {concurrency} and batch size {batch_size}.")
+    checkpoint_config = config['classification'].get('checkpoint') or {}
+    checkpoint = CheckpointWriter(
+        store,
+        every_n=checkpoint_config.get('every_n_issues', 100),
+        every_seconds=checkpoint_config.get('every_seconds', 60)
+    )
+    cache = resources.cache if resources is not None else open_classification_cache(config)
+    preclassifier_config = config['classification'].get('preclassifier') or {}
+    # Trained on the few columns it uses rather than the whole stored history
+    preclassifier = LocalPreClassifier.from_config(
+        store.load(TRAINING_COLUMNS) if preclassifier_config.get('enabled') else None,
+        categories,
+        preclassifier_config
+    )
+    dedup = NearDuplicateIndex.from_config(config['classification'].get('dedup'))
+
+    def classify_unique(rows):
+        if preclassifier is None:
+            return classify_rows_cached(cache, classifier, rows, categories, model_name, concurrency, batch_size)
+        return preclassify_rows(preclassifier, cache, classifier, rows, categories, model_name, concurrency, batch_size)
+
+    def classify_window(rows):
+        logging.info(f"Classifying {len(rows)} unprocessed issues.")
+        classified = []
+        # The pre-classifier and dedup mark the rows they label as they yield them
+        for row in rows:
+            row['Category_Source'] = "llm"
+        categories_by_row = classify_unique(rows) if dedup is None else dedup.classify(rows, classify_unique)
+        for row, category in zip(rows, categories_by_row):
+            row['Category'] = category
+            if category != "Unclassified":
+                classified.append(row)
+                checkpoint.add(row)
+        metrics.increment("issues_classified", len(classified))
+        metrics.increment("issues_unclassified", len(rows) - len(classified))
+        return classified
+
+    reclassify_keys = set(reclassify_keys or ())
+    seen_keys = set()
+    try:
+        pending = []
+        for chunk in chunks:
+            done = store.existing_keys(chunk['Key']) - reclassify_keys
+            # Issues already classified still get their new Status, Resolution, Resolved
+            # and Updated, so the capacity cubes see them resolve
+            stored = chunk[chunk['Key'].isin(done)]
+            if len(stored):
+                with metrics.stage("store_refresh", items=len(stored)):
+                    metrics.increment("issues_refreshed", store.refresh_many(render_compact_frame(stored).to_dict('records')))
+            # Compact chunks hold datetime64 timestamps; rows carry the ISO text the stores use
+            rows = render_compact_frame(chunk[~chunk['Key'].isin(done) & ~chunk['Key'].isin(seen_keys)]).to_dict('records')
+            seen_keys.update(row['Key'] for row in rows)
+            pending.extend(rows)
+            if len(pending) >= window:
+                yield classify_window(pending)
+                pending = []
+        if pending:
+            yield classify_window(pending)
+    finally:
+        checkpoint.flush()
+        if cache is not None and resources is None:
+            cache.close()
+        logging.info(f"Prompt sizes: {classifier.prompt_builder.metrics.summary()}")
+        if preclassifier is not None:
+            preclassifier.report()
+        if dedup is not None:
+            dedup.report()
     logging.info("Issue classification successful.")
-    return processed_issues
+
+def classify_issues(data, config, reclassify_keys=None):
+    from pipeline.result_store import open_result_store
+    # Issues whose Summary or Description changed are classified again
+    store = open_result_store(config, PROCESSED_ISSUES_FILE)
+    try:
+        for _ in classify_issue_chunks([data], config, store, reclassify_keys):
+            pass
+        return store.load(config['output']['columns'])
+    finally:
+        store.close()
 
 if __name__ == "__main__":
     main()
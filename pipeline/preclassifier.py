@@ -0,0 +1,145 @@
+# pipeline/preclassifier.py
+# Local first-stage classifier that labels confidently categorizable issues without an LLM call.
+
+import logging
+import math
+import re
+import threading
+from collections import Counter
+import numpy as np
+from utils.metrics import metrics
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+# The result store columns training reads
+TRAINING_COLUMNS = ['Summary', 'Issue Type', 'Project', 'Category', 'Category_Source']
+
+def issue_features(row):
+    # Summary words plus the issue type and project as their own features
+    summary = row.get('Summary')
+    tokens = TOKEN_PATTERN.findall(summary.lower()) if isinstance(summary, str) else []
+    for column, prefix in (('Issue Type', 'type'), ('Project', 'project')):
+        value = row.get(column)
+        if isinstance(value, str) and value:
+            tokens.append(f"{prefix}={value.lower()}")
+    return tokens
+
+class LocalPreClassifier:
+    # Multinomial naive Bayes over TF-IDF weighted features: a linear model whose
+    # posterior probability is used as the confidence. Only predictions at or above
+    # min_confidence are used; everything else goes to the LLM. A held-out fifth of
+    # the training rows checks that confident predictions are at least min_precision
+    # accurate, otherwise the pre-classifier disables itself for the run.
+    def __init__(self, min_confidence=0.95, min_precision=0.9, alpha=0.1):
+        self.min_confidence = min_confidence
+        self.min_precision = min_precision
+        self.alpha = alpha
+        self.enabled = False
+        self.lock = threading.Lock()
+        self.deflected = 0
+        self.routed = 0
+        self.compared = 0
+        self.agreed = 0
+
+    @classmethod
+    def from_config(cls, processed_issues, categories, settings=None):
+        # Returns a trained pre-classifier, or None when it is disabled or lacks training data
+        settings = settings or {}
+        if not settings.get('enabled', False) or processed_issues is None:
+            return None
+        names = {category['Name'] if isinstance(category, dict) else category for category in categories}
+        labelled = processed_issues[processed_issues['Category'].isin(names)]
+        if 'Category_Source' in labelled.columns:
+            # Only LLM labels, so the model never learns from (or is checked against) its
+            # own earlier guesses. Rows stored before sources were recorded count as LLM.
+            labelled = labelled[labelled['Category_Source'].isna() | (labelled['Category_Source'] == "llm")]
+        min_training_rows = settings.get('min_training_rows', 200)
+        if len(labelled) < min_training_rows:
+            logging.info(f"Pre-classifier needs {min_training_rows} labelled issues, found {len(labelled)}. Skipping it.")
+            return None
+        preclassifier = cls(
+            min_confidence=settings.get('min_confidence', 0.95),
+            min_precision=settings.get('min_precision', 0.9)
+        )
+        preclassifier.fit(labelled.to_dict('records'))
+        return preclassifier if preclassifier.enabled else None
+
+    def fit(self, rows):
+        holdout = rows[::5]
+        training = [row for index, row in enumerate(rows) if index % 5]
+        self._train(training)
+        confident = [(self.predict(row), row['Category']) for row in holdout]
+        confident = [(category, label) for (category, confidence), label in confident if confidence >= self.min_confidence]
+        precision = sum(category == label for category, label in confident) / len(confident) if confident else 0.0
+        coverage = len(confident) / len(holdout) if holdout else 0.0
+        self.enabled = precision >= self.min_precision and bool(confident)
+        logging.info(
+            f"Pre-classifier holdout: {precision:.1%} precision at {coverage:.1%} coverage "
+            f"(confidence >= {self.min_confidence}). {'Enabled' if self.enabled else 'Disabled'}."
+        )
+        # Use every labelled row for the model that actually runs
+        self._train(rows)
+
+    def _train(self, rows):
+        documents = [Counter(issue_features(row)) for row in rows]
+        document_frequency = Counter(token for document in documents for token in document)
+        self.vocabulary = {token: index for index, token in enumerate(document_frequency)}
+        self.classes = sorted({row['Category'] for row in rows})
+        class_index = {category: index for index, category in enumerate(self.classes)}
+        self.idf = np.array([math.log((1 + len(documents)) / (1 + document_frequency[token])) + 1 for token in self.vocabulary])
+        weights = np.zeros((len(self.classes), len(self.vocabulary)))
+        class_counts = np.zeros(len(self.classes))
+        for document, row in zip(documents, rows):
+            target = class_index[row['Category']]
+            class_counts[target] += 1
+            for token, count in document.items():
+                weights[target, self.vocabulary[token]] += (1 + math.log(count)) * self.idf[self.vocabulary[token]]
+        smoothed = weights + self.alpha
+        self.log_likelihood = np.log(smoothed / smoothed.sum(axis=1, keepdims=True))
+        self.log_prior = np.log(class_counts / class_counts.sum())
+
+    def predict(self, row):
+        # Returns (category, confidence)
+        document = Counter(token for token in issue_features(row) if token in self.vocabulary)
+        if not document:
+            return None, 0.0
+        indices = np.array([self.vocabulary[token] for token in document])
+        values = np.array([(1 + math.log(count)) * self.idf[self.vocabulary[token]] for token, count in document.items()])
+        scores = self.log_prior + self.log_likelihood[:, indices] @ values
+        probabilities = np.exp(scores - scores.max())
+        probabilities /= probabilities.sum()
+        best = int(probabilities.argmax())
+        return self.classes[best], float(probabilities[best])
+
+    def split(self, rows):
+        # Returns ({position: category} for confidently labelled rows, positions of the
+        # rows that still need the LLM, {position: local guess} for those rows)
+        labelled, routed, guesses = {}, [], {}
+        for position, row in enumerate(rows):
+            category, confidence = self.predict(row)
+            if category is not None and confidence >= self.min_confidence:
+                labelled[position] = category
+            else:
+                routed.append(position)
+                guesses[position] = category
+        with self.lock:
+            self.deflected += len(labelled)
+            self.routed += len(routed)
+        metrics.increment("llm_calls_saved", len(labelled), reason="preclassifier")
+        return labelled, routed, guesses
+
+    def record_agreement(self, guess, llm_category):
+        if guess is None or llm_category == "Unclassified":
+            return
+        with self.lock:
+            self.compared += 1
+            self.agreed += int(guess == llm_category)
+
+    def report(self):
+        total = self.deflected + self.routed
+        deflection = self.deflected / total if total else 0.0
+        agreement = self.agreed / self.compared if self.compared else 0.0
+        logging.info(
+            f"Pre-classifier labelled {self.deflected} of {total} issues locally ({deflection:.1%} deflection). "
+            f"Its best guess agreed with the LLM on {self.agreed} of {self.compared} routed issues ({agreement:.1%})."
+        )
+        return {"deflected": self.deflected, "routed": self.routed, "deflection_rate": deflection, "agreement_rate": agreement}
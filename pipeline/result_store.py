@@ -0,0 +1,239 @@
+# pipeline/result_store.py
+# Stores of classified issues: an indexed SQLite store (default) and the legacy append-only CSV.
+
+import csv
+import logging
+import os
+import sqlite3
+import pandas as pd
+
+# SQLite limits the number of bound parameters per statement
+KEY_QUERY_BATCH = 500
+# Where each Category came from: "llm" (including classification cache hits),
+# "preclassifier" or "dedup" (copied from a near-duplicate). Always stored, so the
+# pre-classifier can train on LLM labels only.
+SOURCE_COLUMN = 'Category_Source'
+# Columns refresh_many keeps: the classification and the text it was derived from.
+# Changed text is classified again instead (see merge_issues).
+KEPT_COLUMNS = ('Key', 'Summary', 'Description', 'Category', SOURCE_COLUMN)
+
+def ensure_directory(path):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+def quote(column):
+    return '"' + column.replace('"', '""') + '"'
+
+def sql_value(value):
+    # NaN and NaT from pandas become NULL
+    return None if value is None or (not isinstance(value, str) and pd.isna(value)) else value
+
+class SQLiteResultStore:
+    # One row per Key, with Key as the primary key. Re-classified issues replace their
+    # previous row, and key lookups use the index instead of reading the history.
+    def __init__(self, path, columns, import_csv=None):
+        self.path = path
+        ensure_directory(path)
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("CREATE TABLE IF NOT EXISTS issues (\"Key\" TEXT PRIMARY KEY)")
+        self.columns = [row[1] for row in self.connection.execute("PRAGMA table_info(issues)")]
+        self.add_columns(columns)
+        if import_csv and os.path.exists(import_csv) and self.count() == 0:
+            self.import_csv(import_csv)
+
+    def add_columns(self, columns):
+        for column in columns:
+            if column not in self.columns:
+                self.connection.execute(f"ALTER TABLE issues ADD COLUMN {quote(column)} TEXT")
+                self.columns.append(column)
+        self.connection.commit()
+
+    def import_csv(self, path, chunk_size=10000):
+        # One-off migration from an existing processed issues CSV; later rows win
+        imported = 0
+        for chunk in pd.read_csv(path, chunksize=chunk_size, dtype=str):
+            self.upsert_many(chunk.to_dict('records'))
+            imported += len(chunk)
+        logging.info(f"Imported {imported} classified issues from {path} into {self.path}.")
+
+    def upsert_many(self, rows):
+        if not rows:
+            return
+        # Only the configured output columns are stored, like the CSV
+        columns = self.columns
+        statement = (
+            f"INSERT INTO issues ({', '.join(map(quote, columns))}) VALUES ({', '.join('?' * len(columns))}) "
+            f"ON CONFLICT(\"Key\") DO UPDATE SET "
+            + ", ".join(f"{quote(column)} = excluded.{quote(column)}" for column in columns if column != 'Key')
+        )
+        self.connection.executemany(statement, [[sql_value(row.get(column)) for column in columns] for row in rows])
+        self.connection.commit()
+
+    def refresh_many(self, rows):
+        # Updates the other columns (Status, Resolution, Resolved, Updated, ...) of issues
+        # already stored, keeping their Category. Unchanged rows are not written.
+        # Returns the number of rows updated.
+        columns = [column for column in self.columns if column not in KEPT_COLUMNS]
+        if not rows or not columns:
+            return 0
+        statement = (
+            f"UPDATE issues SET {', '.join(f'{quote(column)} = ?' for column in columns)} "
+            f"WHERE \"Key\" = ? AND NOT ({' AND '.join(f'{quote(column)} IS ?' for column in columns)})"
+        )
+        parameters = []
+        for row in rows:
+            values = [sql_value(row.get(column)) for column in columns]
+            parameters.append(values + [row['Key']] + values)
+        changes = self.connection.total_changes
+        self.connection.executemany(statement, parameters)
+        self.connection.commit()
+        return self.connection.total_changes - changes
+
+    def existing_keys(self, keys):
+        keys = list(keys)
+        found = set()
+        for start in range(0, len(keys), KEY_QUERY_BATCH):
+            batch = keys[start:start + KEY_QUERY_BATCH]
+            query = f"SELECT \"Key\" FROM issues WHERE \"Key\" IN ({', '.join('?' * len(batch))})"
+            found.update(row[0] for row in self.connection.execute(query, batch))
+        return found
+
+    def count(self):
+        return self.connection.execute("SELECT COUNT(*) FROM issues").fetchone()[0]
+
+    def iter_frames(self, columns=None, chunk_size=10000):
+        selected = [column for column in (columns or self.columns) if column in self.columns]
+        query = f"SELECT {', '.join(map(quote, selected))} FROM issues ORDER BY rowid"
+        yield from pd.read_sql_query(query, self.connection, chunksize=chunk_size)
+
+    def load(self, columns=None):
+        frames = list(self.iter_frames(columns))
+        if not frames:
+            return pd.DataFrame(columns=columns or self.columns)
+        return pd.concat(frames, ignore_index=True)
+
+    def export_csv(self, path, columns=None):
+        # Streams the store to CSV a chunk at a time and swaps it in atomically
+        ensure_directory(path)
+        partial = f"{path}.partial"
+        header = True
+        for frame in self.iter_frames(columns):
+            frame.to_csv(partial, mode="w" if header else "a", header=header, index=False)
+            header = False
+        if header:
+            pd.DataFrame(columns=columns or self.columns).to_csv(partial, index=False)
+        os.replace(partial, path)
+        logging.info(f"Exported classified issues to {path}.")
+
+    def close(self):
+        self.connection.close()
+
+class CSVResultStore:
+    # The original append-only CSV. Re-classified issues are appended again and readers
+    # keep the last row per Key, so key lookups read the Key column of the whole file.
+    def __init__(self, path, columns):
+        self.path = path
+        self.header_written = os.path.exists(path) and os.path.getsize(path) > 0
+        if self.header_written:
+            # Keep appending in the column order of the existing file
+            with open(path, newline="") as file:
+                self.columns = next(csv.reader(file))
+            if SOURCE_COLUMN in columns and SOURCE_COLUMN not in self.columns:
+                self.add_column(SOURCE_COLUMN)
+        else:
+            ensure_directory(path)
+            self.columns = list(columns)
+        self.keys = None
+        # {Key: hash of the columns refresh_many updates}, read on its first call
+        self.fields = None
+
+    def add_column(self, column, chunk_size=10000):
+        # One-off rewrite of a file that predates the column; existing rows get no value
+        partial = f"{self.path}.partial"
+        header = True
+        for chunk in pd.read_csv(self.path, dtype=str, chunksize=chunk_size):
+            chunk.assign(**{column: None}).to_csv(partial, mode="w" if header else "a", header=header, index=False)
+            header = False
+        if header:
+            pd.DataFrame(columns=self.columns + [column]).to_csv(partial, index=False)
+        os.replace(partial, self.path)
+        self.columns.append(column)
+        logging.info(f"Added the {column} column to {self.path}.")
+
+    def field_columns(self):
+        return [column for column in self.columns if column not in KEPT_COLUMNS]
+
+    def field_hashes(self, frame):
+        # Compares values as the CSV reads them back: text, with missing values as None
+        values = frame.reindex(columns=self.field_columns()).astype(object)
+        values = values.where(values.notna(), None).map(lambda value: value if value is None else str(value))
+        return dict(zip(frame['Key'], map(hash, values.itertuples(index=False, name=None))))
+
+    def upsert_many(self, rows):
+        if not rows:
+            return
+        frame = pd.DataFrame(rows).reindex(columns=self.columns)
+        frame.to_csv(self.path, mode="a", header=not self.header_written, index=False)
+        self.header_written = True
+        if self.keys is not None:
+            self.keys.update(frame['Key'])
+        if self.fields is not None:
+            self.fields.update(self.field_hashes(frame))
+
+    def refresh_many(self, rows, chunk_size=10000):
+        # Like SQLiteResultStore.refresh_many. Changed issues are appended again with
+        # their stored Summary, Description and Category, read for those keys only.
+        if not rows or not self.header_written or not self.field_columns():
+            return 0
+        if self.fields is None:
+            self.fields = self.field_hashes(pd.read_csv(self.path, usecols=['Key'] + self.field_columns(), dtype=str))
+        hashes = self.field_hashes(pd.DataFrame(rows))
+        changed = [row for row in rows if row['Key'] in self.fields and self.fields[row['Key']] != hashes[row['Key']]]
+        if not changed:
+            return 0
+        keys = {row['Key'] for row in changed}
+        kept = [column for column in self.columns if column in KEPT_COLUMNS]
+        stored = {}
+        for chunk in pd.read_csv(self.path, usecols=kept, dtype=str, chunksize=chunk_size):
+            stored.update((row['Key'], row) for row in chunk[chunk['Key'].isin(keys)].to_dict('records'))
+        self.upsert_many([dict(row, **stored[row['Key']]) for row in changed])
+        return len(changed)
+
+    def existing_keys(self, keys):
+        if self.keys is None:
+            self.keys = set(pd.read_csv(self.path, usecols=['Key'])['Key']) if self.header_written else set()
+        return self.keys.intersection(keys)
+
+    def count(self):
+        return len(self.load(['Key']))
+
+    def load(self, columns=None):
+        if not self.header_written:
+            return pd.DataFrame(columns=columns or self.columns)
+        if not columns:
+            return pd.read_csv(self.path).drop_duplicates('Key', keep='last')
+        wanted = set(columns) | {'Key'}
+        frame = pd.read_csv(self.path, usecols=lambda column: column in wanted).drop_duplicates('Key', keep='last')
+        return frame[[column for column in columns if column in frame.columns]]
+
+    def export_csv(self, path, columns=None):
+        if os.path.abspath(path) != os.path.abspath(self.path):
+            self.load(columns).to_csv(path, index=False)
+
+    def close(self):
+        pass
+
+def open_result_store(config, csv_path):
+    # classification results go to output.result_store (SQLite by default). csv_path is
+    # the processed issues CSV: the CSV backend itself, or the SQLite store's export
+    # target and one-off import source.
+    settings = config['output'].get('result_store') or {}
+    columns = list(config['output']['columns']) + [SOURCE_COLUMN]
+    backend = settings.get('backend', "sqlite")
+    if backend == "csv":
+        return CSVResultStore(csv_path, columns)
+    if backend == "sqlite":
+        path = settings.get('path', os.path.join(os.path.dirname(csv_path), "processed_issues.sqlite"))
+        return SQLiteResultStore(path, columns, import_csv=csv_path)
+    raise ValueError(f"Unsupported result store backend: {backend}")
@@ -0,0 +1,219 @@
+# pipeline/service.py
+# Long-running service mode: scheduled incremental runs over warm clients and stores,
+# with a local HTTP endpoint for status and on-demand refresh.
+
+import argparse
+import json
+import logging
+import os
+import signal
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pipeline.classification_cache import open_classification_cache
+from pipeline.jira_pipeline import PROCESSED_ISSUES_FILE, create_classifier, run_pipeline
+from pipeline.snapshots import load_watermark, watermark_key
+from pipeline.sources import jira_sources
+from utils.metrics import metrics
+from utils.rate_limit import Throttle
+
+class WarmResources:
+    # The clients, pools and stores run_pipeline otherwise opens and closes on every run.
+    # The result store keeps its processed keys (the CSV backend's key set, SQLite's
+    # index and page cache) and the classification cache stays open between runs.
+    # Created and closed on the service's runner thread, because SQLite connections
+    # belong to the thread that opened them.
+    def __init__(self, config):
+        from pipeline.data_processing import create_session
+        from pipeline.result_store import open_result_store
+        self.classifier = create_classifier(config)
+        self.cache = open_classification_cache(config)
+        self.store = open_result_store(config, PROCESSED_ISSUES_FILE)
+        pool_size = sum(max(1, int(source['config']['jira'].get('concurrency', 1))) for source in jira_sources(config))
+        self.session = create_session(pool_size)
+        self.throttle = Throttle.from_config("JIRA", config['jira'].get('rate_limit'))
+
+    def close(self):
+        self.store.close()
+        if self.cache is not None:
+            self.cache.close()
+        self.session.close()
+
+class PipelineService:
+    # Runs incremental extractions every interval_minutes, and sooner when a refresh is
+    # requested. Runs never overlap: a refresh requested during a run starts another
+    # run as soon as it finishes.
+    def __init__(self, config, interval_minutes=15, max_results=100, host="127.0.0.1", port=8080, run_on_start=True, prune_snapshots=True):
+        self.config = config
+        self.interval_seconds = float(interval_minutes) * 60
+        self.max_results = max_results
+        self.host = host
+        self.port = port
+        self.run_on_start = run_on_start
+        self.prune_snapshots = prune_snapshots
+        self.resources = None
+        self.written_snapshots = set()
+        self.refresh_requested = threading.Event()
+        self.stopping = threading.Event()
+        self.lock = threading.Lock()
+        self.state = {
+            'state': "idle", 'started_at': time.time(), 'runs': 0, 'failures': 0,
+            'current_run': None, 'last_run': None, 'next_run_at': None
+        }
+        self.last_prometheus = ""
+        self.httpd = None
+
+    @classmethod
+    def from_config(cls, config, max_results=100):
+        settings = config.get('service') or {}
+        return cls(
+            config,
+            interval_minutes=settings.get('interval_minutes', 15),
+            max_results=max_results,
+            host=settings.get('host', "127.0.0.1"),
+            port=settings.get('port', 8080),
+            run_on_start=settings.get('run_on_start', True),
+            prune_snapshots=settings.get('prune_snapshots', True)
+        )
+
+    def status(self):
+        with self.lock:
+            return dict(self.state, uptime_seconds=round(time.time() - self.state['started_at'], 3))
+
+    def request_refresh(self):
+        self.refresh_requested.set()
+        return self.status()
+
+    def watermark_snapshots(self):
+        raw_data_path = self.config['output']['raw_data_path']
+        snapshots = {}
+        for source in jira_sources(self.config):
+            watermark = load_watermark(raw_data_path, watermark_key(source['config']['filters']))
+            snapshots[watermark_key(source['config']['filters'])] = watermark['snapshot'] if watermark else None
+        return snapshots
+
+    def run_once(self, trigger):
+        started = time.time()
+        with self.lock:
+            self.state.update(state="running", current_run={'trigger': trigger, 'started_at': started})
+        status, error, classified = "succeeded", None, 0
+        # Any failure, including opening the warm resources, fails this run only; the
+        # schedule continues and the next run tries again
+        try:
+            previous_snapshots = self.watermark_snapshots()
+            # Opened on the first run, and again on the next run if opening them failed
+            if self.resources is None:
+                self.resources = WarmResources(self.config)
+            classified = run_pipeline(
+                argparse.Namespace(select="0", max_results=self.max_results, incremental=True),
+                self.config,
+                self.resources
+            )
+            current_snapshots = self.watermark_snapshots()
+            self.written_snapshots.update(path for key, path in current_snapshots.items() if path != previous_snapshots.get(key))
+            if self.prune_snapshots:
+                self.prune(previous_snapshots, current_snapshots)
+        except Exception as e:
+            logging.exception(f"Service run ({trigger}) failed.")
+            status, error = "failed", str(e)
+        finished = time.time()
+        with self.lock:
+            self.state['runs'] += 1
+            self.state['failures'] += status == "failed"
+            self.state.update(state="idle", current_run=None, last_run={
+                'trigger': trigger, 'status': status, 'error': error, 'started_at': started,
+                'finished_at': finished, 'duration_seconds': round(finished - started, 3),
+                'issues_classified': classified, 'report': metrics.report()
+            })
+            self.last_prometheus = metrics.prometheus_text()
+        return status
+
+    def prune(self, previous_snapshots, current_snapshots):
+        # Every incremental run writes a merged snapshot holding all of the previous one,
+        # so a snapshot this service wrote is deleted once a newer one replaces it
+        for key, path in previous_snapshots.items():
+            if path and path != current_snapshots.get(key) and path in self.written_snapshots and os.path.exists(path):
+                os.remove(path)
+                self.written_snapshots.discard(path)
+                logging.info(f"Removed superseded snapshot {path}.")
+
+    def run_forever(self):
+        # The runner loop. Blocks until stop() is called.
+        trigger = "startup" if self.run_on_start else None
+        try:
+            while not self.stopping.is_set():
+                if trigger:
+                    self.run_once(trigger)
+                with self.lock:
+                    self.state['next_run_at'] = time.time() + self.interval_seconds
+                requested = self.refresh_requested.wait(self.interval_seconds)
+                self.refresh_requested.clear()
+                trigger = "refresh" if requested else "schedule"
+        finally:
+            if self.resources is not None:
+                self.resources.close()
+                self.resources = None
+            logging.info("Service stopped.")
+
+    def stop(self):
+        self.stopping.set()
+        # Wakes the runner loop, which then sees stopping and exits
+        self.refresh_requested.set()
+        if self.httpd is not None:
+            threading.Thread(target=self.httpd.shutdown, daemon=True).start()
+
+    def start_http(self):
+        # GET /status returns the service state and the last run's report as JSON,
+        # GET /metrics the last run's metrics in Prometheus text format, and
+        # POST /refresh queues a run now.
+        service = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def send(self, status, content, content_type="application/json"):
+                content = content.encode()
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+
+            def do_GET(self):
+                if self.path == "/status":
+                    self.send(200, json.dumps(service.status()))
+                elif self.path == "/metrics":
+                    with service.lock:
+                        content = service.last_prometheus
+                    self.send(200, content, "text/plain; version=0.0.4")
+                else:
+                    self.send(404, json.dumps({'error': f"No route for GET {self.path}"}))
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                if length:
+                    self.rfile.read(length)
+                if self.path == "/refresh":
+                    self.send(202, json.dumps(service.request_refresh()))
+                else:
+                    self.send(404, json.dumps({'error': f"No route for POST {self.path}"}))
+
+            def log_message(self, format, *args):
+                logging.debug(f"Service HTTP: {format % args}")
+
+        self.httpd = ThreadingHTTPServer((self.host, self.port), Handler)
+        self.httpd.daemon_threads = True
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        logging.info(f"Service listening on http://{self.host}:{self.httpd.server_address[1]}.")
+        return self.httpd
+
+    def serve(self):
+        # Runs until SIGINT or SIGTERM. The HTTP endpoint answers on its own thread.
+        self.start_http()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, lambda *_: self.stop())
+        logging.info(f"Running incremental extractions every {self.interval_seconds / 60:g} minutes.")
+        try:
+            self.run_forever()
+        finally:
+            self.httpd.server_close()
@@ -0,0 +1,202 @@
+# pipeline/snapshots.py
+# Raw JIRA snapshot files, update watermarks and delta merging for incremental extraction.
+
+import glob
+import gzip
+import json
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+WATERMARK_FILE = "watermarks.json"
+# "json" is the original {"issues": [...]} document; "ndjson.gz" is one issue per line, gzip-compressed
+SNAPSHOT_FORMATS = ("json", "ndjson.gz")
+
+def is_snapshot_file(path):
+    # Completed snapshots only: not .partial files left by an aborted run, nor watermarks.json
+    name = os.path.basename(path)
+    return name.startswith("jira_raw_data_") and any(name.endswith(f".{snapshot_format}") for snapshot_format in SNAPSHOT_FORMATS)
+
+def list_raw_data_files(raw_data_path):
+    # Sorted so the numbering shown by select_raw_data_file is stable and oldest-first
+    files = [path for snapshot_format in SNAPSHOT_FORMATS for path in glob.glob(f"{raw_data_path}/jira_raw_data_*.{snapshot_format}")]
+    return sorted(files, key=os.path.basename)
+
+def iter_snapshot_issues(path):
+    # NDJSON snapshots are read one line at a time; JSON snapshots have to be parsed whole
+    if path.endswith(".ndjson.gz"):
+        with gzip.open(path, "rt", encoding="utf-8") as ndjson_file:
+            for line in ndjson_file:
+                if line.strip():
+                    yield json.loads(line)
+    else:
+        with open(path, "r") as json_file:
+            yield from json.load(json_file).get("issues", [])
+
+def load_snapshot(path):
+    return {"issues": list(iter_snapshot_issues(path))}
+
+def iter_snapshot_pages(path, page_size=1000):
+    return iter_chunks(iter_snapshot_issues(path), page_size)
+
+def resolve_snapshot_selection(selection, raw_data_path):
+    # "all" selects every raw extract; anything with glob characters is matched
+    # against raw_data_path unless it already contains a directory.
+    if selection == "all":
+        return list_raw_data_files(raw_data_path)
+    pattern = selection if os.path.dirname(selection) else os.path.join(raw_data_path, selection)
+    return sorted(filter(is_snapshot_file, glob.glob(pattern)), key=os.path.basename)
+
+def is_multi_selection(selection):
+    return selection == "all" or any(char in selection for char in "*?[")
+
+def process_snapshot_file(path, columns, description_max_chars=None, compact=False):
+    # Imported here so listing and streaming snapshots does not load pandas
+    from pipeline.data_processing import process_data
+    frame = process_data(load_snapshot(path), columns, description_max_chars=description_max_chars, compact=compact)
+    logging.info(f"Processed {len(frame)} issues from {path}.")
+    return frame
+
+def process_snapshots(paths, columns, workers=None, description_max_chars=None, compact=False):
+    # Loads and normalizes many snapshots in parallel, one file per worker process,
+    # and merges them into one frame holding the most recently updated row per Key.
+    import pandas as pd
+    from pipeline.data_processing import compact_frame
+    columns = list(columns)
+    if 'Updated' not in columns:
+        columns.append('Updated')
+    workers = min(workers or os.cpu_count() or 1, len(paths)) or 1
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            frames = list(executor.map(
+                process_snapshot_file, paths, [columns] * len(paths), [description_max_chars] * len(paths), [compact] * len(paths)
+            ))
+    else:
+        frames = [process_snapshot_file(path, columns, description_max_chars, compact) for path in paths]
+    if not frames:
+        return pd.DataFrame(columns=columns)
+    merged = pd.concat(frames, ignore_index=True)
+    if compact:
+        merged = compact_frame(merged)
+    # Updated is ISO text in UTC (or datetime64 in compact frames), so either way sort order is time order
+    merged = merged.sort_values('Updated', kind='stable', na_position='first').drop_duplicates('Key', keep='last')
+    logging.info(f"Merged {sum(len(frame) for frame in frames)} rows from {len(paths)} snapshots into {len(merged)} unique issues.")
+    return merged.reset_index(drop=True)
+
+def iter_chunks(items, size):
+    items = iter(items)
+    while True:
+        chunk = list(islice(items, size))
+        if not chunk:
+            return
+        yield chunk
+
+class SnapshotWriter:
+    # Writes a raw snapshot page by page in either snapshot format. Issues go to a
+    # .partial file that is renamed into place by close(), so an interrupted run
+    # never leaves a truncated snapshot behind. A name (the site, when several are
+    # extracted in one run) is appended after the timestamp so their files do not collide.
+    def __init__(self, raw_data_path, snapshot_format="json", name=None):
+        if snapshot_format not in SNAPSHOT_FORMATS:
+            raise ValueError(f"Unsupported snapshot format: {snapshot_format}")
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        suffix = f"_{name}" if name else ""
+        self.snapshot_format = snapshot_format
+        self.path = f"{raw_data_path}/jira_raw_data_{timestamp}{suffix}.{snapshot_format}"
+        self.partial_path = f"{self.path}.partial"
+        os.makedirs(raw_data_path, exist_ok=True)
+        if snapshot_format == "ndjson.gz":
+            self.file = gzip.open(self.partial_path, "wt", encoding="utf-8", compresslevel=6)
+        else:
+            self.file = open(self.partial_path, "w")
+            self.file.write('{"issues": [')
+        self.count = 0
+        self.max_updated = None
+
+    def write_pages(self, pages):
+        # Passes each page through after writing it, so it can wrap a page stream
+        for page in pages:
+            for issue in page:
+                if self.snapshot_format == "ndjson.gz":
+                    self.file.write(json.dumps(issue, separators=(",", ":")) + "\n")
+                else:
+                    self.file.write(",\n" if self.count else "\n")
+                    json.dump(issue, self.file)
+                self.count += 1
+            page_updated = max_updated(page)
+            if page_updated and (self.max_updated is None or parse_jira_datetime(page_updated) > parse_jira_datetime(self.max_updated)):
+                self.max_updated = page_updated
+            yield page
+
+    def close(self):
+        if self.snapshot_format == "json":
+            self.file.write("\n]}\n")
+        self.file.close()
+        os.replace(self.partial_path, self.path)
+        logging.info(f"Raw data stored successfully at {self.path} ({self.count} issues).")
+        return self.path
+
+    def abort(self):
+        self.file.close()
+        logging.warning(f"Extraction interrupted. Partial raw data left at {self.partial_path}.")
+
+def parse_jira_datetime(value):
+    # JIRA timestamps look like 2024-03-01T10:15:30.000+0000
+    return datetime.strptime(value, "%Y-%m-%dT%H:%M:%S.%f%z")
+
+def max_updated(issues):
+    updated = [issue.get('fields', {}).get('updated') for issue in issues]
+    updated = [value for value in updated if value]
+    return max(updated, key=parse_jira_datetime) if updated else None
+
+def watermark_key(filters):
+    # The original single-filter config keeps its plain filter id as the key; a site's
+    # group of filters is keyed by the site and its filter ids
+    filter_id = filters['filter_id']
+    if not isinstance(filter_id, (list, tuple)):
+        return str(filter_id)
+    key = ",".join(str(value) for value in filter_id)
+    return f"{filters['site']}:{key}" if filters.get('site') else key
+
+def load_watermark(raw_data_path, filter_id):
+    # Returns {"updated": <max fields.updated>, "snapshot": <path>} for the filter, or None
+    path = os.path.join(raw_data_path, WATERMARK_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path, "r") as json_file:
+        return json.load(json_file).get(str(filter_id))
+
+def save_watermark(raw_data_path, filter_id, updated, snapshot_path):
+    path = os.path.join(raw_data_path, WATERMARK_FILE)
+    watermarks = {}
+    if os.path.exists(path):
+        with open(path, "r") as json_file:
+            watermarks = json.load(json_file)
+    watermarks[str(filter_id)] = {"updated": updated, "snapshot": snapshot_path}
+    with open(path, "w") as json_file:
+        json.dump(watermarks, json_file, indent=2)
+    logging.info(f"Watermark for filter {filter_id} set to {updated}.")
+
+def jql_updated_since(updated, overlap_minutes=0):
+    # JQL only accepts minute precision and interprets dates in the JIRA user's time
+    # zone, so the watermark is moved back by an overlap; merging by Key makes the
+    # re-fetched issues harmless.
+    since = parse_jira_datetime(updated).astimezone(timezone.utc) - timedelta(minutes=overlap_minutes)
+    return since.strftime("%Y-%m-%d %H:%M")
+
+def merge_issues(previous_issues, delta_issues):
+    # Merges a delta extract into the previous snapshot by key. Returns the merged issue
+    # list and the keys whose Summary or Description changed (including new issues).
+    merged = {issue['key']: issue for issue in previous_issues}
+    changed_keys = set()
+    for issue in delta_issues:
+        previous = merged.get(issue['key'])
+        fields = issue.get('fields', {})
+        if previous is None or any(
+            previous.get('fields', {}).get(field) != fields.get(field) for field in ('summary', 'description')
+        ):
+            changed_keys.add(issue['key'])
+        merged[issue['key']] = issue
+    return list(merged.values()), changed_keys
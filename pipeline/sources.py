@@ -0,0 +1,106 @@
+# pipeline/sources.py
+# Several JIRA filters and sites in one run: one extraction source per site, fetched concurrently.
+
+import logging
+import queue
+import threading
+
+DEFAULT_SITE = "default"
+
+def jira_sources(config):
+    # Splits the filters config into one source per site. `filters` is either the
+    # original {filter_id: ...} or a list of {filter_id, site}. Filters on the same site
+    # are searched together with "filter in (...)", so an issue in several of them is
+    # fetched once. Each source is {'name', 'config'}, where config is the run config
+    # with the site's jira settings (from `sites`) and that site's filter ids.
+    filters = config['filters']
+    if isinstance(filters, dict):
+        return [{'name': None, 'config': config}]
+    sites = config.get('sites') or {}
+    filter_ids = {}
+    for entry in filters:
+        site = entry.get('site', DEFAULT_SITE)
+        if site != DEFAULT_SITE and site not in sites:
+            raise ValueError(f"Unknown JIRA site: {site}")
+        ids = filter_ids.setdefault(site, [])
+        if str(entry['filter_id']) not in ids:
+            ids.append(str(entry['filter_id']))
+    sources = []
+    for site, ids in filter_ids.items():
+        jira = dict(config['jira'])
+        if site in sites:
+            # A site's search_jql_url is derived from its own api_url unless it sets one
+            jira.pop('search_jql_url', None)
+            jira.update(sites[site])
+        sources.append({'name': site, 'config': dict(config, jira=jira, filters={'filter_id': ids, 'site': site})})
+    logging.info(f"Extracting {sum(len(ids) for ids in filter_ids.values())} filters from {len(sources)} JIRA sites.")
+    return sources
+
+def site_key_prefix(config):
+    # Sites are separate JIRA instances, so ABC-1 on two sites are two issues. Issues from
+    # a named site are keyed "<site>:<key>" in snapshots and the result store; the
+    # default site and the single-filter config keep plain keys.
+    site = config['filters'].get('site')
+    return f"{site}:" if site and site != DEFAULT_SITE else ""
+
+def namespace_issues(issues, prefix):
+    if not prefix:
+        return issues
+    return [dict(issue, key=prefix + issue['key']) for issue in issues]
+
+def namespace_pages(pages, prefix):
+    if not prefix:
+        return pages
+    return (namespace_issues(page, prefix) for page in pages)
+
+def merge_page_streams(streams, buffer_pages=4):
+    # Runs each page stream on its own thread and yields their pages as they arrive.
+    # Issues are not deduplicated here: filters on one site are already searched
+    # together, and keys from different sites are namespaced. The queue is bounded,
+    # so fast sources wait for classification instead of buffering whole filters. The
+    # first error raised by any stream is raised here, and the other streams are stopped.
+    if len(streams) == 1:
+        yield from streams[0]
+        return
+    pages = queue.Queue(maxsize=buffer_pages)
+    stop = threading.Event()
+    done = object()
+
+    def put(item):
+        while not stop.is_set():
+            try:
+                pages.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def pump(stream):
+        try:
+            for page in stream:
+                if not put(page):
+                    break
+        except Exception as e:
+            put(e)
+        finally:
+            if hasattr(stream, 'close'):
+                stream.close()
+            put(done)
+
+    threads = [threading.Thread(target=pump, args=(stream,), daemon=True) for stream in streams]
+    for thread in threads:
+        thread.start()
+    remaining = len(threads)
+    try:
+        while remaining:
+            item = pages.get()
+            if item is done:
+                remaining -= 1
+                continue
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join()
@@ -1,10 +1,14 @@
-import requests
 import os
+import sys
+import time
+import requests
 from dotenv import load_dotenv
 
-load_dotenv()  # Load environment variables from .env
+# Allow running as `python scripts/token_manager.py` from the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from pipeline.auth import TokenProvider, request_tokens, write_env_values
 
-TOKEN_URL = "https://auth.atlassian.com/oauth/token"
+load_dotenv()  # Load environment variables from .env
 
 # Use absolute path for .env file
 ENV_FILE_PATH = os.path.join(os.path.dirname(__file__), ".env")
@@ -22,35 +26,13 @@ def exchange_code_for_tokens(auth_code):
         "redirect_uri": os.getenv("JIRA_REDIRECT_URI")
     }
 
-    headers = {
-        "Content-Type": "application/json"
-    }
-
     try:
-        response = requests.post(TOKEN_URL, json=data, headers=headers, timeout=10)
-        response.raise_for_status()
-        tokens = response.json()
-
-        # Extract tokens
-        access_token = tokens['access_token']
-        refresh_token = tokens['refresh_token']
-
-        #print("Access Token:", access_token)
-        #print("Refresh Token:", refresh_token)
-
-        # Read existing lines from .env file
-        with open(ENV_FILE_PATH, "r") as env_file:
-            lines = env_file.readlines()
-
-        with open(ENV_FILE_PATH, "w") as env_file:
-            for line in lines:
-                if line.startswith("JIRA_ACCESS_TOKEN="):
-                    env_file.write(f"JIRA_ACCESS_TOKEN={access_token}\n")
-                elif line.startswith("JIRA_REFRESH_TOKEN="):
-                    env_file.write(f"JIRA_REFRESH_TOKEN={refresh_token}\n")
-                else:
-                    env_file.write(line)
-
+        tokens = request_tokens(data)
+        write_env_values({
+            "JIRA_ACCESS_TOKEN": tokens['access_token'],
+            "JIRA_REFRESH_TOKEN": tokens['refresh_token'],
+            "JIRA_TOKEN_EXPIRES_AT": str(int(time.time()) + int(tokens.get('expires_in', 3600)))
+        }, ENV_FILE_PATH)
         print("Tokens written to .env file successfully.")
     except requests.exceptions.Timeout:
         print("The request timed out. Please check your network connection and try again.")
@@ -63,42 +45,11 @@ def refresh_access_token():
     Refreshes the access token using the stored refresh token.
     Replaces the existing access and refresh tokens in the .env file.
     """
-    data = {
-        "grant_type": "refresh_token",
-        "client_id": os.getenv("JIRA_CLIENT_ID"),
-        "client_secret": os.getenv("JIRA_CLIENT_SECRET"),
-        "refresh_token": os.getenv("JIRA_REFRESH_TOKEN")
-    }
-
-    headers = {
-        "Content-Type": "application/json"
-    }
-
+    provider = TokenProvider.from_env(env_file=ENV_FILE_PATH)
     try:
-        response = requests.post(TOKEN_URL, json=data, headers=headers, timeout=10)
-        response.raise_for_status()
-        tokens = response.json()
-
-        # Extract tokens
-        access_token = tokens['access_token']
-        refresh_token = tokens.get('refresh_token', os.getenv("JIRA_REFRESH_TOKEN"))
-
-        print("New Access Token:", access_token)
-        print("Refresh Token:", refresh_token)
-
-        # Replace tokens in .env file
-        with open(ENV_FILE_PATH, "r") as env_file:
-            lines = env_file.readlines()
-
-        with open(ENV_FILE_PATH, "w") as env_file:
-            for line in lines:
-                if line.startswith("JIRA_ACCESS_TOKEN="):
-                    env_file.write(f"JIRA_ACCESS_TOKEN={access_token}\n")
-                elif line.startswith("JIRA_REFRESH_TOKEN="):
-                    env_file.write(f"JIRA_REFRESH_TOKEN={refresh_token}\n")
-                else:
-                    env_file.write(line)
-
+        provider.refresh()
+        print("New Access Token:", provider.access_token)
+        print("Refresh Token:", provider.refresh_token)
         print("Tokens replaced in .env file successfully.")
     except requests.exceptions.Timeout:
         print("The request timed out. Please check your network connection and try again.")
@@ -0,0 +1,66 @@
+# tests/test_adf.py
+# Unit tests for the ADF-to-text converter.
+import unittest
+from pipeline.adf import extract_descriptions, extract_text_from_adf, get_process_pool
+
+def text(value):
+    return {'type': 'text', 'text': value}
+
+def paragraph(*content):
+    return {'type': 'paragraph', 'content': list(content)}
+
+def doc(*content):
+    return {'type': 'doc', 'version': 1, 'content': list(content)}
+
+class TestExtractTextFromAdf(unittest.TestCase):
+    def test_paragraphs_mentions_and_breaks(self):
+        adf = doc(
+            paragraph(text("Hello "), {'type': 'mention', 'attrs': {'text': '@Ann'}}, {'type': 'hardBreak'}, text("bye")),
+            paragraph(text("Second"))
+        )
+        self.assertEqual(extract_text_from_adf(adf), "Hello @Ann\nbye\n\nSecond")
+
+    def test_headings_code_blocks_and_lists(self):
+        adf = doc(
+            {'type': 'heading', 'attrs': {'level': 2}, 'content': [text("Steps")]},
+            {'type': 'orderedList', 'attrs': {'order': 3}, 'content': [
+                {'type': 'listItem', 'content': [paragraph(text("Open"))]},
+                {'type': 'listItem', 'content': [
+                    paragraph(text("Click")),
+                    {'type': 'bulletList', 'content': [{'type': 'listItem', 'content': [paragraph(text("twice"))]}]}
+                ]},
+            ]},
+            {'type': 'codeBlock', 'attrs': {'language': 'python'}, 'content': [text("raise ValueError()")]}
+        )
+        self.assertEqual(
+            extract_text_from_adf(adf),
+            "Steps\n\n3. Open\n4. Click\n  - twice\n\nraise ValueError()"
+        )
+
+    def test_tables(self):
+        cell = lambda value: {'type': 'tableCell', 'content': [paragraph(text(value))]}
+        adf = doc({'type': 'table', 'content': [
+            {'type': 'tableRow', 'content': [cell("a"), cell("b")]},
+            {'type': 'tableRow', 'content': [cell("1"), cell("2")]},
+        ]})
+        self.assertEqual(extract_text_from_adf(adf), "a | b\n1 | 2")
+
+    def test_deep_nesting_does_not_recurse(self):
+        node = paragraph(text("leaf"))
+        for _ in range(5000):
+            node = {'type': 'blockquote', 'content': [node]}
+        self.assertEqual(extract_text_from_adf(doc(node)), "leaf")
+
+    def test_max_chars_caps_output(self):
+        adf = doc(*[paragraph(text("x" * 100)) for _ in range(1000)])
+        self.assertEqual(len(extract_text_from_adf(adf, max_chars=250)), 250)
+
+    def test_extract_descriptions_handles_plain_values_and_process_pool(self):
+        descriptions = [doc(paragraph(text(f"issue {index}"))) for index in range(20)] + ["plain", None]
+        serial = extract_descriptions(descriptions)
+        self.assertEqual(serial[-2:], ["plain", ""])
+        self.assertEqual(extract_descriptions(descriptions, workers=2, min_parallel_size=1), serial)
+        self.assertEqual(get_process_pool(2)._mp_context.get_start_method(), "spawn")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+# tests/test_aggregation.py
+# Unit tests for the capacity cubes.
+import os
+import tempfile
+import unittest
+from types import SimpleNamespace
+import pandas as pd
+from llm.prompts import PromptBuilder
+from pipeline.aggregation import aggregate_store, build_cubes, check_rollups, cube_columns, write_cubes
+from pipeline.jira_pipeline import classify_issue_chunks
+from pipeline.result_store import SQLiteResultStore
+
+ISSUES = pd.DataFrame([
+    {'Key': 'A-1', 'Project': 'Alpha', 'Category': 'Technical Debt', 'Assignee': 'Ana', 'Created': '2024-01-05T00:00:00', 'Resolved': '2024-01-07T00:00:00'},
+    {'Key': 'A-2', 'Project': 'Alpha', 'Category': 'Technical Debt', 'Assignee': None, 'Created': '2024-01-10T00:00:00', 'Resolved': '2024-02-09T00:00:00'},
+    {'Key': 'B-1', 'Project': 'Beta', 'Category': 'Customer Support', 'Assignee': 'Ana', 'Created': '2024-02-01T00:00:00', 'Resolved': None},
+    # Stored before the Resolved column existed
+    {'Key': 'B-2', 'Project': 'Beta', 'Category': None, 'Assignee': 'Bo', 'Created': '2024-02-02T00:00:00', 'Resolved_YearMonth': '2024-02'},
+])
+
+class FixedClassifier:
+    def __init__(self):
+        self.prompt_builder = PromptBuilder()
+        self.calls = 0
+
+    def classify(self, summary, description, categories, model=None):
+        self.calls += 1
+        return "Technical Debt"
+
+class TestCapacityCubes(unittest.TestCase):
+    def test_monthly_counts_and_cycle_times(self):
+        month = build_cubes(ISSUES, rollups=[])['month'].set_index('Month')
+        self.assertEqual(month.loc['2024-01', 'created'], 2)
+        self.assertEqual(month.loc['2024-01', 'resolved'], 1)
+        self.assertEqual(month.loc['2024-01', 'cycle_time_days_mean'], 2.0)
+        self.assertEqual(month.loc['2024-02', 'created'], 2)
+        self.assertEqual(month.loc['2024-02', 'resolved'], 2)
+        # B-2 has no Resolved timestamp, so it counts as throughput without a cycle time
+        self.assertEqual(month.loc['2024-02', 'cycle_time_days_median'], 30.0)
+
+    def test_rollups_label_missing_dimensions(self):
+        cubes = build_cubes(ISSUES, rollups=[['Project', 'Assignee'], ['Category']])
+        self.assertEqual(sorted(cubes), ['month', 'month_category', 'month_project_assignee'])
+        by_assignee = cubes['month_project_assignee'].set_index(['Month', 'Project', 'Assignee'])
+        self.assertEqual(by_assignee.loc[('2024-02', 'Alpha', 'Unassigned'), 'resolved'], 1)
+        self.assertEqual(by_assignee.loc[('2024-02', 'Alpha', 'Unassigned'), 'created'], 0)
+        self.assertIn('Unclassified', set(cubes['month_category']['Category']))
+
+    def test_rollups_on_other_columns(self):
+        issues = ISSUES.assign(Status=['Done', 'Done', None, 'Open'])
+        self.assertIn('Status', cube_columns([['Status']]))
+        by_status = build_cubes(issues, rollups=[['Status']])['month_status'].set_index(['Month', 'Status'])
+        self.assertEqual(by_status.loc[('2024-01', 'Done'), 'created'], 2)
+        self.assertEqual(by_status.loc[('2024-02', 'Unknown'), 'created'], 1)
+
+    def test_explicit_empty_rollups_build_only_the_month_cube(self):
+        self.assertEqual(list(build_cubes(ISSUES, rollups=[])), ['month'])
+        self.assertEqual(len(build_cubes(ISSUES)), 6)
+
+    def test_rollups_are_checked_against_output_columns(self):
+        config = {'aggregation': {'enabled': True, 'rollups': [['Project'], ['Status']]}, 'output': {'columns': ['Key', 'Project']}}
+        with self.assertRaises(ValueError):
+            check_rollups(config)
+        config['output']['columns'].append('Status')
+        check_rollups(config)
+
+    def test_issues_resolved_after_classification_reach_the_cubes(self):
+        columns = ['Key', 'Project', 'Summary', 'Description', 'Status', 'Created', 'Resolved', 'Category']
+        issue = {'Key': 'A-1', 'Project': 'Alpha', 'Summary': 'Refactor', 'Description': '', 'Status': 'Open', 'Created': '2024-04-01T00:00:00', 'Resolved': None}
+        with tempfile.TemporaryDirectory() as directory:
+            config = {
+                'classification': {'categories': [{'Name': 'Technical Debt'}]},
+                'output': {'columns': columns, 'path': directory},
+                'aggregation': {'enabled': True, 'rollups': []}
+            }
+            store = SQLiteResultStore(os.path.join(directory, "processed_issues.sqlite"), columns)
+            resources = SimpleNamespace(classifier=FixedClassifier(), cache=None)
+            for resolved in (None, '2024-05-01T00:00:00'):
+                chunk = pd.DataFrame([dict(issue, Status='Done' if resolved else 'Open', Resolved=resolved)])
+                list(classify_issue_chunks([chunk], config, store, resources=resources))
+                month = aggregate_store(store, config)['month'].set_index('Month')
+            store.close()
+        # Classified once, while open; the second run only refreshed its resolution
+        self.assertEqual(resources.classifier.calls, 1)
+        self.assertEqual(month.loc['2024-05', 'resolved'], 1)
+        self.assertEqual(month.loc['2024-05', 'cycle_time_days_mean'], 30.0)
+
+    def test_write_cubes(self):
+        with tempfile.TemporaryDirectory() as directory:
+            write_cubes(build_cubes(ISSUES, rollups=[['Project']]), directory)
+            self.assertEqual(sorted(os.listdir(directory)), ['month.csv', 'month_project.csv'])
+            self.assertEqual(len(pd.read_csv(os.path.join(directory, 'month_project.csv'))), 3)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+# tests/test_auth.py
+# Unit tests for JIRA token handling.
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+from pipeline.auth import TokenProvider, write_env_values
+
+class TestWriteEnvValues(unittest.TestCase):
+    def test_replaces_and_appends_in_one_write(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, ".env")
+            with open(path, "w") as file:
+                file.write("JIRA_CLIENT_ID=abc\nJIRA_ACCESS_TOKEN=old\n")
+            write_env_values({"JIRA_ACCESS_TOKEN": "new", "JIRA_TOKEN_EXPIRES_AT": "123"}, path)
+            with open(path) as file:
+                self.assertEqual(file.read(), "JIRA_CLIENT_ID=abc\nJIRA_ACCESS_TOKEN=new\nJIRA_TOKEN_EXPIRES_AT=123\n")
+            self.assertEqual(os.listdir(directory), [".env"])
+
+class TestTokenProvider(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.env_file = os.path.join(self.directory.name, ".env")
+        self.environment = mock.patch.dict(os.environ, {})
+        self.environment.start()
+
+    def tearDown(self):
+        self.environment.stop()
+        self.directory.cleanup()
+
+    def provider(self, expires_at):
+        return TokenProvider("old", "refresh", expires_at, "id", "secret", env_file=self.env_file)
+
+    def test_fresh_token_is_not_refreshed(self):
+        provider = self.provider(time.time() + 3600)
+        with mock.patch('pipeline.auth.request_tokens') as request_tokens:
+            self.assertEqual(provider.get(), "old")
+        request_tokens.assert_not_called()
+
+    def test_concurrent_callers_share_one_refresh(self):
+        provider = self.provider(time.time() + 60)
+        calls = []
+
+        def slow_refresh(payload, token_url):
+            calls.append(payload)
+            time.sleep(0.05)
+            return {"access_token": "new", "refresh_token": "rotated", "expires_in": 3600}
+
+        results = []
+        with mock.patch('pipeline.auth.request_tokens', side_effect=slow_refresh):
+            threads = [threading.Thread(target=lambda: results.append(provider.get())) for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, ["new"] * 8)
+        self.assertEqual(os.environ["JIRA_REFRESH_TOKEN"], "rotated")
+        with open(self.env_file) as file:
+            self.assertIn("JIRA_ACCESS_TOKEN=new\n", file.read())
+
+    def test_rejected_token_is_refreshed_once(self):
+        provider = self.provider(time.time() + 3600)
+        tokens = {"access_token": "new", "expires_in": 3600}
+        with mock.patch('pipeline.auth.request_tokens', return_value=tokens) as request_tokens:
+            self.assertEqual(provider.refresh(stale_token="old"), "new")
+            # A second worker that saw the same 401 reuses the new token
+            self.assertEqual(provider.refresh(stale_token="old"), "new")
+        self.assertEqual(request_tokens.call_count, 1)
+        self.assertEqual(provider.refresh_token, "refresh")
+
+    def test_missing_credentials(self):
+        with self.assertRaises(ValueError):
+            TokenProvider(env_file=self.env_file).get()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+# tests/test_classification_cache.py
+# Unit tests for the persistent classification cache.
+import os
+import tempfile
+import time
+import unittest
+from pipeline.classification_cache import ClassificationCache
+from pipeline.jira_pipeline import classify_rows_cached
+
+CATEGORIES = [{'Name': 'Technical Debt', 'Description': 'Refactoring'}]
+
+class CountingClassifier:
+    def __init__(self):
+        self.calls = []
+
+    def classify(self, summary, description, categories, model=None):
+        self.calls.append(summary)
+        return "Technical Debt"
+
+class TestClassificationCache(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "cache.sqlite")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def open_cache(self, categories=CATEGORIES, **kwargs):
+        return ClassificationCache(self.path, "openai", "gpt-3.5-turbo", categories, **kwargs)
+
+    def test_hits_survive_reopen_and_track_hit_rate(self):
+        cache = self.open_cache()
+        cache.put_many([("Refactor auth", "Legacy code", "Technical Debt")])
+        cache.close()
+        cache = self.open_cache()
+        self.assertEqual(cache.get("Refactor auth", "Legacy code"), "Technical Debt")
+        self.assertIsNone(cache.get("Refactor auth", "Edited description"))
+        self.assertEqual(cache.hit_rate, 0.5)
+        cache.close()
+
+    def test_category_change_only_evicts_its_entries(self):
+        support = {'Name': 'Customer Support', 'Description': 'Tickets from customers'}
+        cache = self.open_cache(categories=CATEGORIES + [support])
+        cache.put_many([("Refactor auth", "", "Technical Debt"), ("Refund request", "", "Customer Support")])
+        cache.close()
+        # Editing Technical Debt's description keeps the Customer Support entry
+        cache = self.open_cache(categories=[{'Name': 'Technical Debt', 'Description': 'Cleanup'}, support])
+        self.assertIsNone(cache.get("Refactor auth", ""))
+        self.assertEqual(cache.get("Refund request", ""), "Customer Support")
+        cache.close()
+        # Removing Customer Support evicts its entry
+        cache = self.open_cache(categories=CATEGORIES)
+        self.assertIsNone(cache.get("Refund request", ""))
+        cache.close()
+
+    def test_eviction_by_size_and_age(self):
+        cache = self.open_cache(max_entries=2)
+        for index in range(4):
+            cache.put_many([(f"Issue {index}", "", "Technical Debt")])
+            time.sleep(0.01)
+        cache.evict()
+        self.assertIsNone(cache.get("Issue 0", ""))
+        self.assertEqual(cache.get("Issue 3", ""), "Technical Debt")
+        cache.max_age_days = -1
+        cache.evict()
+        self.assertIsNone(cache.get("Issue 3", ""))
+        cache.close()
+
+    def test_only_cache_misses_reach_the_classifier(self):
+        cache = self.open_cache()
+        cache.put_many([("Cached", "", "Technical Debt")])
+        classifier = CountingClassifier()
+        rows = [{'Key': 'A-1', 'Summary': 'Cached', 'Description': ''},
+                {'Key': 'A-2', 'Summary': 'New', 'Description': ''}]
+        results = list(classify_rows_cached(cache, classifier, rows, CATEGORIES, None))
+        self.assertEqual(results, ["Technical Debt", "Technical Debt"])
+        self.assertEqual(classifier.calls, ["New"])
+        self.assertEqual(cache.get("New", ""), "Technical Debt")
+        cache.close()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,154 @@
+# tests/test_data_processing.py
+# Unit tests for JIRA extraction and data processing.
+import threading
+import time
+import unittest
+from unittest import mock
+from benchmarks.synthetic import synthetic_issues
+from pipeline.data_processing import extract_data, process_data, render_compact_frame
+
+class FakeResponse:
+    def __init__(self, payload):
+        self.payload = payload
+        self.headers = {}
+        self.status_code = 200
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.payload
+
+class FakeSearchSession:
+    # Serves a filter of `total` issues, capping the page size at `server_page_size`.
+    def __init__(self, total, server_page_size):
+        self.total = total
+        self.server_page_size = server_page_size
+        self.requested_offsets = []
+        self.lock = threading.Lock()
+
+    def get(self, url, headers=None, params=None, timeout=None):
+        with self.lock:
+            self.requested_fields = params['fields']
+        if url.endswith("/jql"):
+            # nextPageToken paging: the token is the offset of the next page
+            start_at = int(params.get('nextPageToken', 0))
+            page_size = min(params['maxResults'], self.server_page_size)
+            with self.lock:
+                self.requested_offsets.append(start_at)
+            keys = range(start_at, min(start_at + page_size, self.total))
+            payload = {'issues': [{'key': f"ABC-{index}"} for index in keys]}
+            if start_at + page_size < self.total:
+                payload['nextPageToken'] = str(start_at + page_size)
+            else:
+                payload['isLast'] = True
+            return FakeResponse(payload)
+        start_at = params['startAt']
+        page_size = min(params['maxResults'], self.server_page_size)
+        with self.lock:
+            self.requested_offsets.append(start_at)
+        # Later pages answer first, so ordering must not depend on completion order
+        time.sleep(0.001 * (self.total - start_at) / page_size)
+        keys = range(start_at, min(start_at + page_size, self.total))
+        return FakeResponse({
+            'startAt': start_at,
+            'maxResults': page_size,
+            'total': self.total,
+            'issues': [{'key': f"ABC-{index}"} for index in keys]
+        })
+
+    def close(self):
+        pass
+
+class TestExtractData(unittest.TestCase):
+    def extract(self, session, concurrency, max_results, **jira):
+        config = {
+            'jira': dict({'api_url': "https://jira.example.com/rest/api/3/search", 'concurrency': concurrency}, **jira),
+            'filters': {'filter_id': "1"},
+            'output': {'columns': ['Key', 'Summary', 'Status', 'Resolved_YearMonth']}
+        }
+        with mock.patch('pipeline.data_processing.get_access_token', return_value="token"), \
+                mock.patch('pipeline.data_processing.create_session', return_value=session):
+            return extract_data(config, max_results)
+
+    def test_parallel_pages_are_reassembled_in_order(self):
+        session = FakeSearchSession(total=95, server_page_size=10)
+        data = self.extract(session, concurrency=4, max_results=50)
+        self.assertEqual([issue['key'] for issue in data['issues']], [f"ABC-{index}" for index in range(95)])
+        self.assertEqual(sorted(session.requested_offsets), list(range(0, 95, 10)))
+
+    def test_sequential_paging(self):
+        session = FakeSearchSession(total=25, server_page_size=10)
+        data = self.extract(session, concurrency=1, max_results=10)
+        self.assertEqual(len(data['issues']), 25)
+        self.assertEqual(session.requested_offsets, [0, 10, 20])
+
+    def test_sequential_paging_when_server_caps_the_page_size(self):
+        # Asking for 50 but receiving 10 per page used to stop after the first page
+        session = FakeSearchSession(total=25, server_page_size=10)
+        data = self.extract(session, concurrency=1, max_results=50)
+        self.assertEqual(len(data['issues']), 25)
+        self.assertEqual(session.requested_offsets, [0, 10, 20])
+
+    def test_cursor_paging(self):
+        session = FakeSearchSession(total=95, server_page_size=10)
+        data = self.extract(session, concurrency=4, max_results=50, search_api="cursor")
+        self.assertEqual([issue['key'] for issue in data['issues']], [f"ABC-{index}" for index in range(95)])
+        self.assertEqual(session.requested_offsets, list(range(0, 95, 10)))
+
+    def test_fields_are_projected_from_output_columns(self):
+        session = FakeSearchSession(total=5, server_page_size=10)
+        self.extract(session, concurrency=1, max_results=10)
+        self.assertEqual(session.requested_fields, "summary,status,resolutiondate,description,updated")
+
+class TestProcessData(unittest.TestCase):
+    COLUMNS = [
+        'Project', 'Key', 'Updated', 'Updated_YearMonth', 'Created', 'Summary', 'Description',
+        'Issue Type', 'Status', 'Resolution', 'Resolved', 'Resolved_YearMonth', 'Assignee', 'Category'
+    ]
+
+    def test_fast_path_matches_full_normalization(self):
+        data = {"issues": synthetic_issues(200)}
+        full = process_data(data)
+        fast = process_data(data, self.COLUMNS)
+        self.assertNotIn('Category', fast.columns)
+        self.assertFalse(any(column.startswith('fields.') for column in fast.columns))
+        for column in fast.columns:
+            self.assertEqual(
+                full[column].astype(object).where(full[column].notna(), None).tolist(),
+                fast[column].astype(object).where(fast[column].notna(), None).tolist(),
+                column
+            )
+
+    def test_fast_path_always_includes_classification_inputs(self):
+        fast = process_data({"issues": synthetic_issues(3)}, ['Project'])
+        self.assertEqual(list(fast.columns), ['Project', 'Key', 'Summary', 'Description'])
+
+    def test_compact_frames_render_back_to_the_fast_path(self):
+        data = {"issues": synthetic_issues(200)}
+        fast = process_data(data, self.COLUMNS)
+        compact = process_data(data, self.COLUMNS, compact=True)
+        self.assertEqual(str(compact['Status'].dtype), "category")
+        self.assertEqual(str(compact['Resolved_YearMonth'].dtype), "category")
+        self.assertEqual(str(compact['Created'].dtype), "datetime64[s]")
+        self.assertLess(compact.memory_usage(deep=True).sum(), fast.memory_usage(deep=True).sum())
+        rendered = render_compact_frame(compact)
+        for column in fast.columns:
+            self.assertEqual(
+                fast[column].astype(object).where(fast[column].notna(), None).tolist(),
+                rendered[column].astype(object).where(rendered[column].notna(), None).tolist(),
+                column
+            )
+
+    def test_compact_without_columns_drops_raw_fields(self):
+        compact = process_data({"issues": synthetic_issues(3)}, compact=True)
+        self.assertFalse(any(column.startswith('fields.') for column in compact.columns))
+        self.assertIn('Resolved', compact.columns)
+
+    def test_descriptions_only_for_requested_keys(self):
+        issues = synthetic_issues(4)
+        frame = process_data({"issues": issues}, ['Key'], compact=True, description_keys={issues[1]['key']})
+        self.assertEqual(frame['Description'].notna().tolist(), [False, True, False, False])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+# tests/test_dedup.py
+# Unit tests for near-duplicate grouping.
+import unittest
+from pipeline.dedup import NearDuplicateIndex, normalize_text
+
+TEMPLATE = "Nightly backup job failed on database host {host}. The restore check reported checksum mismatch for volume {volume} and the on-call engineer must rerun the job and verify replication lag afterwards."
+
+class RecordingClassify:
+    def __init__(self, category="Technical Debt"):
+        self.category = category
+        self.calls = []
+
+    def __call__(self, rows):
+        self.calls.append([row['Key'] for row in rows])
+        for _ in rows:
+            yield self.category
+
+class TestNearDuplicateIndex(unittest.TestCase):
+    def test_normalize_text_collapses_numbers_and_punctuation(self):
+        self.assertEqual(normalize_text("Restore #4512 on db-07", None), normalize_text("restore 4513 on DB 08", ""))
+
+    def test_near_duplicates_share_one_classification(self):
+        index = NearDuplicateIndex(threshold=0.8)
+        rows = [
+            {'Key': 'OPS-1', 'Summary': 'Backup failed', 'Description': TEMPLATE.format(host='db-07', volume='a')},
+            {'Key': 'OPS-2', 'Summary': 'Backup failed', 'Description': TEMPLATE.format(host='db-08', volume='b')},
+            {'Key': 'OPS-3', 'Summary': 'Add dark mode', 'Description': 'Users want a dark theme for the dashboard.'},
+        ]
+        classify = RecordingClassify()
+        self.assertEqual(list(index.classify(rows, classify)), ["Technical Debt"] * 3)
+        self.assertEqual(classify.calls, [['OPS-1', 'OPS-3']])
+        self.assertEqual(index.report()['saved'], 1)
+
+    def test_shared_template_with_different_tails_is_not_a_duplicate(self):
+        # The first 2000 characters match; the pasted errors that follow do not
+        header = "Nightly job report. " * 100
+        rows = [
+            {'Key': 'OPS-1', 'Summary': 'Job failed', 'Description': header + " ".join(f"disk full on volume {name}" for name in "abcdefgh" * 40)},
+            {'Key': 'OPS-2', 'Summary': 'Job failed', 'Description': header + " ".join(f"certificate expired for {name}" for name in "ijklmnop" * 40)},
+        ]
+        classify = RecordingClassify()
+        list(NearDuplicateIndex(threshold=0.9).classify(rows, classify))
+        self.assertEqual(classify.calls, [['OPS-1', 'OPS-2']])
+
+    def test_later_windows_reuse_earlier_representatives(self):
+        index = NearDuplicateIndex()
+        first = {'Key': 'A-1', 'Summary': 'Rotate TLS certificate 2024', 'Description': 'Yearly rotation.'}
+        second = {'Key': 'A-2', 'Summary': 'Rotate TLS certificate 2025', 'Description': 'Yearly rotation.'}
+        classify = RecordingClassify()
+        list(index.classify([first], classify))
+        self.assertEqual(list(index.classify([second], classify)), ["Technical Debt"])
+        self.assertEqual(classify.calls, [['A-1']])
+
+    def test_unclassified_representatives_are_retried(self):
+        index = NearDuplicateIndex()
+        row = {'Key': 'A-1', 'Summary': 'Same text', 'Description': None}
+        list(index.classify([row], RecordingClassify("Unclassified")))
+        classify = RecordingClassify()
+        self.assertEqual(list(index.classify([dict(row, Key='A-2')], classify)), ["Technical Debt"])
+        self.assertEqual(classify.calls, [['A-2']])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+# tests/test_end_to_end.py
+# Runs the whole pipeline against the benchmark's fake JIRA and LLM servers.
+import argparse
+import json
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+from benchmarks.bench_pipeline import benchmark_config
+from benchmarks.fake_servers import FakeJiraServer, FakeLLMServer
+from pipeline.jira_pipeline import run_pipeline
+from pipeline.result_store import SQLiteResultStore
+from pipeline.snapshots import list_raw_data_files
+
+CATEGORIES = {"Product Development", "Technical Debt", "Operational Excellence", "Customer Support"}
+
+class TestEndToEnd(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.previous_directory = os.getcwd()
+        os.chdir(self.directory.name)
+        environment = {"JIRA_ACCESS_TOKEN": "fake", "JIRA_TOKEN_EXPIRES_AT": str(int(time.time()) + 3600)}
+        self.environment = mock.patch.dict(os.environ, environment)
+        self.environment.start()
+
+    def tearDown(self):
+        self.environment.stop()
+        os.chdir(self.previous_directory)
+        self.directory.cleanup()
+
+    def test_pipeline_classifies_every_issue_despite_llm_errors(self):
+        self.run_pipeline_against_fakes("offset")
+
+    def test_cursor_paging(self):
+        self.run_pipeline_against_fakes("cursor")
+
+    def run_pipeline_against_fakes(self, search_api):
+        with FakeJiraServer(150, max_page_size=40) as jira, FakeLLMServer(error_rate=0.2, seed=3) as llm:
+            config = benchmark_config(jira.search_url, llm.base_url, concurrency=4, batch_size=5, search_api=search_api)
+            config['classification']['rate_limit'] = {'max_retries': 10, 'base_delay': 0.01}
+            config['classification']['cache']['enabled'] = False
+            config['classification']['dedup']['enabled'] = False
+            run_pipeline(argparse.Namespace(select="0", max_results=100, incremental=False), config)
+        self.assertEqual(jira.requests, 4)
+        self.assertGreater(llm.errors, 0)
+        store = SQLiteResultStore("output/processed_issues.sqlite", config['output']['columns'])
+        issues = store.load()
+        store.close()
+        self.assertEqual(len(issues), 150)
+        self.assertTrue(set(issues['Category']) <= CATEGORIES)
+        with open("output/run_report.json") as file:
+            report = json.load(file)
+        self.assertEqual(report["status"], "succeeded")
+        self.assertEqual(report["stages"]["extract_page"]["items"], 150)
+        self.assertTrue(os.path.exists("output/processed_issues.csv"))
+        self.assertTrue(os.path.exists("output/cubes/month.csv"))
+
+    def test_compact_mode_stores_the_same_text(self):
+        with FakeJiraServer(150, max_page_size=40) as jira, FakeLLMServer() as llm:
+            config = benchmark_config(jira.search_url, llm.base_url, concurrency=4, batch_size=5)
+            config['processing']['compact'] = True
+            del config['output']['result_store']['export_csv']
+            for _ in range(2):
+                run_pipeline(argparse.Namespace(select="0", max_results=100, incremental=False), config)
+        store = SQLiteResultStore("output/processed_issues.sqlite", config['output']['columns'])
+        issues = store.load()
+        store.close()
+        self.assertEqual(len(issues), 150)
+        self.assertTrue(issues['Updated'].str.fullmatch(r"\d{4}-\d\d-\d\dT\d\d:\d\d:\d\d").all())
+        self.assertTrue(issues['Updated_YearMonth'].str.fullmatch(r"\d{4}-\d\d").all())
+        self.assertTrue(issues['Description'].notna().all())
+        # The CSV export reads the whole store, so it is off unless asked for
+        self.assertFalse(os.path.exists("output/processed_issues.csv"))
+
+    def test_filters_on_several_sites_share_one_run(self):
+        # Both fake sites serve the same keys, which are different issues on each site
+        with FakeJiraServer(150, max_page_size=40) as first, FakeJiraServer(60, max_page_size=40) as second, FakeLLMServer() as llm:
+            config = benchmark_config(first.search_url, llm.base_url, concurrency=4, batch_size=5)
+            config['sites'] = {'second': {'api_url': second.search_url}}
+            config['filters'] = [{'filter_id': 1}, {'filter_id': 2}, {'filter_id': 3, 'site': "second"}]
+            config['jira']['rate_limit']['max_in_flight'] = 2
+            run_pipeline(argparse.Namespace(select="0", max_results=100, incremental=False), config)
+        self.assertEqual((first.requests, second.requests), (4, 2))
+        store = SQLiteResultStore("output/processed_issues.sqlite", config['output']['columns'])
+        keys = store.load(['Key'])['Key']
+        store.close()
+        self.assertEqual(len(keys), 210)
+        self.assertEqual(keys.str.startswith("second:").sum(), 60)
+        self.assertEqual(len(list_raw_data_files("output/raw_data")), 2)
+        with open("output/raw_data/watermarks.json") as file:
+            self.assertEqual(set(json.load(file)), {"default:1,2", "second:3"})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,32 @@
+# tests/test_imports.py
+# Guards against import-time regressions of the pipeline entrypoint.
+import subprocess
+import sys
+import unittest
+from benchmarks.bench_import import DEFERRED_MODULES
+
+def modules_loaded_by(code):
+    result = subprocess.run(
+        [sys.executable, "-c", f"import sys\n{code}\nprint(' '.join(sorted(sys.modules)))"],
+        capture_output=True, text=True, check=True
+    )
+    return set(result.stdout.split())
+
+class TestDeferredImports(unittest.TestCase):
+    def test_entrypoint_imports_no_heavy_modules(self):
+        loaded = modules_loaded_by("import pipeline.jira_pipeline")
+        self.assertEqual([name for name in DEFERRED_MODULES if name in loaded], [])
+
+    def test_only_the_selected_provider_is_imported(self):
+        loaded = modules_loaded_by("from llm import get_provider\nget_provider('openai')['load']()")
+        self.assertIn('openai', loaded)
+        self.assertNotIn('anthropic', loaded)
+        self.assertNotIn('boto3', loaded)
+
+    def test_unknown_provider(self):
+        from llm import get_provider
+        with self.assertRaises(ValueError):
+            get_provider('unknown')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,9 +1,14 @@
 # tests/test_llm.py
 # Unit tests for LLMClassifier and its subclasses.
 import unittest
+from types import SimpleNamespace
+from unittest import mock
+from llm.base import LLMClassifier
+from llm.prompts import PromptBuilder
 from llm.openai_provider import OpenAIClassifier
 from llm.claude_provider import ClaudeClassifier
 from llm.bedrock_provider import BedrockClassifier
+from utils.metrics import metrics
 
 class TestLLMClassifier(unittest.TestCase):
     def test_openai_classifier(self):
@@ -21,5 +26,114 @@ class TestLLMClassifier(unittest.TestCase):
         classifier = BedrockClassifier()
         self.assertTrue(hasattr(classifier, 'classify'))
 
+class TestClaudeClassifier(unittest.TestCase):
+    def setUp(self):
+        metrics.reset()
+        self.classifier = ClaudeClassifier(api_key="test")
+        # The installed SDK's client, not a stand-in, exposes the Messages API
+        self.assertTrue(callable(self.classifier.client.messages.create))
+        self.classifier.client = mock.Mock()
+        self.classifier.client.messages.create.return_value = SimpleNamespace(
+            content=[SimpleNamespace(type="text", text=" Technical Debt\n")],
+            usage=SimpleNamespace(input_tokens=120, output_tokens=4)
+        )
+
+    def test_classify_uses_the_messages_api(self):
+        categories = [{'Name': 'Product Development'}, {'Name': 'Technical Debt'}]
+        self.assertEqual(self.classifier.classify("Refactor auth module", "Legacy code", categories), "Technical Debt")
+        request = self.classifier.client.messages.create.call_args.kwargs
+        self.assertEqual(request['model'], self.classifier.model)
+        self.assertEqual(request['max_tokens'], 50)
+        self.assertEqual(request['messages'][0]['role'], "user")
+        self.assertIn("Refactor auth module", request['messages'][0]['content'])
+        labels = {'provider': "claude", 'estimated': "false"}
+        self.assertEqual(metrics.counter("llm_prompt_tokens", **labels), 120)
+        self.assertEqual(metrics.counter("llm_completion_tokens", **labels), 4)
+
+    def test_batches_use_the_messages_api(self):
+        self.classifier.client.messages.create.return_value.content[0].text = '{"A-1": "Technical Debt", "A-2": "Product Development"}'
+        issues = [{'Key': 'A-1', 'Summary': 'Refactor', 'Description': ''}, {'Key': 'A-2', 'Summary': 'Export', 'Description': ''}]
+        results = self.classifier.classify_batch(issues, [{'Name': 'Product Development'}, {'Name': 'Technical Debt'}])
+        self.assertEqual(results, {'A-1': 'Technical Debt', 'A-2': 'Product Development'})
+        self.assertEqual(self.classifier.client.messages.create.call_count, 1)
+
+class FakeBatchClassifier(LLMClassifier):
+    def __init__(self, response):
+        self.response = response
+        self.prompts = []
+        self.single_calls = []
+
+    def complete(self, prompt, model=None, max_tokens=50):
+        self.prompts.append(prompt)
+        return self.response
+
+    def classify(self, summary, description, categories, model=None):
+        self.single_calls.append(summary)
+        return "Fallback"
+
+class TestClassifyBatch(unittest.TestCase):
+    def setUp(self):
+        self.issues = [
+            {'Key': 'ABC-1', 'Summary': 'Add export button', 'Description': ''},
+            {'Key': 'ABC-2', 'Summary': 'Refactor auth module', 'Description': 'Legacy code'},
+        ]
+        self.categories = [{'Name': 'Product Development'}, {'Name': 'Technical Debt'}]
+
+    def test_batch_response_is_parsed_by_key(self):
+        classifier = FakeBatchClassifier('Here you go: {"ABC-1": "Product Development", "ABC-2": "Technical Debt"}')
+        results = classifier.classify_batch(self.issues, self.categories)
+        self.assertEqual(results, {'ABC-1': 'Product Development', 'ABC-2': 'Technical Debt'})
+        self.assertEqual(len(classifier.prompts), 1)
+        self.assertEqual(classifier.prompts[0].count('Technical Debt'), 1)
+        self.assertEqual(classifier.single_calls, [])
+
+    def test_missing_keys_fall_back_to_single_classification(self):
+        classifier = FakeBatchClassifier('{"ABC-1": "Product Development"}')
+        results = classifier.classify_batch(self.issues, self.categories)
+        self.assertEqual(results, {'ABC-1': 'Product Development', 'ABC-2': 'Fallback'})
+        self.assertEqual(classifier.single_calls, ['Refactor auth module'])
+
+    def test_unparseable_response_falls_back_for_every_issue(self):
+        classifier = FakeBatchClassifier('Product Development')
+        results = classifier.classify_batch(self.issues, self.categories)
+        self.assertEqual(results, {'ABC-1': 'Fallback', 'ABC-2': 'Fallback'})
+
+class TestPromptBuilder(unittest.TestCase):
+    def setUp(self):
+        self.categories = [
+            {'Name': 'Product Development', 'Description': 'New features'},
+            {'Name': 'Technical Debt', 'Description': 'Refactoring'},
+        ]
+
+    def test_categories_are_rendered_compactly_once(self):
+        builder = PromptBuilder()
+        rendered = builder.render_categories(self.categories)
+        self.assertEqual(rendered, "- Product Development: New features\n- Technical Debt: Refactoring")
+        self.assertIs(builder.render_categories(list(self.categories)), rendered)
+        # The same list is found by identity without serializing it again
+        with mock.patch('llm.prompts.json.dumps') as dumps:
+            self.assertIs(builder.render_categories(self.categories), rendered)
+        dumps.assert_not_called()
+
+    def test_long_descriptions_keep_head_and_tail(self):
+        builder = PromptBuilder(max_description_tokens=50)
+        description = "START " + "x" * 10000 + " END"
+        prompt = builder.issue_prompt("Crash on login", description, self.categories)
+        self.assertIn("START", prompt)
+        self.assertIn("END", prompt)
+        self.assertIn("[... truncated ...]", prompt)
+        self.assertLess(len(prompt), 500)
+        summary = builder.metrics.summary()
+        self.assertEqual(summary['calls'], 1)
+        self.assertEqual(summary['truncated'], 1)
+        self.assertEqual(summary['max_chars'], len(prompt))
+        builder.metrics.reset()
+        self.assertEqual(builder.metrics.summary(), {"calls": 0, "truncated": 0})
+
+    def test_short_descriptions_are_untouched(self):
+        builder = PromptBuilder(max_description_chars=100)
+        self.assertEqual(builder.truncate("short", 100), ("short", False))
+        self.assertEqual(builder.fit_issue("Summary", None), ("Summary", "No description", False))
+
 if __name__ == '__main__':
     unittest.main()
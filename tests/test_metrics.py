@@ -0,0 +1,68 @@
+# tests/test_metrics.py
+# Unit tests for run instrumentation.
+import json
+import os
+import tempfile
+import unittest
+from utils.metrics import Histogram, RunMetrics, metrics
+from utils.rate_limit import Throttle
+from pipeline.jira_pipeline import classify_rows
+
+class FlakyError(Exception):
+    status_code = 503
+
+class EchoClassifier:
+    def classify(self, summary, description, categories, model=None):
+        return summary
+
+class TestHistogram(unittest.TestCase):
+    def test_quantiles_interpolate_within_buckets(self):
+        histogram = Histogram(buckets=(1.0, 2.0, float('inf')))
+        for value in (0.5, 0.5, 1.5, 1.5, 100.0):
+            histogram.observe(value)
+        self.assertEqual(histogram.counts, [2, 2, 1])
+        self.assertAlmostEqual(histogram.quantile(0.5), 1.25)
+        # The overflow bucket reports its lower bound
+        self.assertEqual(histogram.quantile(1.0), 2.0)
+        self.assertIsNone(Histogram().quantile(0.5))
+
+class TestRunMetrics(unittest.TestCase):
+    def test_stage_report_and_prometheus_text(self):
+        run = RunMetrics()
+        run.observe("normalize", 10.0, 10.5, items=100)
+        run.observe("normalize", 10.5, 12.0, items=300)
+        run.increment("retries", endpoint="JIRA")
+        run.increment("retries", 2, endpoint="JIRA")
+        report = run.report(status="succeeded")
+        stage = report["stages"]["normalize"]
+        self.assertEqual((stage["calls"], stage["items"]), (2, 400))
+        self.assertEqual(stage["items_per_second"], 200.0)
+        self.assertEqual(report["counters"], [{"name": "retries", "labels": {"endpoint": "JIRA"}, "value": 3}])
+        text = run.prometheus_text()
+        self.assertIn('capacity_tracker_stage_duration_seconds_bucket{stage="normalize",le="+Inf"} 2', text)
+        self.assertIn('capacity_tracker_stage_duration_seconds_count{stage="normalize"} 2', text)
+        self.assertIn('capacity_tracker_retries_total{endpoint="JIRA"} 3', text)
+        with tempfile.TemporaryDirectory() as directory:
+            report_path = os.path.join(directory, "run_report.json")
+            prometheus_path = os.path.join(directory, "metrics.prom")
+            run.write(report_path, prometheus_path, status="succeeded")
+            with open(report_path) as file:
+                self.assertEqual(json.load(file)["status"], "succeeded")
+            self.assertTrue(os.path.exists(prometheus_path))
+
+    def test_pipeline_records_classify_calls_and_retries(self):
+        metrics.reset()
+        rows = [{'Key': f"A-{i}", 'Summary': f"S{i}", 'Description': ''} for i in range(5)]
+        list(classify_rows(EchoClassifier(), rows, [], None, concurrency=2))
+        self.assertEqual(metrics.report()["stages"]["classify_call"]["items"], 5)
+        attempts = []
+        def flaky():
+            attempts.append(1)
+            if len(attempts) < 3:
+                raise FlakyError()
+            return "ok"
+        Throttle("Test", base_delay=0.0).call(flaky)
+        self.assertEqual(metrics.counter("retries", endpoint="Test"), 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+# tests/test_pipeline.py
+# Unit tests for the classification pipeline.
+import os
+import tempfile
+import threading
+import time
+import unittest
+import pandas as pd
+from pipeline.checkpoint import CheckpointWriter
+from pipeline.result_store import CSVResultStore
+from pipeline.jira_pipeline import classify_rows
+
+class SlowClassifier:
+    def __init__(self):
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+
+    def classify(self, summary, description, categories, model=None):
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        # Later issues finish first so ordering relies on classify_rows, not timing
+        time.sleep(0.01 * (10 - int(summary)))
+        with self.lock:
+            self.active -= 1
+        return f"Category {summary}"
+
+    def classify_batch(self, issues, categories, model=None):
+        return {issue['Key']: f"Batch {issue['Summary']}" for issue in issues}
+
+class TestClassifyRows(unittest.TestCase):
+    def setUp(self):
+        self.rows = [{'Key': f"ISSUE-{i}", 'Summary': str(i), 'Description': ""} for i in range(10)]
+
+    def test_sequential_results_follow_input_order(self):
+        classifier = SlowClassifier()
+        results = list(classify_rows(classifier, self.rows, [], None, concurrency=1))
+        self.assertEqual(results, [f"Category {i}" for i in range(10)])
+        self.assertEqual(classifier.max_active, 1)
+
+    def test_concurrent_results_follow_input_order(self):
+        classifier = SlowClassifier()
+        results = list(classify_rows(classifier, self.rows, [], None, concurrency=4))
+        self.assertEqual(results, [f"Category {i}" for i in range(10)])
+        self.assertLessEqual(classifier.max_active, 4)
+        self.assertGreater(classifier.max_active, 1)
+
+    def test_batches_results_follow_input_order(self):
+        classifier = SlowClassifier()
+        results = list(classify_rows(classifier, self.rows, [], None, concurrency=2, batch_size=3))
+        # The trailing batch holds a single issue and goes through classify
+        self.assertEqual(results, [f"Batch {i}" for i in range(9)] + ["Category 9"])
+
+class TestCheckpointWriter(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "processed_issues.csv")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_flushes_every_n_rows_and_appends_across_runs(self):
+        writer = CheckpointWriter(CSVResultStore(self.path, ['Key', 'Category']), every_n=2, every_seconds=None)
+        writer.add({'Key': 'A-1', 'Category': 'Technical Debt', 'Summary': 'ignored'})
+        self.assertFalse(os.path.exists(self.path))
+        writer.add({'Key': 'A-2', 'Category': 'Technical Debt'})
+        self.assertEqual(len(pd.read_csv(self.path)), 2)
+        # A second run keeps the existing header and only appends
+        writer = CheckpointWriter(CSVResultStore(self.path, ['Category', 'Key']), every_n=10, every_seconds=None)
+        writer.add({'Key': 'A-3', 'Category': 'Customer Support'})
+        writer.flush()
+        processed = pd.read_csv(self.path)
+        self.assertEqual(list(processed.columns), ['Key', 'Category'])
+        self.assertEqual(list(processed['Key']), ['A-1', 'A-2', 'A-3'])
+
+    def test_flushes_after_interval(self):
+        writer = CheckpointWriter(CSVResultStore(self.path, ['Key', 'Category']), every_n=100, every_seconds=0)
+        writer.add({'Key': 'A-1', 'Category': 'Technical Debt'})
+        self.assertEqual(len(pd.read_csv(self.path)), 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+# tests/test_preclassifier.py
+# Unit tests for the local pre-classifier.
+import os
+import random
+import tempfile
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+import pandas as pd
+from llm.prompts import PromptBuilder
+from pipeline.jira_pipeline import classify_issue_chunks, preclassify_rows
+from pipeline.preclassifier import LocalPreClassifier, TRAINING_COLUMNS
+from pipeline.result_store import SQLiteResultStore
+
+CATEGORIES = [{'Name': 'Customer Support'}, {'Name': 'Technical Debt'}]
+
+def labelled_issues(count, seed=0):
+    rng = random.Random(seed)
+    rows = []
+    for index in range(count):
+        if index % 2:
+            rows.append({'Summary': f"Customer ticket {rng.choice(['refund', 'login', 'invoice'])} escalation",
+                         'Issue Type': 'Support', 'Project': 'Helpdesk', 'Category': 'Customer Support'})
+        else:
+            rows.append({'Summary': f"Refactor legacy {rng.choice(['auth', 'billing', 'search'])} module",
+                         'Issue Type': 'Task', 'Project': 'Platform', 'Category': 'Technical Debt'})
+    return pd.DataFrame(rows)
+
+class RecordingClassifier:
+    def __init__(self):
+        self.calls = []
+        self.prompt_builder = PromptBuilder()
+
+    def classify(self, summary, description, categories, model=None):
+        self.calls.append(summary)
+        return "Technical Debt"
+
+class TestLocalPreClassifier(unittest.TestCase):
+    def test_disabled_without_config_or_enough_rows(self):
+        self.assertIsNone(LocalPreClassifier.from_config(labelled_issues(400), CATEGORIES, None))
+        self.assertIsNone(LocalPreClassifier.from_config(labelled_issues(10), CATEGORIES, {'enabled': True}))
+
+    def test_confident_rows_skip_the_llm(self):
+        preclassifier = LocalPreClassifier.from_config(labelled_issues(400), CATEGORIES, {'enabled': True})
+        self.assertIsNotNone(preclassifier)
+        rows = [
+            {'Key': 'A-1', 'Summary': 'Customer ticket refund escalation', 'Description': '', 'Issue Type': 'Support', 'Project': 'Helpdesk'},
+            {'Key': 'A-2', 'Summary': 'Quarterly planning offsite', 'Description': '', 'Issue Type': None, 'Project': None},
+        ]
+        classifier = RecordingClassifier()
+        results = list(preclassify_rows(preclassifier, None, classifier, rows, CATEGORIES, None))
+        self.assertEqual(results, ['Customer Support', 'Technical Debt'])
+        self.assertEqual(classifier.calls, ['Quarterly planning offsite'])
+        report = preclassifier.report()
+        self.assertEqual((report['deflected'], report['routed']), (1, 1))
+
+    def test_labels_outside_current_categories_are_ignored(self):
+        issues = labelled_issues(400)
+        issues['Category'] = 'Retired Category'
+        self.assertIsNone(LocalPreClassifier.from_config(issues, CATEGORIES, {'enabled': True}))
+
+    def test_trains_on_llm_labels_only(self):
+        settings = {'enabled': True}
+        issues = labelled_issues(400).assign(Category_Source="preclassifier")
+        self.assertIsNone(LocalPreClassifier.from_config(issues, CATEGORIES, settings))
+        issues['Category_Source'] = ["llm" if index < 100 else "dedup" for index in range(400)]
+        self.assertIsNone(LocalPreClassifier.from_config(issues, CATEGORIES, settings))
+        # Rows stored before sources were recorded count as LLM labels
+        issues['Category_Source'] = None
+        self.assertIsNotNone(LocalPreClassifier.from_config(issues, CATEGORIES, settings))
+
+    def test_classified_rows_record_their_source(self):
+        columns = ['Key', 'Summary', 'Description', 'Issue Type', 'Project', 'Category']
+        config = {
+            'classification': {
+                'categories': CATEGORIES,
+                'preclassifier': {'enabled': True},
+                'dedup': {'enabled': True},
+                'checkpoint': {'every_n_issues': 1}
+            },
+            'output': {'columns': columns}
+        }
+        history = labelled_issues(400).assign(Description="Long description " * 100, Category_Source="llm")
+        history['Key'] = [f"OLD-{index}" for index in range(400)]
+        chunk = pd.DataFrame([
+            {'Key': 'A-1', 'Summary': 'Customer ticket refund escalation', 'Description': '', 'Issue Type': 'Support', 'Project': 'Helpdesk'},
+            {'Key': 'A-2', 'Summary': 'Quarterly planning offsite', 'Description': 'Agenda', 'Issue Type': None, 'Project': None},
+            {'Key': 'A-3', 'Summary': 'Quarterly planning offsite', 'Description': 'Agenda', 'Issue Type': None, 'Project': None},
+        ])
+        with tempfile.TemporaryDirectory() as directory:
+            store = SQLiteResultStore(os.path.join(directory, "processed_issues.sqlite"), columns + ['Category_Source'])
+            store.upsert_many(history.to_dict('records'))
+            classifier = RecordingClassifier()
+            with mock.patch.object(store, 'load', wraps=store.load) as load:
+                list(classify_issue_chunks([chunk], config, store, resources=SimpleNamespace(classifier=classifier, cache=None)))
+            # Training reads only the columns it uses, never Description
+            load.assert_called_once_with(TRAINING_COLUMNS)
+            sources = store.load(['Key', 'Category_Source']).set_index('Key')['Category_Source']
+            store.close()
+        self.assertEqual(classifier.calls, ['Quarterly planning offsite'])
+        self.assertEqual(sources[['A-1', 'A-2', 'A-3']].tolist(), ['preclassifier', 'llm', 'dedup'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,131 @@
+# tests/test_rate_limit.py
+# Unit tests for the shared rate limiting and retry layer.
+import threading
+import time
+import unittest
+from utils.rate_limit import Throttle, TokenBucket, is_retryable, retry_delay_from_headers
+
+class FakeResponse:
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+class FakeHTTPError(Exception):
+    def __init__(self, status_code, headers=None):
+        super().__init__(f"HTTP {status_code}")
+        self.response = FakeResponse(status_code, headers)
+
+class FakeClientError(Exception):
+    def __init__(self, code):
+        super().__init__(code)
+        self.response = {'Error': {'Code': code}, 'ResponseMetadata': {'HTTPStatusCode': 400, 'HTTPHeaders': {}}}
+
+class TestRateLimit(unittest.TestCase):
+    def test_retryable_errors(self):
+        self.assertTrue(is_retryable(FakeHTTPError(429)))
+        self.assertTrue(is_retryable(FakeHTTPError(503)))
+        self.assertFalse(is_retryable(FakeHTTPError(401)))
+        self.assertTrue(is_retryable(FakeClientError('ThrottlingException')))
+        self.assertFalse(is_retryable(FakeClientError('ValidationException')))
+        self.assertTrue(is_retryable(ConnectionError("reset")))
+        self.assertFalse(is_retryable(ValueError("bad")))
+
+    def test_retry_delay_headers(self):
+        self.assertEqual(retry_delay_from_headers({'Retry-After': '3'}), 3.0)
+        self.assertEqual(retry_delay_from_headers({'retry-after-ms': '250'}), 0.25)
+        self.assertEqual(retry_delay_from_headers({'x-ratelimit-reset-requests': '1m30s', 'x-ratelimit-reset-tokens': '20ms'}), 90.0)
+        self.assertEqual(retry_delay_from_headers({'X-RateLimit-Reset': '2000-01-01T00:00Z'}), 0.0)
+        self.assertIsNone(retry_delay_from_headers({}))
+        self.assertEqual(retry_delay_from_headers({'Retry-After': 'Sat, 01 Jan 2000 00:00:00 GMT'}), 0.0)
+        self.assertEqual(retry_delay_from_headers({'Retry-After': 'Sat, 01 Jan 2000 00:00:00 -0000'}), 0.0)
+        # Malformed values give no hint instead of raising
+        self.assertIsNone(retry_delay_from_headers({'Retry-After': 'abc'}))
+        self.assertIsNone(retry_delay_from_headers({'Retry-After': ''}))
+
+    def test_malformed_retry_after_falls_back_to_backoff(self):
+        throttle = Throttle("test", max_retries=2, base_delay=0.001, max_delay=0.01)
+        attempts = []
+
+        def rate_limited_once():
+            attempts.append(1)
+            if len(attempts) == 1:
+                raise FakeHTTPError(429, {'Retry-After': 'abc'})
+            return "ok"
+
+        self.assertEqual(throttle.call(rate_limited_once), "ok")
+        self.assertEqual(throttle.retries, 1)
+
+    def test_call_retries_transient_errors_then_succeeds(self):
+        throttle = Throttle("test", max_retries=3, base_delay=0.001, max_delay=0.01)
+        attempts = []
+
+        def flaky():
+            attempts.append(1)
+            if len(attempts) < 3:
+                raise FakeHTTPError(429, {'Retry-After': '0'})
+            return "ok"
+
+        self.assertEqual(throttle.call(flaky), "ok")
+        self.assertEqual(len(attempts), 3)
+        self.assertEqual(throttle.retries, 2)
+
+    def test_call_gives_up_after_max_retries_and_on_permanent_errors(self):
+        throttle = Throttle("test", max_retries=2, base_delay=0.001, max_delay=0.01)
+        attempts = []
+
+        def always_unavailable():
+            attempts.append(1)
+            raise FakeHTTPError(503)
+
+        with self.assertRaises(FakeHTTPError):
+            throttle.call(always_unavailable)
+        self.assertEqual(len(attempts), 3)
+        with self.assertRaises(FakeHTTPError):
+            throttle.call(lambda: (_ for _ in ()).throw(FakeHTTPError(400)))
+        self.assertEqual(throttle.retries, 2)
+
+    def test_retries_are_counted_across_threads(self):
+        throttle = Throttle("test", max_retries=1, base_delay=0, max_delay=0)
+
+        def fail_once(attempts):
+            attempts.append(1)
+            if len(attempts) == 1:
+                raise FakeHTTPError(503)
+
+        threads = [threading.Thread(target=throttle.call, args=(fail_once, [])) for _ in range(50)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(throttle.retries, 50)
+
+    def test_max_in_flight_caps_concurrent_calls(self):
+        throttle = Throttle("test", max_in_flight=2)
+        lock = threading.Lock()
+        running = []
+        peak = []
+
+        def request():
+            with lock:
+                running.append(1)
+                peak.append(len(running))
+            time.sleep(0.01)
+            with lock:
+                running.pop()
+
+        threads = [threading.Thread(target=throttle.call, args=(request,)) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(max(peak), 2)
+
+    def test_token_bucket_paces_requests(self):
+        bucket = TokenBucket(rate=100, capacity=1)
+        started = time.monotonic()
+        for _ in range(6):
+            bucket.acquire()
+        self.assertGreaterEqual(time.monotonic() - started, 0.04)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+# tests/test_result_store.py
+# Unit tests for the classified issue stores.
+import os
+import tempfile
+import unittest
+import pandas as pd
+from pipeline.result_store import SQLiteResultStore, CSVResultStore, open_result_store
+
+COLUMNS = ['Key', 'Summary', 'Category']
+
+class TestSQLiteResultStore(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "processed_issues.sqlite")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_upserts_replace_rows_by_key(self):
+        store = SQLiteResultStore(self.path, COLUMNS)
+        store.upsert_many([
+            {'Key': 'A-1', 'Summary': 'Old', 'Category': 'Technical Debt', 'Description': 'not stored'},
+            {'Key': 'A-2', 'Summary': 'Other', 'Category': float('nan')},
+        ])
+        store.upsert_many([{'Key': 'A-1', 'Summary': 'New', 'Category': 'Customer Support'}])
+        self.assertEqual(store.count(), 2)
+        self.assertEqual(store.existing_keys(['A-1', 'A-3']), {'A-1'})
+        loaded = store.load()
+        self.assertEqual(list(loaded.columns), COLUMNS)
+        self.assertEqual(loaded.set_index('Key').loc['A-1', 'Category'], 'Customer Support')
+        self.assertTrue(pd.isna(loaded.set_index('Key').loc['A-2', 'Category']))
+        store.close()
+
+    def test_refresh_keeps_category_summary_and_description(self):
+        columns = ['Key', 'Summary', 'Description', 'Status', 'Resolved', 'Category']
+        store = SQLiteResultStore(self.path, columns)
+        store.upsert_many([{'Key': 'A-1', 'Summary': 'Old', 'Description': 'Text', 'Status': 'Open', 'Resolved': None, 'Category': 'Technical Debt'}])
+        refreshed = {'Key': 'A-1', 'Summary': 'New', 'Description': None, 'Status': 'Done', 'Resolved': '2024-05-01T00:00:00'}
+        self.assertEqual(store.refresh_many([refreshed, {'Key': 'A-2', 'Status': 'Open'}]), 1)
+        # Unchanged rows are not written again
+        self.assertEqual(store.refresh_many([refreshed]), 0)
+        self.assertEqual(store.load().to_dict('records'), [
+            {'Key': 'A-1', 'Summary': 'Old', 'Description': 'Text', 'Status': 'Done', 'Resolved': '2024-05-01T00:00:00', 'Category': 'Technical Debt'}
+        ])
+        store.close()
+
+    def test_existing_keys_handles_more_keys_than_one_query(self):
+        store = SQLiteResultStore(self.path, COLUMNS)
+        store.upsert_many([{'Key': f"A-{i}", 'Summary': '', 'Category': 'X'} for i in range(1200)])
+        self.assertEqual(len(store.existing_keys(f"A-{i}" for i in range(0, 2400, 2))), 600)
+        store.close()
+
+    def test_imports_existing_csv_once_and_exports(self):
+        csv_path = os.path.join(self.directory.name, "processed_issues.csv")
+        pd.DataFrame([
+            {'Key': 'A-1', 'Summary': 'First', 'Category': 'Technical Debt'},
+            {'Key': 'A-1', 'Summary': 'Again', 'Category': 'Customer Support'},
+        ]).to_csv(csv_path, index=False)
+        store = open_result_store({'output': {'columns': COLUMNS, 'result_store': {'path': self.path}}}, csv_path)
+        self.assertEqual(store.load()['Category'].tolist(), ['Customer Support'])
+        store.upsert_many([{'Key': 'A-2', 'Summary': 'Second', 'Category': 'Technical Debt'}])
+        store.export_csv(csv_path)
+        store.close()
+        self.assertEqual(pd.read_csv(csv_path)['Key'].tolist(), ['A-1', 'A-2'])
+        # The store is not empty any more, so the CSV is not imported again
+        store = SQLiteResultStore(self.path, COLUMNS, import_csv=csv_path)
+        self.assertEqual(store.count(), 2)
+        store.close()
+
+class TestCSVResultStore(unittest.TestCase):
+    def test_last_row_per_key_wins(self):
+        with tempfile.TemporaryDirectory() as directory:
+            store = CSVResultStore(os.path.join(directory, "processed_issues.csv"), COLUMNS)
+            self.assertEqual(store.existing_keys(['A-1']), set())
+            store.upsert_many([{'Key': 'A-1', 'Summary': 'Old', 'Category': 'Technical Debt'}])
+            store.upsert_many([{'Key': 'A-1', 'Summary': 'New', 'Category': 'Customer Support'}])
+            self.assertEqual(store.existing_keys(['A-1', 'A-2']), {'A-1'})
+            self.assertEqual(store.load()['Summary'].tolist(), ['New'])
+
+    def test_refresh_appends_changed_rows_with_their_category(self):
+        columns = ['Key', 'Summary', 'Status', 'Resolved', 'Category']
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "processed_issues.csv")
+            store = CSVResultStore(path, columns)
+            store.upsert_many([
+                {'Key': 'A-1', 'Summary': 'Old', 'Status': 'Open', 'Resolved': None, 'Category': 'Technical Debt'},
+                {'Key': 'A-2', 'Summary': 'Other', 'Status': 'Done', 'Resolved': '2024-01-01T00:00:00', 'Category': 'Customer Support'},
+            ])
+            rows = [
+                {'Key': 'A-1', 'Summary': 'New', 'Status': 'Done', 'Resolved': '2024-05-01T00:00:00'},
+                {'Key': 'A-2', 'Summary': 'Other', 'Status': 'Done', 'Resolved': '2024-01-01T00:00:00'},
+            ]
+            self.assertEqual(store.refresh_many(rows), 1)
+            self.assertEqual(store.refresh_many(rows), 0)
+            self.assertEqual(len(pd.read_csv(path)), 3)
+            stored = store.load().set_index('Key')
+            self.assertEqual(stored.loc['A-1', 'Summary'], 'Old')
+            self.assertEqual(stored.loc['A-1', 'Resolved'], '2024-05-01T00:00:00')
+            self.assertEqual(stored.loc['A-1', 'Category'], 'Technical Debt')
+
+    def test_existing_file_gets_the_category_source_column(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "processed_issues.csv")
+            pd.DataFrame([{'Key': 'A-1', 'Summary': 'Old', 'Category': 'Technical Debt'}]).to_csv(path, index=False)
+            store = open_result_store({'output': {'columns': COLUMNS, 'result_store': {'backend': "csv"}}}, path)
+            self.assertEqual(store.columns, COLUMNS + ['Category_Source'])
+            store.upsert_many([{'Key': 'A-2', 'Summary': 'New', 'Category': 'Customer Support', 'Category_Source': 'llm'}])
+            loaded = store.load(['Key', 'Category_Source'])
+            self.assertEqual(list(loaded.columns), ['Key', 'Category_Source'])
+            self.assertTrue(pd.isna(loaded['Category_Source'][0]))
+            self.assertEqual(loaded['Category_Source'][1], 'llm')
+
+if __name__ == '__main__':
+    unittest.main()
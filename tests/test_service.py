@@ -0,0 +1,92 @@
+# tests/test_service.py
+# Runs the service mode against the benchmark's fake JIRA and LLM servers.
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+import urllib.request
+from unittest import mock
+from benchmarks.bench_pipeline import benchmark_config
+from benchmarks.fake_servers import FakeJiraServer, FakeLLMServer
+from pipeline.service import PipelineService
+from pipeline.snapshots import list_raw_data_files
+
+class TestService(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.previous_directory = os.getcwd()
+        os.chdir(self.directory.name)
+        environment = {"JIRA_ACCESS_TOKEN": "fake", "JIRA_TOKEN_EXPIRES_AT": str(int(time.time()) + 3600)}
+        self.environment = mock.patch.dict(os.environ, environment)
+        self.environment.start()
+
+    def tearDown(self):
+        self.environment.stop()
+        os.chdir(self.previous_directory)
+        self.directory.cleanup()
+
+    def wait_for_runs(self, service, runs):
+        deadline = time.monotonic() + 30
+        while service.status()['runs'] < runs or service.status()['state'] != "idle":
+            self.assertLess(time.monotonic(), deadline, "service run did not finish")
+            time.sleep(0.05)
+        return service.status()
+
+    def request(self, service, method, path):
+        url = f"http://127.0.0.1:{service.httpd.server_address[1]}{path}"
+        with urllib.request.urlopen(urllib.request.Request(url, method=method, data=b"" if method == "POST" else None)) as response:
+            return response.status, response.read().decode()
+
+    def test_scheduled_and_requested_runs_reuse_warm_resources(self):
+        with FakeJiraServer(120, max_page_size=40) as jira, FakeLLMServer() as llm:
+            config = benchmark_config(jira.search_url, llm.base_url, concurrency=4, batch_size=5)
+            config['service'] = {'interval_minutes': 60, 'host': "127.0.0.1", 'port': 0}
+            service = PipelineService.from_config(config, max_results=100)
+            service.start_http()
+            runner = threading.Thread(target=service.run_forever)
+            runner.start()
+            try:
+                status = self.wait_for_runs(service, 1)
+                self.assertEqual(status['last_run']['status'], "succeeded")
+                self.assertEqual(status['last_run']['issues_classified'], 120)
+                resources = service.resources
+                llm_requests = llm.requests
+
+                code, body = self.request(service, "POST", "/refresh")
+                self.assertEqual(code, 202)
+                status = self.wait_for_runs(service, 2)
+                self.assertEqual(status['last_run']['trigger'], "refresh")
+                self.assertEqual(status['last_run']['issues_classified'], 0)
+                self.assertIs(service.resources, resources)
+                self.assertEqual(llm.requests, llm_requests)
+                # The first run's snapshot is merged into the second's and removed
+                self.assertEqual(len(list_raw_data_files("output/raw_data")), 1)
+
+                code, body = self.request(service, "GET", "/status")
+                self.assertEqual(json.loads(body)['runs'], 2)
+                code, body = self.request(service, "GET", "/metrics")
+                self.assertIn("capacity_tracker_stage_items_total", body)
+            finally:
+                service.stop()
+                runner.join(timeout=30)
+                service.httpd.server_close()
+            self.assertFalse(runner.is_alive())
+            self.assertIsNone(service.resources)
+
+    def test_failure_to_open_resources_is_a_failed_run(self):
+        config = benchmark_config("http://127.0.0.1:9/rest/api/3/search", "http://127.0.0.1:9/v1")
+        service = PipelineService(config, interval_minutes=60)
+        with mock.patch('pipeline.service.WarmResources', side_effect=[RuntimeError("database is locked"), mock.DEFAULT]), \
+                mock.patch('pipeline.service.run_pipeline', return_value=5):
+            self.assertEqual(service.run_once("startup"), "failed")
+            status = service.status()
+            self.assertEqual((status['state'], status['failures']), ("idle", 1))
+            self.assertEqual(status['last_run']['error'], "database is locked")
+            self.assertIsNone(service.resources)
+            self.assertEqual(service.run_once("schedule"), "succeeded")
+            self.assertIsNotNone(service.resources)
+
+if __name__ == '__main__':
+    unittest.main()
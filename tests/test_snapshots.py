@@ -0,0 +1,103 @@
+# tests/test_snapshots.py
+# Unit tests for raw snapshots, watermarks and incremental merging.
+import json
+import os
+import tempfile
+import unittest
+from benchmarks.synthetic import synthetic_issues
+from pipeline.snapshots import (
+    SnapshotWriter, is_multi_selection, process_snapshots, resolve_snapshot_selection, iter_snapshot_pages, jql_updated_since, list_raw_data_files, load_snapshot,
+    load_watermark, max_updated, merge_issues, save_watermark
+)
+
+def issue(key, updated, summary="Summary", description=None):
+    return {'key': key, 'fields': {'updated': updated, 'summary': summary, 'description': description}}
+
+class TestSnapshots(unittest.TestCase):
+    def test_max_updated_compares_time_zones(self):
+        issues = [
+            issue('A-1', "2024-03-01T10:00:00.000+0000"),
+            issue('A-2', "2024-03-01T11:30:00.000+0200"),
+            issue('A-3', None),
+        ]
+        self.assertEqual(max_updated(issues), "2024-03-01T10:00:00.000+0000")
+        self.assertIsNone(max_updated([]))
+
+    def test_jql_updated_since_applies_overlap_in_utc(self):
+        self.assertEqual(jql_updated_since("2024-03-01T12:30:45.000+0200", overlap_minutes=60), "2024-03-01 09:30")
+
+    def test_merge_reports_only_text_changes(self):
+        previous = [issue('A-1', "t1", "Old"), issue('A-2', "t1", "Same")]
+        delta = [issue('A-1', "t2", "New"), issue('A-2', "t2", "Same"), issue('A-3', "t2", "Added")]
+        merged, changed_keys = merge_issues(previous, delta)
+        self.assertEqual([item['key'] for item in merged], ['A-1', 'A-2', 'A-3'])
+        self.assertEqual(merged[1]['fields']['updated'], "t2")
+        self.assertEqual(changed_keys, {'A-1', 'A-3'})
+
+    def test_watermarks_are_kept_per_filter(self):
+        with tempfile.TemporaryDirectory() as directory:
+            self.assertIsNone(load_watermark(directory, "1"))
+            save_watermark(directory, "1", "2024-03-01T10:00:00.000+0000", "a.json")
+            save_watermark(directory, 2, "2024-04-01T10:00:00.000+0000", "b.json")
+            self.assertEqual(load_watermark(directory, 1)['snapshot'], "a.json")
+            self.assertEqual(load_watermark(directory, "2")['updated'], "2024-04-01T10:00:00.000+0000")
+
+    def test_snapshot_writer_streams_pages(self):
+        with tempfile.TemporaryDirectory() as directory:
+            pages = [[issue('A-1', "2024-03-01T10:00:00.000+0000")], [], [issue('A-2', "2024-03-02T10:00:00.000+0000")]]
+            writer = SnapshotWriter(directory)
+            passed_through = list(writer.write_pages(pages))
+            self.assertEqual(passed_through, pages)
+            self.assertEqual(list_raw_data_files(directory), [])
+            path = writer.close()
+            self.assertEqual(list_raw_data_files(directory), [path])
+            self.assertEqual([item['key'] for item in load_snapshot(path)['issues']], ['A-1', 'A-2'])
+            self.assertEqual(writer.max_updated, "2024-03-02T10:00:00.000+0000")
+            self.assertEqual([len(page) for page in iter_snapshot_pages(path, page_size=1)], [1, 1])
+
+    def test_ndjson_snapshots_round_trip_and_list_with_json(self):
+        with tempfile.TemporaryDirectory() as directory:
+            old_path = os.path.join(directory, "jira_raw_data_20240101_000000.json")
+            with open(old_path, "w") as json_file:
+                json_file.write('{"issues": [{"key": "A-1", "fields": {}}]}')
+            writer = SnapshotWriter(directory, "ndjson.gz")
+            list(writer.write_pages([[issue('A-2', "2024-03-01T10:00:00.000+0000"), issue('A-3', None)]]))
+            path = writer.close()
+            self.assertTrue(path.endswith(".ndjson.gz"))
+            self.assertEqual(list_raw_data_files(directory), [old_path, path])
+            self.assertEqual([item['key'] for item in load_snapshot(path)['issues']], ['A-2', 'A-3'])
+            self.assertEqual([item['key'] for item in load_snapshot(old_path)['issues']], ['A-1'])
+
+    def test_process_snapshots_keeps_latest_update_per_key(self):
+        with tempfile.TemporaryDirectory() as directory:
+            older, newer = synthetic_issues(3), synthetic_issues(3)
+            newer[0]['fields']['updated'] = "2030-01-01T00:00:00.000+0000"
+            newer[0]['fields']['summary'] = "Edited"
+            newer[1]['fields']['updated'] = "2000-01-01T00:00:00.000+0000"
+            paths = []
+            for name, issues in (("20240101_000000", older), ("20240201_000000", newer)):
+                paths.append(os.path.join(directory, f"jira_raw_data_{name}.json"))
+                with open(paths[-1], "w") as json_file:
+                    json.dump({"issues": issues}, json_file)
+            self.assertTrue(is_multi_selection("all"))
+            self.assertTrue(is_multi_selection("jira_raw_data_2024*"))
+            self.assertFalse(is_multi_selection("2"))
+            self.assertEqual(resolve_snapshot_selection("all", directory), paths)
+            self.assertEqual(resolve_snapshot_selection("jira_raw_data_202402*", directory), paths[1:])
+            # An aborted snapshot and the watermarks file are never selected
+            open(os.path.join(directory, "jira_raw_data_20240301_000000.json.partial"), "w").close()
+            save_watermark(directory, "1", "2024-03-01T10:00:00.000+0000", paths[1])
+            self.assertEqual(resolve_snapshot_selection("jira_raw_data_*", directory), paths)
+            self.assertEqual(resolve_snapshot_selection("*", directory), paths)
+            for workers in (1, 2):
+                merged = process_snapshots(paths, ['Key', 'Summary'], workers=workers).set_index('Key')
+                self.assertEqual(len(merged), 3)
+                self.assertEqual(merged.loc[older[0]['key'], 'Summary'], "Edited")
+                self.assertEqual(merged.loc[older[1]['key'], 'Summary'], older[1]['fields']['summary'])
+            merged = process_snapshots(paths, ['Key', 'Summary', 'Status'], workers=1, compact=True).set_index('Key')
+            self.assertEqual(merged.loc[older[0]['key'], 'Summary'], "Edited")
+            self.assertEqual(str(merged['Status'].dtype), "category")
+            self.assertEqual(str(merged['Updated'].dtype), "datetime64[s]")
+
+if __name__ == '__main__':
+    unittest.main()
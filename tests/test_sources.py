@@ -0,0 +1,87 @@
+# tests/test_sources.py
+# Unit tests for multi-filter, multi-site extraction.
+import threading
+import unittest
+from pipeline.data_processing import filter_jql
+from pipeline.snapshots import watermark_key
+from pipeline.sources import jira_sources, merge_page_streams, namespace_pages, site_key_prefix
+
+def issues(*keys):
+    return [{'key': key} for key in keys]
+
+class TestSources(unittest.TestCase):
+    CONFIG = {
+        'jira': {'api_url': "https://jira.example.com/rest/api/3/search", 'search_jql_url': "https://jira.example.com/rest/api/3/search/jql", 'concurrency': 2},
+        'sites': {'eu': {'api_url': "https://eu.example.com/rest/api/3/search"}},
+        'output': {'columns': ['Key']}
+    }
+
+    def test_single_filter_config_is_one_unnamed_source(self):
+        config = dict(self.CONFIG, filters={'filter_id': "18195"})
+        sources = jira_sources(config)
+        self.assertEqual(sources, [{'name': None, 'config': config}])
+        self.assertEqual(watermark_key(config['filters']), "18195")
+        self.assertEqual(filter_jql("18195"), "filter=18195")
+
+    def test_filters_are_grouped_per_site(self):
+        config = dict(self.CONFIG, filters=[
+            {'filter_id': 1}, {'filter_id': 2, 'site': "eu"}, {'filter_id': 3}, {'filter_id': 1}
+        ])
+        default, eu = jira_sources(config)
+        self.assertEqual(default['name'], "default")
+        self.assertEqual(default['config']['filters']['filter_id'], ["1", "3"])
+        self.assertEqual(default['config']['jira']['api_url'], self.CONFIG['jira']['api_url'])
+        self.assertEqual(filter_jql(default['config']['filters']['filter_id']), "filter in (1, 3)")
+        self.assertEqual(eu['config']['jira']['api_url'], "https://eu.example.com/rest/api/3/search")
+        self.assertNotIn('search_jql_url', eu['config']['jira'])
+        self.assertEqual(eu['config']['jira']['concurrency'], 2)
+        self.assertEqual(filter_jql(eu['config']['filters']['filter_id']), "filter=2")
+        self.assertEqual(watermark_key(default['config']['filters']), "default:1,3")
+        self.assertEqual(watermark_key(eu['config']['filters']), "eu:2")
+
+    def test_unknown_site_is_rejected(self):
+        with self.assertRaises(ValueError):
+            jira_sources(dict(self.CONFIG, filters=[{'filter_id': 1, 'site': "us"}]))
+
+    def test_same_key_on_two_sites_is_kept_as_two_issues(self):
+        config = dict(self.CONFIG, filters=[{'filter_id': 1}, {'filter_id': 2, 'site': "eu"}])
+        default, eu = jira_sources(config)
+        self.assertEqual(site_key_prefix(default['config']), "")
+        self.assertEqual(site_key_prefix(eu['config']), "eu:")
+        first = [issues('A-1', 'A-2'), issues('A-3')]
+        second = namespace_pages(iter([issues('A-2', 'B-1')]), site_key_prefix(eu['config']))
+        pages = list(merge_page_streams([iter(first), second]))
+        keys = [issue['key'] for page in pages for issue in page]
+        self.assertEqual(sorted(keys), ['A-1', 'A-2', 'A-3', 'eu:A-2', 'eu:B-1'])
+
+    def test_streams_run_concurrently(self):
+        # Each stream waits for the other to start, which deadlocks if they run one by one
+        barrier = threading.Barrier(2, timeout=5)
+
+        def stream(prefix):
+            barrier.wait()
+            yield issues(f"{prefix}-1")
+
+        pages = list(merge_page_streams([stream('A'), stream('B')]))
+        self.assertEqual(len(pages), 2)
+
+    def test_stream_errors_are_raised_and_stop_the_other_streams(self):
+        stopped = threading.Event()
+
+        def endless():
+            try:
+                while True:
+                    yield issues('A-1')
+            finally:
+                stopped.set()
+
+        def failing():
+            yield issues('B-1')
+            raise RuntimeError("site down")
+
+        with self.assertRaises(RuntimeError):
+            list(merge_page_streams([endless(), failing()]))
+        self.assertTrue(stopped.is_set())
+
+if __name__ == '__main__':
+    unittest.main()
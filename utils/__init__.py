@@ -0,0 +1,2 @@
+# utils/__init__.py
+# This package contains helpers shared by the pipeline and the LLM providers.
@@ -0,0 +1,168 @@
+# utils/metrics.py
+# Per-stage run instrumentation: latency histograms, throughput and counters, reported
+# as a JSON run report and optionally in the Prometheus text exposition format.
+
+import json
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# Upper bounds in seconds, as in a Prometheus histogram
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, math.inf)
+METRIC_PREFIX = "capacity_tracker"
+
+class Histogram:
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[index] += 1
+                break
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q):
+        # Linear interpolation within the bucket holding the q-th observation, like
+        # Prometheus' histogram_quantile
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            if seen + count >= rank and count:
+                lower = self.buckets[index - 1] if index else 0.0
+                upper = self.buckets[index]
+                if math.isinf(upper):
+                    return lower
+                return lower + (upper - lower) * (rank - seen) / count
+            seen += count
+        return self.buckets[-2]
+
+class Stage:
+    def __init__(self):
+        self.latency = Histogram()
+        self.items = 0
+        self.first_start = None
+        self.last_end = None
+
+    def observe(self, started, ended, items):
+        self.latency.observe(ended - started)
+        self.items += items
+        self.first_start = started if self.first_start is None else min(self.first_start, started)
+        self.last_end = ended if self.last_end is None else max(self.last_end, ended)
+
+    def report(self):
+        # busy_seconds adds up every call; items_per_second uses the wall-clock span of
+        # the stage, so concurrent calls are not double counted
+        span = (self.last_end - self.first_start) if self.first_start is not None else 0.0
+        round_or_none = lambda value: None if value is None else round(value, 6)
+        return {
+            "calls": self.latency.count,
+            "items": self.items,
+            "busy_seconds": round(self.latency.sum, 6),
+            "wall_seconds": round(span, 6),
+            "items_per_second": round(self.items / span, 3) if span > 0 else None,
+            "latency_seconds": {
+                "p50": round_or_none(self.latency.quantile(0.5)),
+                "p95": round_or_none(self.latency.quantile(0.95)),
+                "p99": round_or_none(self.latency.quantile(0.99)),
+                "buckets": dict(zip(map(str, self.latency.buckets), self.latency.counts)),
+            },
+        }
+
+def label_text(labels):
+    return "{" + ",".join(f'{name}="{value}"' for name, value in sorted(labels.items())) + "}" if labels else ""
+
+class RunMetrics:
+    # Thread-safe collector shared by the whole run (see `metrics` below). Stages are
+    # timed with `with metrics.stage("normalize", items=n):` and counters are keyed by
+    # name plus optional labels.
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.started_at = time.time()
+            self.stages = {}
+            self.counters = {}
+
+    @contextmanager
+    def stage(self, name, items=1):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, started, time.perf_counter(), items)
+
+    def observe(self, name, started, ended, items=1):
+        with self.lock:
+            self.stages.setdefault(name, Stage()).observe(started, ended, items)
+
+    def increment(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def counter(self, name, **labels):
+        return self.counters.get((name, tuple(sorted(labels.items()))), 0)
+
+    def report(self, **extra):
+        with self.lock:
+            return dict({
+                "started_at": self.started_at,
+                "duration_seconds": round(time.time() - self.started_at, 3),
+                "stages": {name: stage.report() for name, stage in self.stages.items()},
+                "counters": [
+                    {"name": name, "labels": dict(labels), "value": value}
+                    for (name, labels), value in sorted(self.counters.items())
+                ],
+            }, **extra)
+
+    def prometheus_text(self):
+        lines = []
+        with self.lock:
+            stages = list(self.stages.items())
+            counters = sorted(self.counters.items())
+        if stages:
+            metric = f"{METRIC_PREFIX}_stage_duration_seconds"
+            lines.append(f"# TYPE {metric} histogram")
+            for name, stage in stages:
+                cumulative = 0
+                for bound, count in zip(stage.latency.buckets, stage.latency.counts):
+                    cumulative += count
+                    le = "+Inf" if math.isinf(bound) else repr(bound)
+                    lines.append(f'{metric}_bucket{{stage="{name}",le="{le}"}} {cumulative}')
+                lines.append(f'{metric}_sum{{stage="{name}"}} {stage.latency.sum}')
+                lines.append(f'{metric}_count{{stage="{name}"}} {stage.latency.count}')
+            lines.append(f"# TYPE {METRIC_PREFIX}_stage_items_total counter")
+            for name, stage in stages:
+                lines.append(f'{METRIC_PREFIX}_stage_items_total{{stage="{name}"}} {stage.items}')
+        for name in sorted({name for (name, _), _ in counters}):
+            lines.append(f"# TYPE {METRIC_PREFIX}_{name}_total counter")
+            for (counter_name, labels), value in counters:
+                if counter_name == name:
+                    lines.append(f"{METRIC_PREFIX}_{name}_total{label_text(dict(labels))} {value}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, json_path=None, prometheus_path=None, **extra):
+        # Writes the JSON run report and/or the Prometheus text file atomically
+        for path, content in ((json_path, lambda: json.dumps(self.report(**extra), indent=2)), (prometheus_path, self.prometheus_text)):
+            if not path:
+                continue
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(f"{path}.partial", "w", encoding="utf-8") as file:
+                file.write(content())
+            os.replace(f"{path}.partial", path)
+
+# The collector for the current run
+metrics = RunMetrics()
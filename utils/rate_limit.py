@@ -0,0 +1,188 @@
+# utils/rate_limit.py
+# Rate limiting and retry with backoff for calls to JIRA and the LLM providers.
+
+import email.utils
+import logging
+import random
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from utils.metrics import metrics
+
+RETRYABLE_STATUS_CODES = {408, 425, 429, 500, 502, 503, 504, 529}
+# Network-level failures raised by requests, the provider SDKs and botocore
+RETRYABLE_ERROR_NAMES = {
+    'ConnectionError', 'Timeout', 'ConnectTimeout', 'ReadTimeout', 'ChunkedEncodingError',
+    'APIConnectionError', 'APITimeoutError', 'EndpointConnectionError', 'ReadTimeoutError',
+    'ConnectTimeoutError', 'ThrottlingException'
+}
+
+class TokenBucket:
+    # Paces callers to `rate` requests per second with bursts of up to `capacity`.
+    # A rate of None disables pacing. pause_until blocks every caller, which is how
+    # a server-supplied Retry-After applies to the whole endpoint rather than one thread.
+    def __init__(self, rate=None, capacity=None):
+        self.rate = float(rate) if rate else None
+        self.capacity = float(capacity or (max(1.0, self.rate) if self.rate else 1.0))
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self.paused_until = 0.0
+        self.lock = threading.Lock()
+
+    def pause_until(self, resume_at):
+        with self.lock:
+            self.paused_until = max(self.paused_until, resume_at)
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                wait = self.paused_until - now
+                if wait <= 0:
+                    if self.rate is None:
+                        return
+                    self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+                    self.updated_at = now
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        return
+                    wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+def status_code_of(error):
+    # Works for requests.HTTPError, openai/anthropic APIStatusError and botocore ClientError
+    status = getattr(error, 'status_code', None)
+    response = getattr(error, 'response', None)
+    if status is None and isinstance(response, dict):
+        status = response.get('ResponseMetadata', {}).get('HTTPStatusCode')
+    elif status is None and response is not None:
+        status = getattr(response, 'status_code', None)
+    return status
+
+def headers_of(error):
+    response = getattr(error, 'response', None)
+    if isinstance(response, dict):
+        return response.get('ResponseMetadata', {}).get('HTTPHeaders', {})
+    return getattr(response, 'headers', None) or {}
+
+def is_retryable(error):
+    response = getattr(error, 'response', None)
+    if isinstance(response, dict) and response.get('Error', {}).get('Code') in RETRYABLE_ERROR_NAMES:
+        # Bedrock reports throttling as a 400 with an error code
+        return True
+    status = status_code_of(error)
+    if status is not None:
+        return status in RETRYABLE_STATUS_CODES
+    return any(cls.__name__ in RETRYABLE_ERROR_NAMES for cls in type(error).__mro__)
+
+def parse_duration(value):
+    # OpenAI reset headers look like "1s", "6m0s" or "250ms"
+    units = {'ms': 0.001, 's': 1, 'm': 60, 'h': 3600}
+    parts = re.findall(r"(\d+(?:\.\d+)?)(ms|s|m|h)", value)
+    if not parts:
+        return None
+    return sum(float(amount) * units[unit] for amount, unit in parts)
+
+def retry_delay_from_headers(headers):
+    # Returns the server-requested wait in seconds, or None when the headers carry no hint.
+    headers = {str(key).lower(): str(value) for key, value in dict(headers).items()}
+    if 'retry-after-ms' in headers:
+        try:
+            return float(headers['retry-after-ms']) / 1000
+        except ValueError:
+            pass
+    if 'retry-after' in headers:
+        value = headers['retry-after'].strip()
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        # Otherwise an HTTP date. A malformed value is ignored, so the retry falls back to
+        # the backoff instead of the parse error replacing the original failure.
+        try:
+            parsed = email.utils.parsedate_to_datetime(value)
+            if parsed.tzinfo is None:
+                parsed = parsed.replace(tzinfo=timezone.utc)
+            return max(0.0, (parsed - datetime.now(timezone.utc)).total_seconds())
+        except (TypeError, ValueError):
+            pass
+    if 'x-ratelimit-reset' in headers:
+        # JIRA sends an ISO 8601 timestamp
+        try:
+            reset_at = datetime.fromisoformat(headers['x-ratelimit-reset'].replace('Z', '+00:00'))
+            if reset_at.tzinfo is None:
+                reset_at = reset_at.replace(tzinfo=timezone.utc)
+            return max(0.0, (reset_at - datetime.now(timezone.utc)).total_seconds())
+        except ValueError:
+            pass
+    resets = [parse_duration(headers[name]) for name in ('x-ratelimit-reset-requests', 'x-ratelimit-reset-tokens') if name in headers]
+    resets = [reset for reset in resets if reset is not None]
+    return max(resets) if resets else None
+
+class Throttle:
+    # Paces and retries calls to one endpoint. Retryable failures (429, 5xx and network
+    # errors) are retried up to max_retries times, waiting for the server's Retry-After
+    # or rate-limit reset when given, otherwise for a jittered exponential backoff.
+    # max_in_flight caps the calls running at once across every thread sharing the throttle.
+    def __init__(self, name, requests_per_second=None, burst=None, max_retries=5, base_delay=1.0, max_delay=60.0, max_in_flight=None):
+        self.name = name
+        self.bucket = TokenBucket(requests_per_second, burst)
+        self.in_flight = threading.BoundedSemaphore(max_in_flight) if max_in_flight else None
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        # Shared by every worker thread using this throttle
+        self.lock = threading.Lock()
+        self.retries = 0
+
+    @classmethod
+    def from_config(cls, name, settings=None):
+        settings = settings or {}
+        return cls(
+            name,
+            requests_per_second=settings.get('requests_per_second'),
+            burst=settings.get('burst'),
+            max_retries=settings.get('max_retries', 5),
+            base_delay=settings.get('base_delay', 1.0),
+            max_delay=settings.get('max_delay', 60.0),
+            max_in_flight=settings.get('max_in_flight')
+        )
+
+    def backoff(self, attempt):
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    def observe(self, headers):
+        # Pause ahead of time when a successful response says the quota is used up
+        headers = {str(key).lower(): str(value) for key, value in dict(headers).items()}
+        remaining = headers.get('x-ratelimit-remaining', headers.get('x-ratelimit-remaining-requests'))
+        if remaining is not None and remaining.strip() == '0':
+            delay = retry_delay_from_headers(headers)
+            if delay:
+                logging.info(f"{self.name} rate limit exhausted. Pausing requests for {delay:.1f}s.")
+                self.bucket.pause_until(time.monotonic() + min(delay, self.max_delay))
+
+    def call(self, fn, *args, **kwargs):
+        attempt = 0
+        while True:
+            self.bucket.acquire()
+            try:
+                if self.in_flight is None:
+                    return fn(*args, **kwargs)
+                with self.in_flight:
+                    return fn(*args, **kwargs)
+            except Exception as e:
+                if attempt >= self.max_retries or not is_retryable(e):
+                    raise
+                server_delay = retry_delay_from_headers(headers_of(e))
+                if server_delay is not None:
+                    delay = min(server_delay, self.max_delay) + random.uniform(0, self.base_delay)
+                    self.bucket.pause_until(time.monotonic() + delay)
+                else:
+                    delay = self.backoff(attempt)
+                attempt += 1
+                with self.lock:
+                    self.retries += 1
+                metrics.increment("retries", endpoint=self.name)
+                logging.warning(f"{self.name} request failed ({e}). Retry {attempt}/{self.max_retries} in {delay:.1f}s.")
+                time.sleep(delay)